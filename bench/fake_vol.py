@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+MemHawk Benchmark Stand-in for vol
+Accepts the command lines MemHawk builds for Volatility 3 and prints
+synthetic windows.pslist / handles / filescan / dlllist output of a chosen
+size after a chosen start-up latency, without reading the image
+
+    MEMHAWK_FAKE_ROWS     rows per plugin (default 1000), or per plugin:
+                          windows.handles=1000000,windows.pslist=500
+    MEMHAWK_FAKE_LATENCY  seconds to wait before the first row (default 0)
+
+Authors: Adriteyo Das, Anvita Warjri, Shivam Lahoty
+"""
+
+import os
+import sys
+import json
+import time
+
+VERSION = '2.7.0'
+BANNER = f'Volatility 3 Framework {VERSION}'
+
+PLUGIN_CLASSES = {
+    'windows.pslist': 'PsList',
+    'windows.handles': 'Handles',
+    'windows.filescan': 'FileScan',
+    'windows.dlllist': 'DllList',
+}
+
+COLUMNS = {
+    'windows.pslist': ['PID', 'PPID', 'ImageFileName', 'Offset(V)', 'Threads', 'Handles', 'SessionId', 'Wow64',
+                       'CreateTime', 'ExitTime', 'File output'],
+    'windows.handles': ['PID', 'Process', 'Offset', 'HandleValue', 'Type', 'GrantedAccess', 'Name'],
+    'windows.filescan': ['Offset', 'Name'],
+    'windows.dlllist': ['PID', 'Process', 'Base', 'Size', 'Name', 'Path', 'LoadTime', 'File output'],
+}
+
+PROCESSES = ['System', 'smss.exe', 'csrss.exe', 'wininit.exe', 'services.exe', 'lsass.exe', 'svchost.exe',
+             'explorer.exe', 'chrome.exe', 'powershell.exe']
+HANDLE_TYPES = ['File', 'Key', 'Event', 'Mutant', 'Section', 'Thread', 'Process', 'Token']
+DLLS = ['ntdll.dll', 'kernel32.dll', 'KERNELBASE.dll', 'user32.dll', 'advapi32.dll', 'ws2_32.dll', 'crypt32.dll']
+
+
+def row(plugin_name, index):
+    """Synthetic row number index of a plugin, shaped like vol's JSON renderer output"""
+    pid = 4 + (index % 4096) * 4
+    process = PROCESSES[index % len(PROCESSES)]
+    if plugin_name == 'windows.pslist':
+        values = [pid, 4 + (index // 7 % 4096) * 4, process, 0xfa8000000000 + index * 0x1000, index % 64,
+                  index % 2048, index % 3, False, '2024-01-01T00:00:00+00:00', None, 'Disabled']
+    elif plugin_name == 'windows.handles':
+        values = [pid, process, 0xfa8000100000 + index * 0x60, (index % 8192) * 4,
+                  HANDLE_TYPES[index % len(HANDLE_TYPES)], 0x1f0fff, f'\\BaseNamedObjects\\object{index}']
+    elif plugin_name == 'windows.filescan':
+        values = [0x7e000000 + index * 0x150, f'\\Windows\\System32\\file{index}.dat']
+    else:
+        dll = DLLS[index % len(DLLS)]
+        values = [pid, process, 0x7ff800000000 + index * 0x100000, 0x1a0000, dll, f'C:\\Windows\\System32\\{dll}',
+                  '2024-01-01T00:00:00+00:00', 'Disabled']
+    result = dict(zip(COLUMNS[plugin_name], values))
+    result['__children'] = []
+    return result
+
+
+def row_count(plugin_name):
+    setting = os.environ.get('MEMHAWK_FAKE_ROWS', '1000')
+    if '=' not in setting:
+        return int(setting)
+    counts = dict(item.split('=', 1) for item in setting.split(',') if item)
+    return int(counts.get(plugin_name, 1000))
+
+
+def write_output(plugin_name, renderer, out):
+    """Rows written as they are generated, so 10M-row outputs need no memory"""
+    count = row_count(plugin_name)
+    if renderer == 'json':
+        out.write('[')
+        for index in range(count):
+            if index:
+                out.write(',\n')
+            out.write(json.dumps(row(plugin_name, index)))
+        out.write(']\n')
+    elif renderer == 'jsonl':
+        for index in range(count):
+            out.write(json.dumps(row(plugin_name, index)) + '\n')
+    else:
+        out.write(f'{BANNER}\n\n')
+        out.write('\t'.join(COLUMNS[plugin_name]) + '\n\n')
+        for index in range(count):
+            out.write('\t'.join('N/A' if value is None else str(value)
+                                for value in list(row(plugin_name, index).values())[:-1]) + '\n')
+
+
+def main(argv):
+    if '--help' in argv or '-h' in argv:
+        choices = ','.join(f'{name}.{class_name}' for name, class_name in sorted(PLUGIN_CLASSES.items()))
+        print(f'{BANNER}\nusage: vol [-h] [-f FILE] [-r RENDERER] plugin ...\n\n  {{{choices}}}')
+        return 0
+
+    renderer = 'quick'
+    plugin_name = None
+    args = iter(argv)
+    for arg in args:
+        if arg in ('-f', '-s', '-o', '--single-location'):
+            next(args, None)
+        elif arg == '-r':
+            renderer = next(args, 'quick')
+        elif arg in COLUMNS and plugin_name is None:
+            plugin_name = arg
+    if plugin_name is None:
+        print(f'{BANNER}\nerror: unsupported plugin', file=sys.stderr)
+        return 2
+
+    time.sleep(float(os.environ.get('MEMHAWK_FAKE_LATENCY', '0')))
+    write_output(plugin_name, renderer, sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+MemHawk Benchmarks
+Drives VolatilityRunner, ScanThread-style scheduler scans and case database
+ingestion against bench/fake_vol.py at configurable output sizes and
+latencies, and reports throughput, latency percentiles and peak memory per
+stage, optionally against a stored baseline
+
+    python bench/run_bench.py --rows 1000,100000 --save-baseline main
+    python bench/run_bench.py --rows 1000,100000 --compare main
+
+Authors: Adriteyo Das, Anvita Warjri, Shivam Lahoty
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import platform
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(BENCH_DIR), 'src')
+BASELINE_DIR = os.path.join(BENCH_DIR, 'baselines')
+FAKE_VOL = os.path.join(BENCH_DIR, 'fake_vol.py')
+
+PLUGINS = ['windows.pslist', 'windows.handles', 'windows.filescan', 'windows.dlllist']
+STAGES = ['runner', 'stream', 'scan', 'ingest']
+IMAGE_SIZE = 64 * 1024 * 1024
+# A change is reported as a regression beyond this fraction
+DEFAULT_THRESHOLD = 0.10
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))]
+
+
+def fake_vol_command():
+    return [sys.executable, FAKE_VOL]
+
+
+def runner_options():
+    return {'volatility_path': fake_vol_command(), 'use_engine': False, 'use_cache': False,
+            'record_stats': False, 'timeout': None}
+
+
+def bench_runner(image_path, rows, repeat):
+    """VolatilityRunner.run_plugin with JSON output: vol spawn, output capture and JSON decoding"""
+    from volatility_bridge import VolatilityRunner
+    runner = VolatilityRunner(**runner_options())
+    latencies = []
+    for _ in range(repeat):
+        for plugin_name in PLUGINS:
+            started = time.perf_counter()
+            result = runner.run_plugin(image_path, plugin_name)
+            latencies.append(time.perf_counter() - started)
+            assert result['success'] and len(result['output']) == rows, f"{plugin_name} returned bad output"
+    return latencies, {}
+
+
+def bench_stream(image_path, rows, repeat):
+    """VolatilityRunner.stream_plugin over `vol -r jsonl`, including the time to the first batch"""
+    from volatility_bridge import VolatilityRunner
+    runner = VolatilityRunner(**runner_options())
+    latencies, first_batches = [], []
+    for _ in range(repeat):
+        for plugin_name in PLUGINS:
+            started = time.perf_counter()
+            first = None
+            for event in runner.stream_plugin(image_path, plugin_name, batch_size=1000):
+                if event['type'] == 'rows' and first is None:
+                    first = time.perf_counter() - started
+            latencies.append(time.perf_counter() - started)
+            first_batches.append(first or latencies[-1])
+            assert event['success'] and event['row_count'] == rows, f"{plugin_name} stream ended badly"
+    return latencies, {'first_batch_p50_ms': percentile(first_batches, 0.5) * 1000}
+
+
+def bench_scan(image_path, rows, repeat):
+    """The GUI's ScanThread path: every plugin on the PluginScheduler with text output"""
+    from scheduler import PluginScheduler
+    latencies, walls = [], []
+    for _ in range(repeat):
+        scheduler = PluginScheduler(runner_options=runner_options())
+        for plugin_name in PLUGINS:
+            scheduler.submit(image_path, plugin_name, output_format='text')
+        started = time.perf_counter()
+        results = scheduler.run()
+        walls.append(time.perf_counter() - started)
+        latencies.extend(job.finished - job.started for job in scheduler.jobs)
+        assert all(result['success'] for result in results.values()), 'scan had failed plugins'
+    return latencies, {'scan_wall_p50_ms': percentile(walls, 0.5) * 1000}
+
+
+def bench_ingest(image_path, rows, repeat):
+    """ingest_directory of every plugin's JSON output into a fresh case database"""
+    from ingest import ingest_directory
+    output_dir = tempfile.mkdtemp(prefix='outputs-', dir='.')
+    env = dict(os.environ, MEMHAWK_FAKE_ROWS=str(rows), MEMHAWK_FAKE_LATENCY='0')
+    for plugin_name in PLUGINS:
+        with open(os.path.join(output_dir, plugin_name + '.json'), 'w', encoding='utf-8') as f:
+            subprocess.run(fake_vol_command() + ['-f', image_path, '-r', 'json', plugin_name],
+                           stdout=f, env=env, check=True)
+
+    latencies = []
+    for index in range(repeat):
+        db_path = f'bench-{index}.db'
+        started = time.perf_counter()
+        counts = ingest_directory(output_dir, db_path)
+        latencies.append(time.perf_counter() - started)
+        os.remove(db_path)
+        assert sum(counts.values()) == rows * len(PLUGINS), 'ingestion lost rows'
+    return latencies, {}
+
+
+BENCHMARKS = {'runner': bench_runner, 'stream': bench_stream, 'scan': bench_scan, 'ingest': bench_ingest}
+
+
+def run_stage(stage, image_path, rows, latency, repeat):
+    """One stage in a fresh process, so its peak RSS is its own"""
+    sys.path.insert(0, SRC_DIR)
+    os.environ['MEMHAWK_FAKE_ROWS'] = str(rows)
+    os.environ['MEMHAWK_FAKE_LATENCY'] = str(latency)
+    # Per-plugin log lines would swamp the report and cost time of their own
+    logging.disable(logging.INFO)
+    from run_stats import RunMeter
+
+    with RunMeter() as meter:
+        latencies, extra = BENCHMARKS[stage](image_path, rows, repeat)
+
+    # Every latency sample covers one plugin output (or, for ingestion, all of them)
+    rows_per_sample = rows * len(PLUGINS) if stage == 'ingest' else rows
+    result = {
+        'stage': stage,
+        'rows': rows,
+        'samples': len(latencies),
+        'p50_ms': percentile(latencies, 0.5) * 1000,
+        'p90_ms': percentile(latencies, 0.9) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'max_ms': max(latencies) * 1000,
+        'rows_per_s': rows_per_sample * len(latencies) / meter.wall_s,
+        'cpu_s': meter.cpu_s,
+        'peak_rss_mb': meter.peak_rss_mb
+    }
+    result.update(extra)
+    return result
+
+
+def compare(results, baseline, threshold):
+    """Lines describing each result against the baseline; returns (lines, regression count)"""
+    previous = {f"{result['stage']}/{result['rows']}": result for result in baseline['results']}
+    lines, regressions = [], 0
+    for result in results:
+        key = f"{result['stage']}/{result['rows']}"
+        if key not in previous:
+            lines.append(f'{key:<18} not in baseline')
+            continue
+        old = previous[key]
+        changes = []
+        # (metric, True when a higher value is worse)
+        for metric, higher_is_worse in (('p50_ms', True), ('p99_ms', True), ('rows_per_s', False),
+                                        ('peak_rss_mb', True)):
+            if not old.get(metric) or result.get(metric) is None:
+                continue
+            delta = (result[metric] - old[metric]) / old[metric]
+            worse = delta > threshold if higher_is_worse else delta < -threshold
+            regressions += worse
+            changes.append(f"{metric} {delta:+.1%}{' REGRESSION' if worse else ''}")
+        lines.append(f"{key:<18} {', '.join(changes)}")
+    return lines, regressions
+
+
+def print_table(results):
+    print(f"{'stage':<8} {'rows':>9} {'n':>4} {'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10} "
+          f"{'rows/s':>12} {'cpu s':>8} {'peak MB':>8}")
+    for result in results:
+        peak = result['peak_rss_mb'] if result['peak_rss_mb'] is not None else '-'
+        print(f"{result['stage']:<8} {result['rows']:>9} {result['samples']:>4} {result['p50_ms']:>10.1f} "
+              f"{result['p90_ms']:>10.1f} {result['p99_ms']:>10.1f} {result['rows_per_s']:>12.0f} "
+              f"{result['cpu_s']:>8.2f} {peak:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='MemHawk benchmarks against a stand-in vol')
+    parser.add_argument('--rows', default='1000,100000', help='comma separated rows per plugin output (up to 10M)')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds the stand-in vol waits before output')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per stage and size')
+    parser.add_argument('--stages', default=','.join(STAGES), help=f"comma separated, from {', '.join(STAGES)}")
+    parser.add_argument('--save-baseline', metavar='NAME', help='store the results as bench/baselines/NAME.json')
+    parser.add_argument('--compare', metavar='NAME', help='compare with bench/baselines/NAME.json')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='relative change counted as a regression (default 0.10)')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON instead of a table')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.rows.split(',') if size]
+    stages = [stage for stage in args.stages.split(',') if stage]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    # Runs happen in a scratch directory so logs, caches and databases stay out of the tree
+    work_dir = tempfile.mkdtemp(prefix='memhawk-bench-')
+    previous_dir = os.getcwd()
+    os.chdir(work_dir)
+    results = []
+    try:
+        image_path = os.path.join(work_dir, 'image.raw')
+        with open(image_path, 'wb') as f:
+            f.truncate(IMAGE_SIZE)
+        context = multiprocessing.get_context('spawn')
+        for rows in sizes:
+            for stage in stages:
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    results.append(pool.submit(run_stage, stage, image_path, rows, args.latency, args.repeat).result())
+                if not args.json:
+                    print(f"{stage} with {rows} rows: {results[-1]['p50_ms']:.1f} ms p50", file=sys.stderr)
+    finally:
+        os.chdir(previous_dir)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'host': {'platform': platform.platform(), 'python': platform.python_version(), 'cpus': os.cpu_count()},
+        'latency_s': args.latency,
+        'repeat': args.repeat,
+        'results': results
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_table(results)
+
+    regressions = 0
+    if args.compare:
+        with open(os.path.join(BASELINE_DIR, args.compare + '.json'), 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        lines, regressions = compare(results, baseline, args.threshold)
+        print(f"\nCompared with baseline {args.compare} ({baseline['created']}, {baseline['host']['platform']}):")
+        print('\n'.join(lines))
+
+    if args.save_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        path = os.path.join(BASELINE_DIR, args.save_baseline + '.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved baseline {path}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -89,7 +89,7 @@ def install_dependencies():
 
 def create_directories():
     """Create necessary directories"""
-    directories = ['lib', 'case', 'src/data', 'output']
+    directories = ['lib', 'lib/symbols/packs', 'case', 'cache', 'src/data', 'output']
     
     for directory in directories:
         Path(directory).mkdir(parents=True, exist_ok=True)
@@ -138,9 +138,19 @@ def start_memhawk():
     
     return True
 
+def run_cli(argv):
+    """Headless commands (python memhawk.py scan/batch/queue ...), without Node.js, Electron or PyQt5"""
+    sys.path.insert(0, str(Path(__file__).parent / 'src'))
+    from cli import main as cli_main
+    return cli_main(argv)
+
 def main():
     """Main entry point"""
     
+    # Headless commands resolve their paths from the caller's directory
+    if len(sys.argv) > 1 and sys.argv[1] in ('scan', 'batch', 'queue'):
+        sys.exit(run_cli(sys.argv[1:]))
+    
     # Change to the script directory
     script_dir = Path(__file__).parent
     os.chdir(script_dir)
@@ -152,6 +162,12 @@ def main():
             print("  python memhawk.py          Start the application")
             print("  python memhawk.py --help   Show this help message")
             print("  python memhawk.py --dev    Start in development mode")
+            print("  python memhawk.py scan --image IMAGE --plugins A,B --out CASE_DIR")
+            print("                             Scan without a GUI and print a JSON status")
+            print("  python memhawk.py batch --images DIR_OR_MANIFEST --profile triage --out DIR")
+            print("                             Scan many images on one worker pool")
+            print("  python memhawk.py queue submit|work|status --queue SHARED_DIR ...")
+            print("                             Spread scans over workers on several hosts")
             return
         elif sys.argv[1] == '--dev':
             print("Starting MemHawk in development mode...")
@@ -8,6 +8,16 @@ const OllamaReportGenerator = require('../src/gemini-report');
 let mainWindow;
 let logMessages = [];
 let ollamaReporter;
+// Fingerprint, size and full hashes of the last scanned image, for the reports
+let imageIdentity = null;
+
+function withImageIdentity(imageInfo = {}) {
+  if (!imageIdentity || (imageInfo.filename && imageInfo.filename !== imageIdentity.filename)) {
+    return imageInfo;
+  }
+  const { fingerprint, sha256, md5, size } = imageIdentity;
+  return { ...imageInfo, fingerprint, sha256, md5, size: `${(size / (1024 ** 3)).toFixed(2)} GB (${size} bytes)` };
+}
 
 function createWindow() {
   // Create the browser window
@@ -87,7 +97,8 @@ ipcMain.handle('get-available-plugins', async () => {
   try {
     // Try to get plugins from Python backend
     return new Promise((resolve) => {
-      const pythonProcess = exec('python src/volatility_bridge.py', 
+      // Discovery is cached by the bridge, so this returns quickly after the first run
+      const pythonProcess = exec('python src/volatility_bridge.py --list-plugins', 
         { cwd: path.join(__dirname, '..') },
         (error, stdout, stderr) => {
           if (error) {
@@ -97,8 +108,8 @@ ipcMain.handle('get-available-plugins', async () => {
           }
           
           try {
-            // Parse the output to extract plugins (simplified for demo)
-            resolve(getFallbackPlugins());
+            const plugins = JSON.parse(stdout);
+            resolve(plugins.length ? plugins : getFallbackPlugins());
           } catch (parseError) {
             console.log('Using fallback plugin list');  
             resolve(getFallbackPlugins());
@@ -197,39 +208,94 @@ ipcMain.handle('run-volatility-scan', async (event, { imagePath, selectedPlugins
   return new Promise((resolve, reject) => {
     const results = {};
     let completedPlugins = 0;
+    let buffered = '';
+    let fallback = false;
+    
+    imageIdentity = null;
     
     // Log the scan start
     const logMessage = `Starting scan with ${selectedPlugins.length} plugins on ${path.basename(imagePath)}`;
     logMessages.push({ timestamp: new Date().toISOString(), message: logMessage, type: 'info' });
     
-    selectedPlugins.forEach((plugin, index) => {
-      setTimeout(() => {
-        runVolatilityPlugin(imagePath, plugin, outputDir)
-          .then(result => {
-            results[plugin] = result;
-            completedPlugins++;
-            
-            // Send progress update
-            mainWindow.webContents.send('scan-progress', {
-              completed: completedPlugins,
-              total: selectedPlugins.length,
-              currentPlugin: plugin,
-              result: result
-            });
-            
-            if (completedPlugins === selectedPlugins.length) {
-              resolve(results);
-            }
-          })
-          .catch(error => {
-            results[plugin] = { error: error.message };
-            completedPlugins++;
-            
-            if (completedPlugins === selectedPlugins.length) {
-              resolve(results);
-            }
+    // The Python bridge schedules the plugins within the machine's CPU and memory limits,
+    // saving and journaling each result in the chosen output directory
+    const bridgeArgs = [
+      'src/volatility_bridge.py', '--scan',
+      '--image', imagePath,
+      '--plugins', selectedPlugins.join(',')
+    ];
+    if (outputDir) {
+      bridgeArgs.push('--case', outputDir);
+    }
+    const bridge = spawn('python', bridgeArgs, { cwd: path.join(__dirname, '..') });
+    
+    bridge.stdout.on('data', (chunk) => {
+      buffered += chunk.toString();
+      const lines = buffered.split('\n');
+      buffered = lines.pop();
+      
+      lines.filter(line => line.trim()).forEach(line => {
+        let update;
+        try {
+          update = JSON.parse(line);
+        } catch (parseError) {
+          return;
+        }
+        
+        if (update.event === 'finished') {
+          results[update.plugin] = update.result;
+          completedPlugins = update.completed;
+          
+          // Send progress update
+          mainWindow.webContents.send('scan-progress', {
+            completed: completedPlugins,
+            total: selectedPlugins.length,
+            currentPlugin: update.plugin,
+            result: update.result,
+            status: update.status
           });
-      }, index * 100); // Stagger the plugin executions
+        } else if (update.event === 'identity') {
+          imageIdentity = update.identity;
+          const message = update.identity.sha256
+            ? `Image SHA-256 ${update.identity.sha256}, MD5 ${update.identity.md5}`
+            : `Could not hash image: ${update.identity.error}`;
+          logMessages.push({ timestamp: new Date().toISOString(), message, type: update.identity.sha256 ? 'info' : 'warning' });
+        } else if (update.event === 'started') {
+          logMessages.push({ timestamp: new Date().toISOString(), message: `Started ${update.plugin}`, type: 'info', plugin: update.plugin });
+        }
+      });
+    });
+    
+    bridge.on('error', (error) => {
+      // Python could not be started: run the plugins one at a time instead
+      fallback = true;
+      logMessages.push({ timestamp: new Date().toISOString(), message: `Bridge unavailable, running plugins sequentially: ${error.message}`, type: 'warning' });
+      selectedPlugins.reduce((previous, plugin) => previous.then(async () => {
+        try {
+          results[plugin] = await runVolatilityPlugin(imagePath, plugin, outputDir);
+        } catch (pluginError) {
+          results[plugin] = { error: pluginError.message };
+        }
+        completedPlugins++;
+        mainWindow.webContents.send('scan-progress', {
+          completed: completedPlugins,
+          total: selectedPlugins.length,
+          currentPlugin: plugin,
+          result: results[plugin]
+        });
+      }), Promise.resolve()).then(() => resolve(results));
+    });
+    
+    bridge.on('close', (code) => {
+      if (fallback) {
+        return;
+      }
+      selectedPlugins.forEach(plugin => {
+        if (!results[plugin]) {
+          results[plugin] = { error: `Bridge exited with code ${code}` };
+        }
+      });
+      resolve(results);
     });
   });
 });
@@ -307,7 +373,7 @@ ipcMain.handle('generate-gemini-report', async (event, { scanResults, imageInfo
       ollamaReporter = new OllamaReportGenerator();
     }
     
-    const report = await ollamaReporter.generateForensicReport(scanResults, imageInfo);
+    const report = await ollamaReporter.generateForensicReport(scanResults, withImageIdentity(imageInfo));
     
     logMessages.push({
       timestamp: new Date().toISOString(),
@@ -389,7 +455,7 @@ ipcMain.handle('generate-signed-pdf-report', async (event, { scanResults, imageI
       ollamaReporter = new OllamaReportGenerator();
     }
     
-    const pdfResult = await ollamaReporter.generateSignedPDFReport(scanResults, imageInfo);
+    const pdfResult = await ollamaReporter.generateSignedPDFReport(scanResults, withImageIdentity(imageInfo));
     
     if (pdfResult.success && pdfResult.pdfPath) {
       // Show the PDF in file explorer
@@ -431,7 +497,7 @@ ipcMain.handle('generate-pdf-from-markdown', async (event, { markdownContent, im
       ollamaReporter = new OllamaReportGenerator();
     }
     
-    const pdfResult = await ollamaReporter.generatePDFFromMarkdown(markdownContent, imageInfo);
+    const pdfResult = await ollamaReporter.generatePDFFromMarkdown(markdownContent, withImageIdentity(imageInfo));
     
     if (pdfResult.success && pdfResult.pdfPath) {
       // Show the PDF in file explorer
@@ -13,21 +13,24 @@ from PyQt5.QtCore import *
 from PyQt5.QtWidgets import *
 from . import plugin
 
-print("                                                                                        ")
-print(" #     #  ####  #        ##   ##### # #      # ##### #   #                              ")
-print(" #     # #    # #       #  #    #   # #      #   #    # #                               ")
-print(" #     # #    # #      #    #   #   # #      #   #     #                                ")
-print("  #   #  #    # #      ######   #   # #      #   #     #                                ")
-print("   # #   #    # #      #    #   #   # #      #   #     #                                ")
-print("    #     ####  ###### #    #   #   # ###### #   #     #                                ")
-print("                                                                                        ")
-print("                                                                                        ")
-print("   # #   #    # #####  ####       # #   #    #   ##   #      #   # ###### ###### #####  ")
-print("  #   #  #    #   #   #    #     #   #  ##   #  #  #  #       # #      #  #      #    # ")
-print(" #     # #    #   #   #    #    #     # # #  # #    # #        #      #   #####  #    # ")
-print(" ####### #    #   #   #    #    ####### #  # # ###### #        #     #    #      #####  ")
-print(" #     # #    #   #   #    #    #     # #   ## #    # #        #    #     #      #   #  ")
-print(" #     #  ####    #    ####     #     # #    # #    # ######   #   ###### ###### #    # ")
+
+def banner():
+    print("                                                                                        ")
+    print(" #     #  ####  #        ##   ##### # #      # ##### #   #                              ")
+    print(" #     # #    # #       #  #    #   # #      #   #    # #                               ")
+    print(" #     # #    # #      #    #   #   # #      #   #     #                                ")
+    print("  #   #  #    # #      ######   #   # #      #   #     #                                ")
+    print("   # #   #    # #      #    #   #   # #      #   #     #                                ")
+    print("    #     ####  ###### #    #   #   # ###### #   #     #                                ")
+    print("                                                                                        ")
+    print("                                                                                        ")
+    print("   # #   #    # #####  ####       # #   #    #   ##   #      #   # ###### ###### #####  ")
+    print("  #   #  #    #   #   #    #     #   #  ##   #  #  #  #       # #      #  #      #    # ")
+    print(" #     # #    #   #   #    #    #     # # #  # #    # #        #      #   #####  #    # ")
+    print(" ####### #    #   #   #    #    ####### #  # # ###### #        #     #    #      #####  ")
+    print(" #     # #    #   #   #    #    #     # #   ## #    # #        #    #     #      #   #  ")
+    print(" #     #  ####    #    ####     #     # #    # #    # ######   #   ###### ###### #    # ")
+
 
 text = 'Volatility Auto GUI environment. Sourced By PENTAL \
         \n \
@@ -41,9 +44,11 @@ text = 'Volatility Auto GUI environment. Sourced By PENTAL \
         \n If possible, I would appreciate it if you hit the star button on github.'
 
 
-dir_path = os.getcwd() + '\\src\\data'
-shutil.rmtree(dir_path)
-os.mkdir(os.getcwd() + '\\src\\data')
+def reset_data_dir():
+    # Plugin outputs of the previous analysis are cleared when the window opens, not on import
+    dir_path = os.path.join(os.getcwd(), 'src', 'data')
+    shutil.rmtree(dir_path, ignore_errors=True)
+    os.makedirs(dir_path, exist_ok=True)
 
 ui = uic.loadUiType('res/auto.ui')[0]
 
@@ -52,6 +57,8 @@ class AutoAnalyzer(QWidget, ui):
         super().__init__()
         self.setupUi(self)
         self.setWindowIcon(QIcon('res/icon.ico'))
+        banner()
+        reset_data_dir()
 
         #Button Click
         self.btn_select.clicked.connect(self.callfile)
@@ -83,14 +90,11 @@ class AutoAnalyzer(QWidget, ui):
         try :
             for i in plugin_list:
                 print(i)
-                shell = ['python', volatility3,'-f', path, i]
-                fd_open = subprocess.Popen(shell, stdout=subprocess.PIPE).stdout
-                data = fd_open.read().strip().decode('euc-kr')
-                fd_open.close()
+                # JSON lines go straight to disk; auto_db_store.py loads them without text scraping
+                shell = ['python', volatility3,'-f', path, '-r', 'jsonl', i]
                 save_path = os.getcwd() + '\\src\\data\\'
-                f = open(save_path + str(i) + '.txt','wb')
-                f.write(data.encode('utf-8'))
-                f.close()
+                with open(save_path + str(i) + '.jsonl', 'wb') as f:
+                    subprocess.run(shell, stdout=f)
         except :
             QMessageBox.warning(self, 'Error', 'Error. Please Retry', QMessageBox.Ok, QMessageBox.Ok)
             return
@@ -102,7 +106,13 @@ class AutoAnalyzer(QWidget, ui):
         try :
             path = os.getcwd() + '\src/auto_db_store.py'
             path = pathlib.Path(path)
-            db_store_run = 'python ' + str(path)
+            # Each image gets its own case database: case/<image name>/case.db
+            image = self.file_path.toPlainText()
+            case_name = pathlib.Path(image).stem if image else 'auto'
+            db_path = pathlib.Path(os.getcwd() + '/case/' + case_name + '/case.db')
+            db_store_run = 'python "' + str(path) + '" "' + os.getcwd() + '/src/data" "' + str(db_path) + '"'
+            if image:
+                db_store_run += ' "' + image + '"'
             os.system(db_store_run)
             QMessageBox.warning(self, 'Success', 'Success DB Store', QMessageBox.Ok, QMessageBox.Ok)
         except :
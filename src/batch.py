@@ -0,0 +1,301 @@
+"""
+MemHawk Batch Scans
+Scans a directory or manifest of memory images with one plugin profile on a
+single shared worker pool, writing one case directory and case database per
+image and a batch summary
+
+Authors: Adriteyo Das, Anvita Warjri, Shivam Lahoty
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+import logging
+
+try:
+    from .scheduler import PluginScheduler, PLUGIN_PRIORITIES, TRIAGE_PLUGINS
+    from .scan_journal import ScanJournal, write_output
+    from .image_identity import ImageHasher
+    from .ingest import Ingestor, read_batches
+    from .plugin_catalog import columns_for
+    from .run_stats import RunStats
+    from .volatility_bridge import VolatilityRunner, resolve_symbols
+except ImportError:
+    from scheduler import PluginScheduler, PLUGIN_PRIORITIES, TRIAGE_PLUGINS
+    from scan_journal import ScanJournal, write_output
+    from image_identity import ImageHasher
+    from ingest import Ingestor, read_batches
+    from plugin_catalog import columns_for
+    from run_stats import RunStats
+    from volatility_bridge import VolatilityRunner, resolve_symbols
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.raw', '.mem', '.dmp', '.vmem', '.img', '.dd', '.lime', '.bin', '.vmss', '.elf')
+SUMMARY_FILE = 'batch_summary.json'
+CASE_DB_FILE = 'case.db'
+
+# Plugin profiles by name; anything else given as a profile is a comma separated plugin list
+PROFILES = {
+    'triage': list(TRIAGE_PLUGINS) + ['windows.pstree', 'windows.cmdline', 'windows.netscan'],
+    'standard': [name for name, priority in PLUGIN_PRIORITIES.items() if priority in ('triage', 'high', 'medium')],
+    'full': list(PLUGIN_PRIORITIES)
+}
+
+
+def profile_plugins(profile):
+    """Plugins of a named profile or of a comma separated list"""
+    if profile in PROFILES:
+        return list(PROFILES[profile])
+    return [name for name in profile.split(',') if name]
+
+
+def load_images(source):
+    """[(image path, case name)] from a directory of images or a manifest file
+
+    A manifest is a JSON list of paths or {"image": ..., "case": ...}
+    objects, or a text file with one "path [case name]" per line. Relative
+    paths are taken from the manifest's directory; case names default to the
+    image file name without its extension, made unique.
+    """
+    if os.path.isdir(source):
+        entries = [(entry.path, None) for entry in sorted(os.scandir(source), key=lambda entry: entry.name)
+                   if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS)]
+    else:
+        base = os.path.dirname(os.path.abspath(source))
+        with open(source, 'r', encoding='utf-8') as f:
+            text = f.read()
+        if text.lstrip().startswith('['):
+            entries = [(item, None) if isinstance(item, str) else (item['image'], item.get('case'))
+                       for item in json.loads(text)]
+        else:
+            entries = []
+            for line in text.splitlines():
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                parts = line.rsplit(None, 1) if not os.path.exists(os.path.join(base, line)) else [line]
+                entries.append((parts[0], parts[1] if len(parts) > 1 else None))
+        entries = [(os.path.join(base, path), case) for path, case in entries]
+
+    images, taken = [], set()
+    for path, case in entries:
+        case = case or os.path.splitext(os.path.basename(path))[0]
+        name, suffix = case, 2
+        while name in taken:
+            name, suffix = f'{case}-{suffix}', suffix + 1
+        taken.add(name)
+        images.append((os.path.abspath(path), name))
+    return images
+
+
+class BatchImage:
+    """Case directory, journal, case database and progress of one image of a batch
+
+    results keeps each plugin's status only; the rows go into the case
+    database as each result arrives and are not held until the image is done.
+    """
+
+    def __init__(self, image_path, case_name, case_path, plugins):
+        self.image_path = image_path
+        self.case_name = case_name
+        self.case_path = case_path
+        self.plugins = plugins
+        self.journal = ScanJournal(case_path)
+        self.ingestor = None
+        self.results = {}
+        self.remaining = 0
+        self.rows = {}
+        self.started = None
+        self.finished = None
+        self.error = None
+
+    def ingest(self, plugin_name, batches, catalog):
+        """Add a plugin's rows to the case database, opened on the first result"""
+        if self.ingestor is None:
+            try:
+                self.ingestor = Ingestor(os.path.join(self.case_path, CASE_DB_FILE))
+            except (OSError, sqlite3.Error) as e:
+                logger.error(f"Could not open the case database of {self.case_name}: {e}")
+                self.error = str(e)
+                return
+        count = self.ingestor.ingest_plugin(plugin_name, batches, columns_for(catalog, plugin_name))
+        if count is not None:
+            self.rows[plugin_name] = count
+
+    def summary(self):
+        failed = sorted(name for name, result in self.results.items()
+                        if not result.get('success') or result.get('demo'))
+        return {
+            'image': self.image_path,
+            'case': self.case_path,
+            'database': os.path.join(self.case_path, CASE_DB_FILE),
+            'status': 'failed' if self.error or (failed and len(failed) == len(self.results))
+                      else 'partial' if failed else 'ok',
+            'error': self.error,
+            'plugins': len(self.plugins),
+            'failed': failed,
+            'resumed': sorted(name for name, result in self.results.items() if result.get('resumed')),
+            'rows': self.rows,
+            'elapsed_s': round(self.finished - self.started, 3) if self.started and self.finished else None
+        }
+
+
+def run_batch(images, plugins, out_dir, max_workers=None, emit=None, budget_s=None, runner_options=None):
+    """Scan every (image, case name) with the plugins on one scheduler; returns the batch summary
+
+    Jobs of all images share the worker pool. The scheduler admits them by
+    priority and, within a priority, for the image with the fewest running
+    jobs, so every image gets its triage results early and none waits for
+    the others to finish. Each image's case directory is journaled as in
+    run_scan, so a repeated batch resumes. Each result goes into its image's
+    case database as it arrives (a resumed one from its saved file), so no
+    plugin output is held for long; the database is committed when the last
+    plugin of the image finishes.
+    Full image hashes are computed one image at a time in the background.
+    """
+    started = time.time()
+    os.makedirs(out_dir, exist_ok=True)
+    runner = VolatilityRunner(use_engine=False, use_cache=False, record_stats=False)
+    catalog = runner.catalog()
+    priorities = {plugin['name']: plugin['priority'] for plugin in runner.get_available_plugins() if plugin.get('priority')}
+    stats = RunStats()
+    # Kernel symbols of every image are found once here, not by every worker at once
+    runner_options = dict(runner_options or {},
+                          symbol_dirs=resolve_symbols([path for path, _ in images if os.path.isfile(path)]))
+    scheduler = PluginScheduler(max_workers=max_workers, runner_options=runner_options, on_update=None,
+                                catalog=catalog, priorities=priorities, stats=stats)
+    emit_lock = threading.Lock()
+
+    def report(event):
+        if emit:
+            with emit_lock:
+                emit(event)
+
+    batch = {}
+    for image_path, case_name in images:
+        if image_path in batch:
+            logger.warning(f"{image_path} is listed more than once in the batch, scanning it once")
+            continue
+        item = BatchImage(image_path, case_name, os.path.join(out_dir, case_name), plugins)
+        batch[image_path] = item
+        if not os.path.isfile(image_path):
+            item.error = 'image not found'
+            logger.error(f"Batch image not found: {image_path}")
+            continue
+        if budget_s:
+            item.plugins = stats.budgeted(image_path, plugins, budget_s, priorities, scheduler.max_workers)
+        item.journal.begin(image_path)
+        pending = item.journal.pending(item.plugins)
+        for plugin_name in item.plugins:
+            if plugin_name not in pending:
+                # Only finished plugins are journaled; their rows are read back from the file when ingested
+                item.results[plugin_name] = {'plugin': plugin_name, 'success': True, 'resumed': True}
+            else:
+                scheduler.submit(image_path, plugin_name)
+                item.remaining += 1
+
+    def finish_image(item):
+        try:
+            for plugin_name, result in sorted(item.results.items()):
+                if result.get('resumed'):
+                    item.ingest(plugin_name, read_batches(item.journal.output_path(plugin_name)), catalog)
+            if item.ingestor:
+                item.ingestor.close()
+                item.ingestor = None
+        except Exception as e:
+            logger.error(f"Could not build the case database of {item.case_name}: {e}")
+            item.error = str(e)
+        item.finished = time.time()
+        item.journal.close()
+        report({'event': 'image_finished', 'image': item.image_path, 'case': item.case_name,
+                'summary': item.summary()})
+        logger.info(f"Batch image {item.case_name} finished")
+
+    def on_update(event, job):
+        item = batch[job.image_path]
+        if event == 'started':
+            item.started = item.started or job.started
+            item.journal.start(job.plugin)
+            report({'event': 'started', 'image': item.image_path, 'case': item.case_name, 'plugin': job.plugin,
+                    'status': scheduler.status()})
+            return
+
+        result = job.result
+        try:
+            save_path = os.path.join(item.case_path, job.plugin + '.json')
+            write_output(save_path, json.dumps(result, default=str))
+            if result.get('success') and not result.get('demo'):
+                item.journal.finish(job.plugin, save_path)
+                if isinstance(result.get('output'), list):
+                    item.ingest(job.plugin, [result['output']], catalog)
+            else:
+                item.journal.fail(job.plugin, result.get('error') or result.get('original_error'))
+        except Exception as e:
+            logger.error(f"Could not save {job.plugin} of {item.case_name}: {e}")
+            result.update(success=False, error=f'could not save the result: {e}')
+        finally:
+            # The case file and database hold the rows from here on, not the scheduler's job;
+            # the count goes down even when saving failed, so the image is still finished
+            result.pop('output', None)
+            item.results[job.plugin] = result
+            item.remaining -= 1
+        report({'event': 'finished', 'image': item.image_path, 'case': item.case_name, 'plugin': job.plugin,
+                'success': bool(result.get('success')) and not result.get('demo'),
+                'remaining': item.remaining, 'status': scheduler.status()})
+        if item.remaining == 0:
+            finish_image(item)
+
+    scheduler.on_update = on_update
+
+    hashers = [ImageHasher(item.image_path, case_path=item.case_path) for item in batch.values() if not item.error]
+
+    def hash_images():
+        # One image at a time, so hashing does not compete with the workers for every disk at once
+        for hasher in hashers:
+            identity = hasher.start().wait()
+            report({'event': 'identity', 'image': hasher.image_path, 'identity': identity})
+
+    hashing = threading.Thread(target=hash_images, name='batch-hasher', daemon=True)
+    hashing.start()
+
+    report({'event': 'planned', 'images': len(batch), 'jobs': len(scheduler.jobs), 'workers': scheduler.max_workers})
+    # Images resumed in full, and images that cannot be read, are done before any job runs
+    for item in batch.values():
+        if item.remaining == 0:
+            item.started = item.started or time.time()
+            if item.error:
+                item.finished = time.time()
+                item.journal.close()
+            else:
+                finish_image(item)
+    scheduler.run()
+    # Images left unfinished (a callback failed, jobs were cancelled) still get their database committed
+    for item in batch.values():
+        if item.finished is None or item.ingestor:
+            finish_image(item)
+    hashing.join()
+    stats.close()
+
+    identities = {hasher.image_path: hasher.identity for hasher in hashers}
+    images_summary = []
+    for item in batch.values():
+        summary = item.summary()
+        identity = identities.get(item.image_path) or {}
+        summary.update({key: identity.get(key) for key in ('fingerprint', 'sha256', 'md5', 'size')})
+        images_summary.append(summary)
+
+    summary = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'plugins': plugins,
+        'workers': scheduler.max_workers,
+        'images': images_summary,
+        'totals': {status: sum(1 for image in images_summary if image['status'] == status)
+                   for status in ('ok', 'partial', 'failed')},
+        'elapsed_s': round(time.time() - started, 3)
+    }
+    write_output(os.path.join(out_dir, SUMMARY_FILE), json.dumps(summary, indent=2, default=str))
+    logger.info(f"Batch of {len(batch)} images finished in {summary['elapsed_s']:.0f}s: {summary['totals']}")
+    return summary
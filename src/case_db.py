@@ -0,0 +1,182 @@
+"""
+MemHawk Case Database
+Per-case SQLite database with typed columns (integer offsets and sizes,
+epoch times), lookup indexes, WAL journaling and versioned migrations
+
+Authors: Adriteyo Das, Anvita Warjri, Shivam Lahoty
+"""
+
+import os
+import re
+import sys
+import sqlite3
+import logging
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+CASE_DB_NAME = 'case.db'
+
+# Column name patterns that hold addresses, offsets or sizes (hex strings in text output)
+ADDRESS_COLUMN = re.compile(r'offset|^base$|^size$|address|vpn$|^virtual$|^physical$|^handlevalue$|^grantedaccess$',
+                            re.IGNORECASE)
+# Whole words of a column name that mark a time: CreateTime, Create Time, create_time, Date, but not Update
+TIME_WORDS = {'time', 'date', 'datetime', 'timestamp'}
+NAME_WORD = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+')
+COUNT_COLUMN = re.compile(r'^(pid|ppid|tid|threads|handles|sessionid|session|wow64|index|order|count)$', re.IGNORECASE)
+INDEX_COLUMN = re.compile(r'^(pid|ppid|name|imagefilename|process)$|^offset|^base$', re.IGNORECASE)
+
+# TreeGrid type names that are stored as integers
+INTEGER_TYPES = ('int', 'Hex', 'Bin', 'bool')
+
+
+def case_db_path(case_path):
+    """Database file of a case directory"""
+    return os.path.join(case_path, CASE_DB_NAME)
+
+
+def name_words(name):
+    """Lower-case words of a column name, split at spaces, underscores and camel case"""
+    return [word.lower() for word in NAME_WORD.findall(name)]
+
+
+def column_kind(name, type_name=None):
+    """How a column is stored: 'int' (hex text parsed), 'time' (epoch seconds), 'real' or 'text'"""
+    if type_name == 'datetime' or TIME_WORDS.intersection(name_words(name)):
+        return 'time'
+    if type_name == 'float':
+        return 'real'
+    if type_name in INTEGER_TYPES or COUNT_COLUMN.match(name) or ADDRESS_COLUMN.search(name):
+        return 'int'
+    return 'text'
+
+
+SQL_TYPES = {'int': 'INTEGER', 'time': 'INTEGER', 'real': 'REAL', 'text': 'TEXT'}
+
+
+def to_epoch(value):
+    """ISO-8601 or 'YYYY-MM-DD HH:MM:SS[ UTC]' text to epoch seconds; other values unchanged"""
+    if not isinstance(value, str):
+        return value
+    text = value.strip().replace(' UTC', '').replace('Z', '+00:00')
+    try:
+        moment = datetime.fromisoformat(text)
+    except ValueError:
+        return value
+    if moment.tzinfo is None:
+        # Volatility reports times in UTC
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
+
+
+def to_integer(value):
+    """'0x1f', '31' or 31 to 31; anything else unchanged (SQLite keeps it as text)"""
+    if isinstance(value, str):
+        text = value.strip()
+        try:
+            # Only 0x text is hex; '010' is ten, not sixteen (or an error, as with base 0)
+            return int(text, 16) if text.lower().lstrip('-').startswith('0x') else int(text, 10)
+        except ValueError:
+            return value
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+CONVERTERS = {'int': to_integer, 'time': to_epoch, 'real': lambda value: value, 'text': lambda value: value}
+
+
+def quote(identifier):
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def connect(db_path):
+    """Open a case database with WAL journaling, migrated to the current schema"""
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path, isolation_level=None, timeout=30)
+    conn.execute('pragma journal_mode = wal')
+    conn.execute('pragma synchronous = normal')
+    migrate(conn)
+    return conn
+
+
+def create_table(conn, table, columns):
+    """(Re)create a typed table; returns the per-column value converters"""
+    kinds = [column_kind(column['name'], column.get('type')) for column in columns]
+    definition = ', '.join(f"{quote(column['name'])} {SQL_TYPES[kind]}" for column, kind in zip(columns, kinds))
+    conn.execute(f'drop table if exists {quote(table)}')
+    conn.execute(f'create table {quote(table)} ({definition})')
+    return [CONVERTERS[kind] for kind in kinds]
+
+
+def create_indexes(conn, table):
+    """Index the PID, PPID, offset and name columns of a table"""
+    for _, name, _, _, _, _ in conn.execute(f'pragma table_info({quote(table)})').fetchall():
+        if INDEX_COLUMN.search(name):
+            index = re.sub(r'\W+', '_', f'idx_{table}_{name}')
+            conn.execute(f'create index if not exists {quote(index)} on {quote(table)} ({quote(name)})')
+
+
+def user_tables(conn):
+    return [row[0] for row in conn.execute(
+        "select name from sqlite_master where type = 'table' and name not like 'sqlite_%' and name != 'case_meta'")]
+
+
+def _migrate_0_to_1(conn):
+    """Rebuild legacy all-TEXT tables (analyze.db) with integer offsets, epoch times and indexes"""
+    for table in user_tables(conn):
+        names = [row[1] for row in conn.execute(f'pragma table_info({quote(table)})')]
+        columns = [{'name': name} for name in names]
+        temp = table + '__v1'
+        converters = create_table(conn, temp, columns)
+        rows = conn.execute(f'select * from {quote(table)}')
+        conn.executemany(f"insert into {quote(temp)} values ({', '.join('?' * len(names))})",
+                         ([convert(value) for convert, value in zip(converters, row)] for row in rows))
+        conn.execute(f'drop table {quote(table)}')
+        conn.execute(f'alter table {quote(temp)} rename to {quote(table)}')
+        create_indexes(conn, table)
+        logger.info(f"Migrated table {table} to schema 1")
+
+    conn.execute('create table if not exists case_meta (key text primary key, value text)')
+
+
+MIGRATIONS = {0: _migrate_0_to_1}
+
+
+def migrate(conn):
+    """Apply migrations up to SCHEMA_VERSION"""
+    version = conn.execute('pragma user_version').fetchone()[0]
+    while version < SCHEMA_VERSION:
+        conn.execute('begin')
+        try:
+            MIGRATIONS[version](conn)
+            version += 1
+            conn.execute(f'pragma user_version = {version}')
+            conn.execute('commit')
+        except Exception:
+            conn.execute('rollback')
+            raise
+    return version
+
+
+def set_meta(conn, key, value):
+    conn.execute('insert or replace into case_meta values (?, ?)', (key, str(value)))
+
+
+def get_meta(conn, key, default=None):
+    row = conn.execute('select value from case_meta where key = ?', (key,)).fetchone()
+    return row[0] if row else default
+
+
+def main():
+    """Migrate existing databases: python src/case_db.py analyze.db [...]"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    for db_path in sys.argv[1:]:
+        conn = connect(db_path)
+        print(f"{db_path}: schema version {conn.execute('pragma user_version').fetchone()[0]}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+MemHawk Command Line
+Headless scans for servers without a display: runs plugins on the
+scheduler, writes the case directory and case database, and prints one JSON
+status object
+
+    python memhawk.py scan --image mem.raw --plugins windows.pslist,windows.netscan --out case/host1
+    python memhawk.py batch --images incident/dumps --profile triage --out case/incident
+    python memhawk.py queue submit --queue /share/q --images /share/dumps --out /share/case
+    python memhawk.py queue work --queue /share/q --workers 4
+
+Only the standard library is imported until a command runs; PyQt5 and
+Electron are never needed.
+
+Authors: Adriteyo Das, Anvita Warjri, Shivam Lahoty
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import logging
+import argparse
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CASE_DB_FILE = 'case.db'
+LOG_FILE = 'memhawk.log'
+
+# Exit codes: every plugin succeeded, some failed, the scan could not run
+EXIT_OK = 0
+EXIT_PARTIAL = 1
+EXIT_ERROR = 2
+
+
+def setup_logging(case_path, verbose, log_file=LOG_FILE):
+    """Full log in the case directory; only warnings (or everything with -v) on stderr, never stdout"""
+    to_stderr = logging.StreamHandler(sys.stderr)
+    to_stderr.setLevel(logging.INFO if verbose else logging.WARNING)
+    # Configured before the bridge is imported, so its own basicConfig leaves this alone
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s',
+                        handlers=[logging.FileHandler(os.path.join(case_path, log_file)), to_stderr])
+
+
+def plugin_status(result):
+    """What the JSON status says about one plugin result"""
+    failed = not result.get('success') or result.get('demo')
+    status = {'success': not failed}
+    if isinstance(result.get('output'), list) and not failed:
+        status['rows'] = len(result['output'])
+    if failed:
+        status['error'] = result.get('original_error') or result.get('error') or 'no output'
+    for flag in ('resumed', 'cached', 'skipped'):
+        if result.get(flag):
+            status[flag] = True
+    return status
+
+
+def scan(args):
+    """The scan command; returns (status dict, exit code)"""
+    try:
+        from .volatility_bridge import run_scan
+        from .plugin_catalog import load_catalog
+        from .image_identity import read_case_info
+        from .ingest import ingest_results
+    except ImportError:
+        from volatility_bridge import run_scan
+        from plugin_catalog import load_catalog
+        from image_identity import read_case_info
+        from ingest import ingest_results
+
+    if not os.path.isfile(args.image):
+        return {'status': 'failed', 'error': f'image not found: {args.image}'}, EXIT_ERROR
+
+    started = time.time()
+    plugins = [name for name in args.plugins.split(',') if name]
+    results = run_scan(args.image, plugins, max_workers=args.workers, emit=progress_printer(args),
+                       budget_s=args.budget, case_dir=args.out)
+
+    db_path = os.path.join(args.out, CASE_DB_FILE)
+    rows = ingest_results(results, db_path, load_catalog())
+    if args.strings:
+        try:
+            from .strings_scan import store_strings
+        except ImportError:
+            from strings_scan import store_strings
+        rows['strings'] = store_strings(args.image, db_path)
+
+    statuses = {plugin_name: plugin_status(result) for plugin_name, result in results.items()}
+    for plugin_name, count in rows.items():
+        statuses.setdefault(plugin_name, {'success': True})['rows'] = count
+    failed = sorted(plugin_name for plugin_name, status in statuses.items() if not status['success'])
+    # Plugins left out by the budget never ran and are not failures
+    skipped_by_budget = [plugin_name for plugin_name in plugins if plugin_name not in results]
+
+    code = EXIT_OK if not failed else EXIT_PARTIAL if len(failed) < len(results) else EXIT_ERROR
+    status = {
+        'status': {EXIT_OK: 'ok', EXIT_PARTIAL: 'partial', EXIT_ERROR: 'failed'}[code],
+        'image': args.image,
+        'case': args.out,
+        'database': db_path,
+        'identity': read_case_info(args.out),
+        'plugins': statuses,
+        'failed': failed,
+        'not_run': skipped_by_budget,
+        'elapsed_s': round(time.time() - started, 3)
+    }
+    return status, code
+
+
+def batch(args):
+    """The batch command: every image of a directory or manifest with one plugin profile"""
+    try:
+        from .batch import load_images, profile_plugins, run_batch
+    except ImportError:
+        from batch import load_images, profile_plugins, run_batch
+
+    images = load_images(args.images)
+    if not images:
+        return {'status': 'failed', 'error': f'no images in {args.images}'}, EXIT_ERROR
+    summary = run_batch(images, profile_plugins(args.profile), args.out, max_workers=args.workers,
+                        emit=progress_printer(args), budget_s=args.budget)
+    totals = summary['totals']
+    code = EXIT_OK if totals['ok'] == len(summary['images']) else EXIT_ERROR if not totals['ok'] else EXIT_PARTIAL
+    summary['status'] = {EXIT_OK: 'ok', EXIT_PARTIAL: 'partial', EXIT_ERROR: 'failed'}[code]
+    return summary, code
+
+
+def progress_printer(args):
+    """Scan event callback writing NDJSON progress to stderr with --progress"""
+    def progress(event):
+        if args.progress:
+            print(json.dumps({key: value for key, value in event.items() if key != 'result'}, default=str),
+                  file=sys.stderr, flush=True)
+    return progress
+
+
+def queue(args):
+    """The queue command: submit a scan to a shared job queue, work on one, or report its state"""
+    try:
+        from .job_queue import JobQueue, run_workers
+        from .batch import load_images, profile_plugins
+    except ImportError:
+        from job_queue import JobQueue, run_workers
+        from batch import load_images, profile_plugins
+
+    if args.action == 'work':
+        jobs = run_workers(args.queue, args.workers, exit_when_idle=args.exit_when_idle)
+        return {'status': 'ok', 'queue': args.queue, 'jobs_run': jobs}, EXIT_OK
+
+    job_queue = JobQueue(args.queue)
+    try:
+        if args.action == 'submit':
+            images = load_images(args.images) if args.images else [(args.image, None)]
+            plugins = profile_plugins(args.profile)
+            queued = {}
+            for image_path, case_name in images:
+                if not os.path.isfile(image_path):
+                    queued[image_path] = 'image not found'
+                    continue
+                case_dir = os.path.join(args.out, case_name) if args.images else args.out
+                queued[image_path] = job_queue.submit(image_path, plugins, case_dir)
+            code = EXIT_OK if all(isinstance(count, int) for count in queued.values()) else EXIT_PARTIAL
+            return {'status': 'ok' if code == EXIT_OK else 'partial', 'queue': job_queue.path,
+                    'queued': queued}, code
+        return dict(job_queue.status(), status='ok'), EXIT_OK
+    finally:
+        job_queue.close()
+
+
+COMMANDS = {'scan': scan, 'batch': batch, 'queue': queue}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='memhawk', description='MemHawk headless memory forensics')
+    commands = parser.add_subparsers(dest='command', required=True)
+    scan_parser = commands.add_parser('scan', help='run plugins on an image into a case directory and database')
+    scan_parser.add_argument('--image', required=True, help='memory image')
+    scan_parser.add_argument('--plugins', required=True, help='comma separated plugin names')
+    scan_parser.add_argument('--out', required=True, help='case directory; an interrupted scan resumes from it')
+    scan_parser.add_argument('--workers', type=int, help='worker processes (default: by CPU and memory)')
+    scan_parser.add_argument('--budget', type=float, help='seconds; run only the plugins predicted to fit')
+    scan_parser.add_argument('--strings', action='store_true', help='also store the image strings in the database')
+    scan_parser.add_argument('--progress', action='store_true', help='write NDJSON progress events to stderr')
+    scan_parser.add_argument('-v', '--verbose', action='store_true', help='log to stderr as well as the case log')
+
+    batch_parser = commands.add_parser('batch', help='scan many images on one worker pool, one case each')
+    batch_parser.add_argument('--images', required=True,
+                              help='directory of images, or a manifest (JSON list or "path [case]" lines)')
+    batch_parser.add_argument('--profile', default='triage',
+                              help='triage, standard, full or comma separated plugin names (default triage)')
+    batch_parser.add_argument('--out', required=True, help='directory for the case directories and batch summary')
+    batch_parser.add_argument('--workers', type=int, help='worker processes shared by all images')
+    batch_parser.add_argument('--budget', type=float, help='seconds per image; run only the plugins predicted to fit')
+    batch_parser.add_argument('--progress', action='store_true', help='write NDJSON progress events to stderr')
+    batch_parser.add_argument('-v', '--verbose', action='store_true', help='log to stderr as well as the batch log')
+
+    queue_parser = commands.add_parser('queue', help='shared SQLite job queue for workers on several hosts')
+    actions = queue_parser.add_subparsers(dest='action', required=True)
+    submit_parser = actions.add_parser('submit', help='queue the plugins of one or more images')
+    images = submit_parser.add_mutually_exclusive_group(required=True)
+    images.add_argument('--image', help='memory image, scanned into --out')
+    images.add_argument('--images', help='directory or manifest of images, one case each under --out')
+    submit_parser.add_argument('--profile', default='triage',
+                               help='triage, standard, full or comma separated plugin names (default triage)')
+    submit_parser.add_argument('--out', required=True, help='case directory (or directory of cases)')
+    work_parser = actions.add_parser('work', help='claim and run queued jobs on this host')
+    work_parser.add_argument('--workers', type=int, default=1, help='worker processes on this host')
+    work_parser.add_argument('--exit-when-idle', action='store_true',
+                             help='stop once nothing is queued or running instead of waiting for more')
+    actions.add_parser('status', help='job counts by state, case and worker')
+    for parser_ in (submit_parser, work_parser, actions.choices['status']):
+        parser_.add_argument('--queue', required=True, help='shared directory (or .db file) of the queue')
+        parser_.add_argument('-v', '--verbose', action='store_true', help='log to stderr as well as the queue log')
+    return parser
+
+
+def main(argv=None):
+    """memhawk <command> ...; prints a JSON status on stdout and returns the exit code"""
+    args = build_parser().parse_args(argv)
+    # Paths are the caller's, resolved before moving to the MemHawk directory
+    for name in ('image', 'images', 'out', 'queue'):
+        if getattr(args, name, None):
+            setattr(args, name, os.path.abspath(getattr(args, name)))
+    if args.command == 'queue':
+        log_dir = os.path.dirname(args.queue) if os.path.splitext(args.queue)[1] else args.queue
+        # Workers on several hosts share the queue directory, so each host logs to its own file
+        log_file = f'worker-{socket.gethostname()}.log' if args.action == 'work' else LOG_FILE
+    else:
+        log_dir, log_file = args.out, LOG_FILE
+    os.makedirs(log_dir, exist_ok=True)
+    setup_logging(log_dir, args.verbose, log_file)
+    # Caches, catalogues and the bundled Volatility are found relative to the MemHawk directory
+    os.chdir(ROOT_DIR)
+
+    try:
+        status, code = COMMANDS[args.command](args)
+    except Exception as e:
+        logging.getLogger(__name__).exception(f"{args.command} failed")
+        status, code = {'status': 'failed', 'error': str(e)}, EXIT_ERROR
+    print(json.dumps(status, indent=2, default=str))
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+MemHawk Fused Pool Scan
+Runs several pool-tag scanning plugins from a single pass over the physical
+layer: every requested tag is matched in one scan and each plugin's hits are
+handed back to that plugin's own object parser
+
+Authors: Adriteyo Das, Anvita Warjri, Shivam Lahoty
+"""
+
+import inspect
+import logging
+
+try:
+    from .volatility_engine import EngineError
+except ImportError:
+    from volatility_engine import EngineError
+
+logger = logging.getLogger(__name__)
+
+# Plugin -> (scan classmethod its generator calls, pool tags that method searches for)
+FUSED_PLUGINS = {
+    'windows.psscan': ('scan_processes', (b'Pro\xe3', b'Proc')),
+    'windows.filescan': ('scan_files', (b'Fil\xe5',)),
+    'windows.mutantscan': ('scan_mutants', (b'Mut\xe1',)),
+    'windows.symlinkscan': ('scan_symlinks', (b'Sym\xe7',)),
+    'windows.modscan': ('scan_modules', (b'MmLd',)),
+    'windows.driverscan': ('scan_drivers', (b'Dri\xf6',)),
+}
+
+
+def fusable(plugin_names):
+    """The plugins in a list that can share a fused pool scan"""
+    return [name for name in plugin_names if name in FUSED_PLUGINS]
+
+
+def kernel_names(context, plugin):
+    """Physical-backed kernel layer and symbol table a constructed plugin resolved"""
+    config = plugin.config
+    if 'kernel' in config:
+        kernel = context.modules[config['kernel']]
+        return config['kernel'], kernel.layer_name, kernel.symbol_table_name
+    # Volatility releases before kernel modules
+    return None, config['primary'], config['nt_symbols']
+
+
+def pool_scan(context, kernel_module, layer_name, symbol_table, tags):
+    """One PoolScanner pass matching every tag; yields (tag, object) hits"""
+    from volatility3.plugins.windows import poolscanner
+
+    constraints = poolscanner.PoolScanner.builtin_constraints(symbol_table, list(tags))
+    if 'symbol_table' in inspect.signature(poolscanner.PoolScanner.generate_pool_scan).parameters:
+        results = poolscanner.PoolScanner.generate_pool_scan(context, layer_name, symbol_table, constraints)
+    else:
+        results = poolscanner.PoolScanner.generate_pool_scan(context, kernel_module, constraints)
+
+    for constraint, mem_object, _header in results:
+        yield constraint.tag, mem_object
+
+
+def replay(objects):
+    """Stand-in for a plugin's scan classmethod that yields pre-scanned objects"""
+    def scan(*args, filter_func=None, **kwargs):
+        for mem_object in objects:
+            if filter_func is None or not filter_func(mem_object):
+                yield mem_object
+    return scan
+
+
+def run_fused(engine, image_path, plugin_names, on_batch, params=None, batch_size=1000, output_dir=None):
+    """Scan once for all requested plugins' pool tags, then render each plugin's rows
+
+    on_batch(plugin_name, rows, columns) receives rows shaped exactly as the
+    individual plugin produces them. Returns {plugin: {'columns', 'row_count'}}.
+    """
+    plugin_names = fusable(plugin_names)
+    if not plugin_names:
+        return {}
+
+    session = engine._session(image_path)
+    context = session.context
+
+    constructed = {}
+    for plugin_name in plugin_names:
+        method = FUSED_PLUGINS[plugin_name][0]
+        try:
+            plugin = engine._construct(session, engine._find_plugin(plugin_name),
+                                       (params or {}).get(plugin_name), output_dir)
+        except EngineError:
+            raise
+        except Exception as e:
+            raise EngineError(f"{plugin_name} failed: {e}") from e
+        if not hasattr(plugin, method):
+            raise EngineError(f"{plugin_name} has no {method}; this Volatility release cannot be fused")
+        constructed[plugin_name] = plugin
+
+    kernel_module, layer_name, symbol_table = kernel_names(context, constructed[plugin_names[0]])
+
+    by_tag = {}
+    for plugin_name in plugin_names:
+        for tag in FUSED_PLUGINS[plugin_name][1]:
+            by_tag.setdefault(tag, []).append(plugin_name)
+
+    hits = {plugin_name: [] for plugin_name in plugin_names}
+    try:
+        for tag, mem_object in pool_scan(context, kernel_module, layer_name, symbol_table, by_tag):
+            for plugin_name in by_tag.get(tag, ()):
+                hits[plugin_name].append(mem_object)
+    except Exception as e:
+        raise EngineError(f"Fused pool scan failed: {e}") from e
+    logger.info(f"Fused pool scan of {len(by_tag)} tags: " +
+                ', '.join(f"{name} {len(objects)}" for name, objects in hits.items()))
+
+    summaries = {}
+    for plugin_name, plugin in constructed.items():
+        # The plugin's generator calls self.<scan method>; an instance attribute shadows the classmethod
+        setattr(plugin, FUSED_PLUGINS[plugin_name][0], replay(hits[plugin_name]))
+        try:
+            grid = plugin.run()
+        except Exception as e:
+            raise EngineError(f"{plugin_name} failed: {e}") from e
+        summaries[plugin_name] = engine._stream_grid(
+            session, plugin_name, grid, lambda rows, columns, name=plugin_name: on_batch(name, rows, columns),
+            batch_size)
+    return summaries
@@ -641,6 +641,8 @@ ${aiReport}
 - **Failed Scans:** ${pluginCount - successfulScans}
 - **Analysis Date:** ${timestamp}
 - **Memory Image:** ${imageInfo.filename || 'Unknown'}
+- **Image SHA-256:** ${imageInfo.sha256 || 'Not computed'}
+- **Image MD5:** ${imageInfo.md5 || 'Not computed'}
 
 ## Detailed Plugin Results
 
@@ -0,0 +1,178 @@
+"""
+MemHawk Image Identity
+Two identities of a memory image: the sampled fingerprint used by the caches
+and the journal, ready in milliseconds, and the full SHA-256 and MD5 for the
+case record and signed report, hashed in the background while plugins run
+
+Authors: Adriteyo Das, Anvita Warjri, Shivam Lahoty
+"""
+
+import os
+import json
+import mmap
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+
+try:
+    from .result_cache import image_fingerprint
+    from .scan_journal import write_output
+    from .tracing import span
+except ImportError:
+    from result_cache import image_fingerprint
+    from scan_journal import write_output
+    from tracing import span
+
+logger = logging.getLogger(__name__)
+
+HASH_DB = os.path.join('cache', 'image_hashes.db')
+# Case metadata the report reads the image identity from
+CASE_INFO_FILE = 'image.json'
+CHUNK_SIZE = 64 * 1024 * 1024
+
+
+def full_hashes(image_path, chunk_size=CHUNK_SIZE):
+    """(sha256, md5) hex digests of a whole image in one mmap pass
+
+    Chunks are handed to hashlib as memoryviews of the mapping, so nothing is
+    copied and the GIL is released while each chunk is hashed.
+    """
+    sha256, md5 = hashlib.sha256(), hashlib.md5()
+    size = os.path.getsize(image_path)
+    with open(image_path, 'rb') as f:
+        if size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    for offset in range(0, size, chunk_size):
+                        chunk = view[offset:offset + chunk_size]
+                        sha256.update(chunk)
+                        md5.update(chunk)
+                        chunk.release()
+                finally:
+                    view.release()
+    return sha256.hexdigest(), md5.hexdigest()
+
+
+class HashStore:
+    """Full hashes already computed, keyed by path, size and modification time"""
+
+    def __init__(self, db_path=HASH_DB):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.conn.execute('pragma journal_mode=wal')
+        self.conn.execute('create table if not exists hashes (path text, size int, mtime_ns int, fingerprint text, '
+                          'sha256 text, md5 text, seconds real, primary key (path, size, mtime_ns))')
+        self.conn.commit()
+
+    @staticmethod
+    def _key(image_path):
+        stat = os.stat(image_path)
+        return os.path.abspath(image_path), stat.st_size, stat.st_mtime_ns
+
+    def get(self, image_path):
+        row = self.conn.execute('select fingerprint, sha256, md5 from hashes where path = ? and size = ? '
+                                'and mtime_ns = ?', self._key(image_path)).fetchone()
+        return dict(zip(('fingerprint', 'sha256', 'md5'), row)) if row else None
+
+    def put(self, image_path, identity, seconds):
+        self.conn.execute('insert or replace into hashes values (?, ?, ?, ?, ?, ?, ?)',
+                          self._key(image_path) + (identity['fingerprint'], identity['sha256'], identity['md5'],
+                                                   seconds))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def image_identity(image_path):
+    """{'image', 'filename', 'size', 'fingerprint'}: what is known of an image without reading it all"""
+    return {
+        'image': os.path.abspath(image_path),
+        'filename': os.path.basename(image_path),
+        'size': os.path.getsize(image_path),
+        'fingerprint': image_fingerprint(image_path)
+    }
+
+
+def write_case_info(case_path, identity):
+    """Store an image identity in the case directory, where the report picks it up"""
+    os.makedirs(case_path, exist_ok=True)
+    write_output(os.path.join(case_path, CASE_INFO_FILE), json.dumps(identity, indent=2))
+
+
+def read_case_info(case_path):
+    try:
+        with open(os.path.join(case_path, CASE_INFO_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class ImageHasher:
+    """Full SHA-256/MD5 of an image on a background thread, started alongside a scan
+
+        hasher = ImageHasher(image_path, on_done=callback, case_path=case).start()
+        ... run plugins ...
+        identity = hasher.wait()
+
+    on_done receives the identity dict (with 'sha256' and 'md5', or 'error')
+    on the hashing thread. Hashes of an unchanged image come from the
+    HashStore instead of being computed again.
+    """
+
+    def __init__(self, image_path, on_done=None, case_path=None, db_path=HASH_DB):
+        self.image_path = image_path
+        self.on_done = on_done
+        self.case_path = case_path
+        self.db_path = db_path
+        self.identity = image_identity(image_path)
+        self._thread = threading.Thread(target=self._run, name='image-hasher', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        identity = dict(self.identity)
+        try:
+            store = HashStore(self.db_path)
+        except (OSError, sqlite3.Error) as e:
+            logger.debug(f"Image hash store unavailable: {e}")
+            store = None
+        try:
+            known = store.get(self.image_path) if store else None
+            if known and known['fingerprint'] == identity['fingerprint']:
+                identity.update(known, hashed=None)
+            else:
+                started = time.time()
+                with span('image.hash', 'io', image=identity['filename'], size=identity['size']):
+                    identity['sha256'], identity['md5'] = full_hashes(self.image_path)
+                identity['hashed'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+                seconds = time.time() - started
+                logger.info(f"Hashed {identity['filename']} in {seconds:.1f}s "
+                            f"({identity['size'] / max(seconds, 1e-6) / (1024 * 1024):.0f} MB/s)")
+                if store:
+                    store.put(self.image_path, identity, seconds)
+            identity = {key: value for key, value in identity.items() if value is not None}
+            if self.case_path:
+                write_case_info(self.case_path, identity)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            logger.error(f"Could not hash {self.image_path}: {e}")
+            identity['error'] = str(e)
+        finally:
+            if store:
+                store.close()
+        self.identity = identity
+        if self.on_done:
+            self.on_done(identity)
+
+    def done(self):
+        return not self._thread.is_alive()
+
+    def wait(self, timeout=None):
+        """The identity, with the full hashes once the thread has finished"""
+        self._thread.join(timeout)
+        return self.identity
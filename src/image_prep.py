@@ -0,0 +1,206 @@
+"""
+MemHawk Image Preparation
+Flattens container formats (crash dumps, VMware vmem/vmss, LiME, ELF cores,
+hibernation files) once into a sparse, page-aligned raw layer plus a run
+map, so later plugin runs open a plain raw image instead of rebuilding the
+container's page runs every time. Plugins that read the container's own
+header (windows.crashinfo) keep opening the original image
+
+Authors: Adriteyo Das, Anvita Warjri, Shivam Lahoty
+"""
+
+import os
+import sys
+import json
+import logging
+
+try:
+    from .result_cache import image_fingerprint
+except ImportError:
+    from result_cache import image_fingerprint
+
+logger = logging.getLogger(__name__)
+
+LAYER_DIR = os.path.join('cache', 'layers')
+PAGE_SIZE = 0x1000
+COPY_SIZE = 16 * 1024 * 1024
+# FSCTL_SET_SPARSE: without it NTFS writes every hole of the layer out as zeros
+FSCTL_SET_SPARSE = 0x900C4
+# Plugins that read the container's own header, which the flattened layer does not keep
+HEADER_PLUGINS = ('windows.crashinfo', 'windows.hibernation.Info')
+
+
+def container_format(image_path):
+    """Container format of an image, or None for a raw image that needs no preparation"""
+    try:
+        with open(image_path, 'rb') as f:
+            magic = f.read(8)
+    except OSError:
+        return None
+
+    if magic.startswith(b'PAGEDU'):
+        return 'crashdump'
+    if magic.startswith(b'EMiL'):
+        return 'lime'
+    if magic.startswith(b'\x7fELF'):
+        return 'elf'
+    if magic[:4] in (b'hibr', b'HIBR', b'wake', b'WAKE'):
+        return 'hibernation'
+    stem = os.path.splitext(image_path)[0]
+    if image_path.lower().endswith('.vmem') and any(os.path.exists(stem + ext) for ext in ('.vmss', '.vmsn')):
+        return 'vmware'
+    return None
+
+
+def layer_paths(image_path):
+    """(raw layer, run map) paths of an image's flattened layer"""
+    base = os.path.abspath(os.path.join(LAYER_DIR, image_fingerprint(image_path)))
+    return base + '.raw', base + '.runs.json'
+
+
+def prepared_layer(image_path):
+    """The flattened raw layer of an image if it has been prepared, else None"""
+    try:
+        raw_path, runs_path = layer_paths(image_path)
+    except OSError:
+        return None
+    return raw_path if os.path.exists(runs_path) and os.path.exists(raw_path) else None
+
+
+def physical_layer(context, layer_name):
+    """Walk down from a stacked layer past the CPU translation layers to the physical one"""
+    layer = context.layers[layer_name]
+    while 'page_map_offset' in layer.config and layer.config.get('memory_layer') in context.layers:
+        layer = context.layers[layer.config['memory_layer']]
+    return layer
+
+
+def needs_container(plugin_name):
+    """True for plugins that must open the original image rather than its flattened layer"""
+    return plugin_name in HEADER_PLUGINS
+
+
+def mark_sparse(f):
+    """Make a newly created file sparse on Windows; False if the file system cannot
+
+    Elsewhere seeking past data already leaves holes, so there is nothing to do.
+    """
+    if sys.platform != 'win32':
+        return True
+    import ctypes
+    import msvcrt
+    from ctypes import wintypes
+
+    returned = wintypes.DWORD()
+    return bool(ctypes.windll.kernel32.DeviceIoControl(wintypes.HANDLE(msvcrt.get_osfhandle(f.fileno())),
+                                                       FSCTL_SET_SPARSE, None, 0, None, 0,
+                                                       ctypes.byref(returned), None))
+
+
+def merge_runs(runs):
+    """Adjacent or overlapping [start, length] runs joined, in address order"""
+    merged = []
+    for start, length in sorted(runs):
+        if merged and start <= merged[-1][0] + merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], start + length - merged[-1][0])
+        else:
+            merged.append([start, length])
+    return merged
+
+
+def flatten(engine, image_path):
+    """Write the image's physical layer as a sparse raw file with a run map; returns the raw path
+
+    Only mapped runs are written, at their physical offsets, so unmapped
+    ranges stay holes in the file and read back as zeros, as Volatility pads them.
+    Returns None, and plugins keep reading the container, where the layer
+    cannot be written sparse.
+    """
+    raw_path, runs_path = layer_paths(image_path)
+    if os.path.exists(runs_path) and os.path.exists(raw_path):
+        return raw_path
+
+    session = engine._session(image_path)
+    context = session.context
+    # Constructing layerwriter runs the layer stacker and nothing else
+    plugin = engine._construct(session, engine._find_plugin('layerwriter'), None, None)
+    layer = physical_layer(context, plugin.config['primary'])
+    if type(layer).__name__ == 'FileLayer':
+        logger.info(f"{os.path.basename(image_path)} is already a raw image")
+        return None
+
+    runs = []
+    for offset, length, _, _, _ in layer.mapping(0, layer.maximum_address + 1, ignore_errors=True):
+        start = offset - offset % PAGE_SIZE
+        end = -(-(offset + length) // PAGE_SIZE) * PAGE_SIZE
+        runs.append([start, min(end, layer.maximum_address + 1) - start])
+    runs = merge_runs(runs)
+
+    os.makedirs(os.path.dirname(raw_path), exist_ok=True)
+    with open(raw_path + '.tmp', 'wb') as f:
+        sparse = mark_sparse(f)
+        if sparse:
+            for start, length in runs:
+                for chunk in range(start, start + length, COPY_SIZE):
+                    f.seek(chunk)
+                    f.write(layer.read(chunk, min(COPY_SIZE, start + length - chunk), pad=True))
+            f.truncate(layer.maximum_address + 1)
+    if not sparse:
+        # A dense copy of the whole physical address space is not worth writing
+        os.remove(raw_path + '.tmp')
+        logger.warning(f"{os.path.dirname(raw_path)} cannot hold sparse files, "
+                       f"plugins will read {os.path.basename(image_path)} directly")
+        return None
+    os.replace(raw_path + '.tmp', raw_path)
+
+    run_map = {
+        'source': os.path.abspath(image_path),
+        'format': container_format(image_path),
+        'layer': type(layer).__name__,
+        'size': layer.maximum_address + 1,
+        'page_size': PAGE_SIZE,
+        'runs': runs
+    }
+    with open(runs_path, 'w', encoding='utf-8') as f:
+        json.dump(run_map, f)
+
+    engine.unload_image(image_path)
+    logger.info(f"Flattened {os.path.basename(image_path)} ({run_map['layer']}) into {len(runs)} runs, "
+                f"{sum(length for _, length in runs) // (1024 * 1024)} MB mapped")
+    return raw_path
+
+
+def prepare_image(image_path, engine=None):
+    """Path plugins should open for an image: its flattened layer for container formats, else the image
+
+    Plugins in HEADER_PLUGINS still open the image itself (see needs_container).
+    """
+    if not container_format(image_path):
+        return image_path
+    layer = prepared_layer(image_path)
+    if layer:
+        return layer
+    if engine is None:
+        try:
+            from .volatility_engine import VolatilityEngine
+        except ImportError:
+            from volatility_engine import VolatilityEngine
+        engine = VolatilityEngine()
+    try:
+        return flatten(engine, image_path) or image_path
+    except Exception as e:
+        logger.warning(f"Could not flatten {os.path.basename(image_path)}, plugins will read it directly: {e}")
+        return image_path
+
+
+def main():
+    """Flatten an image once: python src/image_prep.py image.dmp"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if len(sys.argv) < 2:
+        print(main.__doc__)
+        return
+    print(prepare_image(sys.argv[1]))
+
+
+if __name__ == "__main__":
+    main()
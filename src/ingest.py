@@ -0,0 +1,345 @@
+"""
+MemHawk Ingestion
+Loads Volatility JSON/TreeGrid rows into SQLite, deriving each table's
+schema from the plugin's column types and inserting in large batches
+inside a single transaction
+
+Authors: Adriteyo Das, Anvita Warjri, Shivam Lahoty
+"""
+
+import os
+import json
+import sqlite3
+import logging
+
+try:
+    from . import case_db
+    from .case_db import quote
+    from .plugin_catalog import columns_for
+    from .tracing import span
+except ImportError:
+    import case_db
+    from case_db import quote
+    from plugin_catalog import columns_for
+    from tracing import span
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 10000
+# Characters read at a time from a JSON output file
+READ_CHUNK = 1024 * 1024
+# Characters that can go on a JSON number; no value is followed by one in a valid document
+NUMBER_CHARS = frozenset('0123456789.eE+-')
+
+
+def table_name(plugin_name):
+    """SQLite table for a plugin, e.g. windows.registry.printkey -> registry_printkey"""
+    name = plugin_name
+    for prefix in ('windows.', 'linux.', 'mac.'):
+        if name.startswith(prefix):
+            name = name[len(prefix):]
+            break
+    return name.replace('.', '_')
+
+
+def flatten(rows):
+    """Depth-first rows without the nested __children lists"""
+    for row in rows:
+        children = row.get('__children') or []
+        yield {key: value for key, value in row.items() if key != '__children'}
+        if children:
+            yield from flatten(children)
+
+
+def infer_columns(rows):
+    """Column definitions inferred from row values when no TreeGrid types are known"""
+    columns = {}
+    for row in rows:
+        for key, value in row.items():
+            if key == '__children' or (key in columns and columns[key] is not None):
+                continue
+            if value is None:
+                columns.setdefault(key, None)
+            elif isinstance(value, (bool, int)):
+                columns[key] = 'int'
+            elif isinstance(value, float):
+                columns[key] = 'float'
+            else:
+                columns[key] = 'str'
+    return [{'name': name, 'type': column_type or 'str'} for name, column_type in columns.items()]
+
+
+def sql_value(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return value
+
+
+class Ingestor:
+    """Writes every plugin's rows into one case database in a single transaction"""
+
+    def __init__(self, db_path, batch_size=BATCH_SIZE):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.conn = case_db.connect(db_path)
+        self.conn.execute('begin')
+        self.counts = {}
+
+    def create_table(self, plugin_name, columns):
+        """(Re)create the plugin's typed table; returns its name and value converters"""
+        table = table_name(plugin_name)
+        return table, case_db.create_table(self.conn, table, columns)
+
+    def ingest(self, plugin_name, batches, columns=None):
+        """Insert batches of (possibly nested) rows; returns the row count"""
+        with span('ingest.table', 'ingest', plugin=plugin_name) as traced:
+            count = self._ingest(plugin_name, batches, columns)
+            traced.args['rows'] = count
+        return count
+
+    def _ingest(self, plugin_name, batches, columns):
+        table = None
+        names = None
+        pending = []
+        count = 0
+
+        for batch in batches:
+            rows = list(flatten(batch))
+            if not rows:
+                continue
+            if table is None:
+                # Declared columns are used only if they cover what the rows carry
+                if columns and not set(rows[0]) <= {column['name'] for column in columns}:
+                    columns = None
+                columns = columns or infer_columns(rows)
+                table, converters = self.create_table(plugin_name, columns)
+                names = [column['name'] for column in columns]
+                fields = list(zip(names, converters))
+                insert = (f"insert into {quote(table)} ({', '.join(quote(name) for name in names)}) "
+                          f"values ({', '.join('?' * len(names))})")
+
+            pending.extend([sql_value(convert(row.get(name))) for name, convert in fields] for row in rows)
+            if len(pending) >= self.batch_size:
+                self.conn.executemany(insert, pending)
+                count += len(pending)
+                pending = []
+
+        if pending:
+            self.conn.executemany(insert, pending)
+            count += len(pending)
+        if table is None and columns:
+            table, _ = self.create_table(plugin_name, columns)
+        if table is not None:
+            # Indexes are built once after the bulk insert rather than maintained per row
+            with span('ingest.indexes', 'ingest', table=table):
+                case_db.create_indexes(self.conn, table)
+
+        self.counts[plugin_name] = count
+        logger.info(f"Ingested {count} rows from {plugin_name}")
+        return count
+
+    def ingest_plugin(self, plugin_name, batches, columns=None):
+        """ingest() inside a savepoint, so one bad plugin cannot leave a half-filled table; None if it failed"""
+        self.conn.execute('savepoint plugin')
+        try:
+            count = self.ingest(plugin_name, batches, columns)
+            self.conn.execute('release plugin')
+            return count
+        except (ValueError, TypeError, AttributeError, sqlite3.Error) as e:
+            self.conn.execute('rollback to plugin')
+            self.conn.execute('release plugin')
+            logger.error(f"Could not ingest {plugin_name}: {e}")
+            return None
+
+    def ingest_events(self, events):
+        """Ingest a VolatilityRunner.stream_plugin event stream"""
+        events = (event for event in events if event['type'] == 'rows')
+        first = next(events, None)
+        if first is None:
+            return 0
+
+        def batches():
+            yield first['rows']
+            for event in events:
+                yield event['rows']
+
+        return self.ingest(first['plugin'], batches(), columns=first.get('columns'))
+
+    def commit(self):
+        self.conn.execute('commit')
+        self.conn.execute('begin')
+
+    def close(self, commit=True):
+        self.conn.execute('commit' if commit else 'rollback')
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close(commit=exc_type is None)
+
+
+class JsonReader:
+    """Values of a JSON document parsed a chunk at a time, so a large array is never loaded whole"""
+
+    def __init__(self, f, chunk_size=READ_CHUNK):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        chunk = self.f.read(self.chunk_size)
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        self.eof = not chunk
+        return bool(chunk)
+
+    def peek(self):
+        """The next non-whitespace character, '' at the end of the file"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Malformed JSON: expected {char!r}")
+        self.pos += 1
+
+    def _separator(self, close):
+        """Consume a ',' or the closing bracket; True at the closing bracket"""
+        char = self.peek()
+        self.pos += 1
+        if char == close:
+            return True
+        if char != ',':
+            raise ValueError(f"Malformed JSON: expected ',' or {close!r}")
+        return False
+
+    def value(self):
+        """Decode the next complete value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number ending the buffer, or cut before its '.', exponent or sign, may go on in the next chunk
+                if self.eof or (end < len(self.buffer) and self.buffer[end] not in NUMBER_CHARS):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def items(self):
+        """Elements of the array starting here, one at a time"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self._separator(']'):
+                return
+
+    def members(self):
+        """Keys of the object starting here; the caller reads each value before asking for the next key"""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(':')
+            yield key
+            if self._separator('}'):
+                return
+
+
+def batched(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def read_batches(path, batch_size=BATCH_SIZE):
+    """Row batches from a plugin output file, parsed incrementally
+
+    Reads JSON lines (-r jsonl), a JSON array (-r json) or a result file as
+    run_scan and run_batch write into a case directory ({'success': ...,
+    'output': [...]}), whose rows are unwrapped. A result file without rows,
+    or of a failed or demo run, raises ValueError (after its rows, if any).
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        reader = JsonReader(f)
+        head = reader.peek()
+
+        if head == '[':
+            yield from batched(reader.items(), batch_size)
+            return
+
+        if head == '{':
+            result, streamed = {}, False
+            for key in reader.members():
+                if key == 'output' and reader.peek() == '[':
+                    streamed = True
+                    yield from batched(reader.items(), batch_size)
+                else:
+                    result[key] = reader.value()
+            if streamed or {'success', 'output'} <= set(result):
+                if not streamed or not result.get('success') or result.get('demo'):
+                    raise ValueError(f"{os.path.basename(path)} is not a successful JSON result")
+                return
+
+        # JSON lines, after any banner vol printed; the object above was the first of them
+        f.seek(0)
+        yield from batched((json.loads(line) for line in f if line.startswith('{')), batch_size)
+
+
+def ingest_directory(directory, db_path, catalog=None):
+    """Load every <plugin>.json / <plugin>.jsonl output in a directory in one pass
+
+    Vol output files and the result files of a case directory are both read;
+    failed and demo results are left out. With a plugin catalogue, tables take
+    the plugins' declared column types and are created even for plugins that
+    produced no rows.
+    """
+    counts = {}
+    with Ingestor(db_path) as ingestor:
+        for entry in sorted(os.scandir(directory), key=lambda entry: entry.name):
+            plugin_name, extension = os.path.splitext(entry.name)
+            # Plugin names are dotted; this skips a case directory's image.json
+            if extension not in ('.json', '.jsonl') or '.' not in plugin_name:
+                continue
+            count = ingestor.ingest_plugin(plugin_name, read_batches(entry.path), columns_for(catalog, plugin_name))
+            if count is not None:
+                counts[plugin_name] = count
+    return counts
+
+
+def ingest_results(results, db_path, catalog=None):
+    """Load the rows of successful JSON plugin results ({plugin: result}) into a case database
+
+    Returns {plugin: rows}; failed, demo and text results are left out.
+    """
+    counts = {}
+    with Ingestor(db_path) as ingestor:
+        for plugin_name, result in sorted(results.items()):
+            if not result.get('success') or result.get('demo') or not isinstance(result.get('output'), list):
+                continue
+            count = ingestor.ingest_plugin(plugin_name, [result['output']], columns_for(catalog, plugin_name))
+            if count is not None:
+                counts[plugin_name] = count
+    return counts
@@ -0,0 +1,289 @@
+"""
+MemHawk IOC Scan
+Matches a whole IOC set (domains, mutex names, byte stubs) in one pass over
+the raw image or over every process's VADs, using a single Aho-Corasick
+automaton so scan time does not grow with the number of IOCs
+
+Authors: Adriteyo Das, Anvita Warjri, Shivam Lahoty
+"""
+
+import os
+import re
+import sys
+import json
+import inspect
+import hashlib
+import argparse
+import logging
+
+try:
+    from . import case_db
+    from .case_db import quote
+    from .parallel_scan import CHUNK_SIZE, scan_chunks, _image_map
+    from .fused_scan import kernel_names
+except ImportError:
+    import case_db
+    from case_db import quote
+    from parallel_scan import CHUNK_SIZE, scan_chunks, _image_map
+    from fused_scan import kernel_names
+
+logger = logging.getLogger(__name__)
+
+IOC_TABLE = 'ioc_hits'
+HIT_COLUMNS = [
+    {'name': 'offset', 'type': 'int'},
+    {'name': 'layer', 'type': 'str'},
+    {'name': 'pid', 'type': 'int'},
+    {'name': 'process', 'type': 'str'},
+    {'name': 'ioc', 'type': 'str'},
+    {'name': 'encoding', 'type': 'str'},
+]
+
+
+def parse_iocs(lines):
+    """IOC entries (name, encoding, bytes) from IOC file lines
+
+    'hex:4d5a9000' is a byte pattern; any other line is text and is matched
+    both as ASCII and as UTF-16LE. Blank lines and # comments are skipped.
+    """
+    iocs = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.lower().startswith('hex:'):
+            iocs.append((line, 'hex', bytes.fromhex(line[4:].replace(' ', ''))))
+        else:
+            iocs.append((line, 'ascii', line.encode('utf-8')))
+            iocs.append((line, 'utf-16le', line.encode('utf-16le')))
+    return iocs
+
+
+def load_iocs(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_iocs(f)
+
+
+def trie_regex(patterns):
+    """One regex for a set of byte strings, built from their trie so matching cost follows depth, not count"""
+    trie = {}
+    for pattern in patterns:
+        node = trie
+        for byte in pattern:
+            node = node.setdefault(byte, {})
+        node[None] = True
+
+    def build(node):
+        branches = [re.escape(bytes([byte])) + build(child) for byte, child in sorted(
+            ((byte, child) for byte, child in node.items() if byte is not None), key=lambda item: item[0])]
+        if not branches:
+            return b''
+        body = branches[0] if len(branches) == 1 else b'(?:' + b'|'.join(branches) + b')'
+        # A pattern ending here makes the rest optional; greedy, so the longest match wins
+        return b'(?:' + body + b')?' if None in node else body
+
+    return build(trie)
+
+
+class IocMatcher:
+    """Finds every occurrence of every IOC; uses pyahocorasick when installed"""
+
+    def __init__(self, iocs):
+        self.iocs = list(iocs)
+        self.by_pattern = {}
+        for index, (_, _, pattern) in enumerate(self.iocs):
+            if pattern:
+                self.by_pattern.setdefault(pattern, []).append(index)
+        self.longest = max((len(pattern) for pattern in self.by_pattern), default=1)
+        self.lengths = sorted({len(pattern) for pattern in self.by_pattern})
+        self.key = hashlib.sha1(b'\0'.join(sorted(self.by_pattern))).hexdigest()
+        self._automaton = None
+        self._regex = None
+
+    def __getstate__(self):
+        # Workers rebuild the automaton rather than unpickling it
+        state = dict(self.__dict__)
+        state['_automaton'] = state['_regex'] = None
+        return state
+
+    def _build(self):
+        try:
+            import ahocorasick
+            automaton = ahocorasick.Automaton()
+            for pattern, indices in self.by_pattern.items():
+                automaton.add_word(pattern.decode('latin-1'), (len(pattern), indices))
+            automaton.make_automaton()
+            self._automaton = automaton
+        except ImportError:
+            self._regex = re.compile(trie_regex(self.by_pattern), re.DOTALL)
+
+    def find(self, data, start=0, end=None):
+        """(offset, IOC index) of every occurrence starting in [start, end) of a buffer"""
+        if not self.by_pattern:
+            return []
+        if self._automaton is None and self._regex is None:
+            self._build()
+        end = len(data) if end is None else end
+        stop = min(end + self.longest - 1, len(data))
+        hits = []
+
+        if self._automaton is not None:
+            text = bytes(data[start:stop]).decode('latin-1')
+            for last, (length, indices) in self._automaton.iter(text):
+                offset = start + last - length + 1
+                if offset < end:
+                    hits.extend((offset, index) for index in indices)
+        else:
+            # Each search skips ahead in C to the longest IOC at the next candidate
+            # position; shorter IOCs that are prefixes of it are looked up by length,
+            # and resuming one byte later keeps overlapping occurrences
+            position = start
+            while True:
+                match = self._regex.search(data, position, stop)
+                if match is None or match.start() >= end:
+                    break
+                offset = match.start()
+                found = match.group()
+                for length in self.lengths:
+                    if length > len(found):
+                        break
+                    hits.extend((offset, index) for index in self.by_pattern.get(found[:length], ()))
+                position = offset + 1
+
+        hits.sort()
+        return hits
+
+    def hit(self, offset, index, layer='physical', pid=None, process=None):
+        name, encoding, _ = self.iocs[index]
+        return {'offset': offset, 'layer': layer, 'pid': pid, 'process': process, 'ioc': name, 'encoding': encoding}
+
+
+_matchers = {}
+
+def _ioc_chunk_job(args):
+    """Worker entry point; the automaton is built once per worker and IOC set"""
+    path, start, end, matcher = args
+    matcher = _matchers.setdefault(matcher.key, matcher)
+    return matcher.find(_image_map(path), start, end)
+
+
+def scan_image(image_path, matcher, workers=None, chunk_size=CHUNK_SIZE):
+    """IOC hits in the raw image with physical offsets, in offset order"""
+    if not os.path.getsize(image_path):
+        return
+    logger.info(f"Scanning {os.path.basename(image_path)} for {len(matcher.iocs)} IOC patterns")
+    for _, hits in scan_chunks(image_path, _ioc_chunk_job, (matcher,), workers, chunk_size):
+        for offset, index in hits:
+            yield matcher.hit(offset, index)
+
+
+def mapped_runs(layer, start, size):
+    """(start, end) of each contiguous run of mapped pages in a virtual range
+
+    Only these are read: a VAD may reserve gigabytes of which a few pages are
+    backed, and padding the rest with zeroes would be scanned for nothing.
+    """
+    run_start = run_end = None
+    for offset, length, _, _, _ in layer.mapping(start, size, ignore_errors=True):
+        if offset != run_end:
+            if run_start is not None:
+                yield run_start, run_end
+            run_start = offset
+        run_end = offset + length
+    if run_start is not None:
+        yield run_start, run_end
+
+
+def scan_processes(engine, image_path, matcher, chunk_size=CHUNK_SIZE):
+    """IOC hits in every process's VADs with virtual offsets, read through the engine's warm context"""
+    from volatility3.framework import exceptions
+    from volatility3.plugins.windows import pslist
+
+    session = engine._session(image_path)
+    context = session.context
+    plugin = engine._construct(session, engine._find_plugin('windows.pslist'), None, None)
+    kernel_module, layer_name, symbol_table = kernel_names(context, plugin)
+
+    if 'kernel_module_name' in inspect.signature(pslist.PsList.list_processes).parameters:
+        processes = pslist.PsList.list_processes(context, kernel_module)
+    else:
+        processes = pslist.PsList.list_processes(context, layer_name, symbol_table)
+
+    for proc in processes:
+        try:
+            pid = int(proc.UniqueProcessId)
+            name = proc.ImageFileName.cast('string', max_length=proc.ImageFileName.vol.count, errors='replace')
+            proc_layer = context.layers[proc.add_process_layer()]
+            vads = list(proc.get_vad_root().traverse())
+        except exceptions.InvalidAddressException as e:
+            logger.debug(f"Skipping unreadable process: {e}")
+            continue
+
+        for vad in vads:
+            for run_start, run_end in mapped_runs(proc_layer, vad.get_start(), vad.get_size()):
+                for offset in range(run_start, run_end, chunk_size):
+                    owned = min(chunk_size, run_end - offset)
+                    data = proc_layer.read(offset, min(owned + matcher.longest - 1, run_end - offset), pad=True)
+                    for hit_offset, index in matcher.find(data, 0, owned):
+                        yield matcher.hit(offset + hit_offset, index, layer='virtual', pid=pid, process=name)
+
+
+def store_hits(hits, db_path, batch_size=10000):
+    """Write IOC hits to the case database's ioc_hits table; returns the count"""
+    conn = case_db.connect(db_path)
+    conn.execute('begin')
+    try:
+        case_db.create_table(conn, IOC_TABLE, HIT_COLUMNS)
+        names = [column['name'] for column in HIT_COLUMNS]
+        insert = f"insert into {quote(IOC_TABLE)} values ({', '.join('?' * len(names))})"
+        batch = []
+        count = 0
+        for hit in hits:
+            batch.append([hit[name] for name in names])
+            if len(batch) >= batch_size:
+                conn.executemany(insert, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            conn.executemany(insert, batch)
+            count += len(batch)
+        case_db.create_indexes(conn, IOC_TABLE)
+        conn.execute('commit')
+    except Exception:
+        conn.execute('rollback')
+        raise
+    finally:
+        conn.close()
+    return count
+
+
+def main():
+    """python src/ioc_scan.py image.raw iocs.txt [--processes] [--db case.db]"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description='MemHawk IOC scan')
+    parser.add_argument('image')
+    parser.add_argument('iocs', help='one IOC per line; hex:<bytes> for byte patterns')
+    parser.add_argument('--processes', action='store_true', help='scan process VADs instead of the raw image')
+    parser.add_argument('--db', help='store hits in this case database instead of printing them')
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args()
+
+    matcher = IocMatcher(load_iocs(args.iocs))
+    if args.processes:
+        try:
+            from .volatility_engine import VolatilityEngine
+        except ImportError:
+            from volatility_engine import VolatilityEngine
+        hits = scan_processes(VolatilityEngine(), args.image, matcher)
+    else:
+        hits = scan_image(args.image, matcher, workers=args.workers)
+
+    if args.db:
+        print(f"{store_hits(hits, args.db)} IOC hits")
+        return
+    for hit in hits:
+        print(json.dumps(dict(hit, offset=hex(hit['offset']))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""
+MemHawk Job Queue
+Image x plugin jobs in a SQLite database on a shared directory, so a
+coordinator can queue a scan and workers on several hosts (with the images
+and case directories mounted at the same paths) can run it. Workers claim
+jobs under a lease, renew it with heartbeats and write results into the case
+directories; jobs of a worker that stopped sending heartbeats are queued
+again
+
+The queue and the case journals its workers write use SQLite's rollback
+journal, not WAL: WAL keeps its index in shared memory, which processes on
+different hosts do not share, so it is only safe on one machine. Rollback
+journaling needs only file locks, and so a file system that honours them
+across hosts (SMB, NFSv4 with working locks).
+
+Authors: Adriteyo Das, Anvita Warjri, Shivam Lahoty
+"""
+
+import os
+import json
+import time
+import socket
+import sqlite3
+import threading
+import logging
+
+try:
+    from .scheduler import PRIORITY_RANKS, DEFAULT_PRIORITY, PLUGIN_PRIORITIES, TRIAGE_PLUGINS, estimate_cost_s
+    from .scan_journal import ScanJournal, write_output
+    from .ingest import ingest_results
+    from .tracing import span
+except ImportError:
+    from scheduler import PRIORITY_RANKS, DEFAULT_PRIORITY, PLUGIN_PRIORITIES, TRIAGE_PLUGINS, estimate_cost_s
+    from scan_journal import ScanJournal, write_output
+    from ingest import ingest_results
+    from tracing import span
+
+logger = logging.getLogger(__name__)
+
+QUEUE_FILE = 'queue.db'
+CASE_DB_FILE = 'case.db'
+# A claimed job belongs to its worker for LEASE_S seconds after each heartbeat
+LEASE_S = 60
+HEARTBEAT_S = 15
+POLL_S = 2
+# A job whose lease has run out this many times is failed instead of queued again
+MAX_ATTEMPTS = 3
+
+
+def worker_name():
+    return f'{socket.gethostname()}-{os.getpid()}'
+
+
+class JobQueue:
+    """Shared queue of plugin jobs; every state change is one immediate transaction"""
+
+    def __init__(self, path):
+        # A directory holds queue.db; anything else is the database itself
+        if os.path.isdir(path) or not os.path.splitext(path)[1]:
+            os.makedirs(path, exist_ok=True)
+            path = os.path.join(path, QUEUE_FILE)
+        self.path = os.path.abspath(path)
+        self.conn = sqlite3.connect(self.path, timeout=60, isolation_level=None, check_same_thread=False)
+        # WAL is unsafe across hosts (see the module docstring)
+        self.conn.execute('pragma journal_mode=delete')
+        self.conn.executescript('''
+            create table if not exists jobs (id integer primary key, image text, case_dir text, plugin text,
+                                             rank int, cost_s real, state text, worker text, lease_until real,
+                                             attempts int default 0, output text, error text, created real,
+                                             started real, finished real, unique (case_dir, plugin));
+            create index if not exists jobs_state on jobs (state, rank, cost_s);
+            create table if not exists workers (worker text primary key, host text, started real, seen real,
+                                                done int default 0, failed int default 0);
+        ''')
+        self.lock = threading.Lock()
+
+    def _transaction(self, work):
+        """Run work(conn) inside begin immediate, so concurrent claims never take the same job"""
+        with self.lock:
+            self.conn.execute('begin immediate')
+            try:
+                value = work(self.conn)
+                self.conn.execute('commit')
+                return value
+            except BaseException:
+                self.conn.execute('rollback')
+                raise
+
+    def submit(self, image_path, plugins, case_dir, priorities=None):
+        """Queue the plugins of one image into its case directory; returns the number queued
+
+        Plugins whose result in the case is already done and intact are not
+        queued; failed ones are queued again.
+        """
+        priorities = dict(PLUGIN_PRIORITIES, **(priorities or {}))
+        journal = ScanJournal(case_dir, shared=True)
+        journal.begin(image_path)
+        pending = journal.pending(plugins)
+        journal.close()
+
+        def rank(plugin_name):
+            priority = 'triage' if plugin_name in TRIAGE_PLUGINS else priorities.get(plugin_name, DEFAULT_PRIORITY)
+            return PRIORITY_RANKS.get(priority, PRIORITY_RANKS[DEFAULT_PRIORITY])
+
+        rows = [(os.path.abspath(image_path), os.path.abspath(case_dir), plugin_name, rank(plugin_name),
+                 estimate_cost_s(plugin_name, image_path), time.time()) for plugin_name in pending]
+
+        def work(conn):
+            before = conn.total_changes
+            conn.executemany("insert into jobs (image, case_dir, plugin, rank, cost_s, state, created) "
+                             "values (?, ?, ?, ?, ?, 'queued', ?) on conflict (case_dir, plugin) do update set "
+                             "state = 'queued', worker = null, lease_until = null, attempts = 0, error = null "
+                             "where state in ('failed', 'done')", rows)
+            return conn.total_changes - before
+        queued = self._transaction(work)
+        logger.info(f"Queued {queued} plugins of {os.path.basename(image_path)} into {case_dir}")
+        return queued
+
+    def _requeue_expired(self, conn):
+        """Jobs whose worker stopped renewing the lease go back to the queue (or fail after MAX_ATTEMPTS)"""
+        now = time.time()
+        expired = conn.execute("select id, plugin, worker, attempts from jobs where state = 'running' "
+                               "and lease_until < ?", (now,)).fetchall()
+        for job_id, plugin_name, worker, attempts in expired:
+            if attempts + 1 >= MAX_ATTEMPTS:
+                conn.execute("update jobs set state = 'failed', attempts = ?, finished = ?, error = ? where id = ?",
+                             (attempts + 1, now, f'worker lease expired {attempts + 1} times', job_id))
+                logger.warning(f"{plugin_name} (job {job_id}) failed: lease expired {attempts + 1} times")
+            else:
+                conn.execute("update jobs set state = 'queued', worker = null, lease_until = null, attempts = ? "
+                             "where id = ?", (attempts + 1, job_id))
+                logger.warning(f"Worker {worker} lost job {job_id} ({plugin_name}), queued again")
+        return len(expired)
+
+    def requeue_expired(self):
+        return self._transaction(self._requeue_expired)
+
+    def claim(self, worker, lease_s=LEASE_S):
+        """Lease the next job to a worker, or None when nothing is queued
+
+        Jobs go by priority rank; within a rank, to the image with the fewest
+        running jobs, then the cheapest estimate, as in PluginScheduler.
+        """
+        def work(conn):
+            self._requeue_expired(conn)
+            row = conn.execute("select id from jobs as job where state = 'queued' order by rank, "
+                               "(select count(*) from jobs as other where other.state = 'running' "
+                               "and other.image = job.image), cost_s, id limit 1").fetchone()
+            now = time.time()
+            conn.execute("insert into workers (worker, host, started, seen) values (?, ?, ?, ?) "
+                         "on conflict (worker) do update set seen = excluded.seen",
+                         (worker, socket.gethostname(), now, now))
+            if not row:
+                return None
+            conn.execute("update jobs set state = 'running', worker = ?, lease_until = ?, started = ? where id = ?",
+                         (worker, now + lease_s, now, row[0]))
+            return self._job(conn, row[0])
+        return self._transaction(work)
+
+    @staticmethod
+    def _job(conn, job_id):
+        cursor = conn.execute('select * from jobs where id = ?', (job_id,))
+        return dict(zip([column[0] for column in cursor.description], cursor.fetchone()))
+
+    def heartbeat(self, worker, job_id, lease_s=LEASE_S):
+        """Extend a worker's lease on a job; False when the job is no longer the worker's"""
+        def work(conn):
+            now = time.time()
+            conn.execute('update workers set seen = ? where worker = ?', (now, worker))
+            return conn.execute("update jobs set lease_until = ? where id = ? and worker = ? and state = 'running'",
+                                (now + lease_s, job_id, worker)).rowcount == 1
+        return self._transaction(work)
+
+    def complete(self, worker, job_id, success, output=None, error=None):
+        """Record a job's outcome; returns (owned, jobs of its case still unfinished)
+
+        owned is False when the lease had already passed to another worker,
+        in which case nothing is recorded.
+        """
+        def work(conn):
+            now = time.time()
+            owned = conn.execute("update jobs set state = ?, output = ?, error = ?, finished = ?, lease_until = null "
+                                 "where id = ? and worker = ? and state = 'running'",
+                                 ('done' if success else 'failed', output, error, now, job_id, worker)).rowcount == 1
+            if not owned:
+                return False, None
+            conn.execute(f"update workers set seen = ?, {'done' if success else 'failed'} = "
+                         f"{'done' if success else 'failed'} + 1 where worker = ?", (now, worker))
+            case_dir = conn.execute('select case_dir from jobs where id = ?', (job_id,)).fetchone()[0]
+            remaining = conn.execute("select count(*) from jobs where case_dir = ? and state in ('queued', 'running')",
+                                     (case_dir,)).fetchone()[0]
+            return True, remaining
+        return self._transaction(work)
+
+    def status(self):
+        """Job counts by state, per case and per worker"""
+        self.requeue_expired()
+        with self.lock:
+            states = dict(self.conn.execute('select state, count(*) from jobs group by state'))
+            cases = {}
+            for case_dir, state, count in self.conn.execute('select case_dir, state, count(*) from jobs '
+                                                            'group by case_dir, state'):
+                cases.setdefault(case_dir, {})[state] = count
+            now = time.time()
+            workers = [{'worker': worker, 'host': host, 'done': done, 'failed': failed,
+                        'seen_s_ago': round(now - seen, 1)}
+                       for worker, host, seen, done, failed in
+                       self.conn.execute('select worker, host, seen, done, failed from workers order by worker')]
+        return {'queue': self.path, 'jobs': states, 'cases': cases, 'workers': workers}
+
+    def close(self):
+        self.conn.close()
+
+
+def build_case_db(case_dir, catalog=None):
+    """Load the saved results of every finished plugin of a case into its case database"""
+    journal = ScanJournal(case_dir, shared=True)
+    results = {}
+    for plugin_name, state in journal.states().items():
+        if state == 'done' and journal.verify(plugin_name):
+            with open(journal.output_path(plugin_name), 'r', encoding='utf-8') as f:
+                results[plugin_name] = json.load(f)
+    journal.close()
+    return ingest_results(results, os.path.join(case_dir, CASE_DB_FILE), catalog)
+
+
+class QueueWorker:
+    """Claims jobs from a JobQueue and runs them with one warm VolatilityRunner until stopped or idle"""
+
+    def __init__(self, queue_path, name=None, runner_options=None, lease_s=LEASE_S, heartbeat_s=HEARTBEAT_S):
+        self.queue = JobQueue(queue_path)
+        self.name = name or worker_name()
+        self.runner_options = runner_options or {}
+        self.lease_s = lease_s
+        self.heartbeat_s = heartbeat_s
+        self.runner = None
+        self.stopped = threading.Event()
+
+    def _get_runner(self):
+        # Created on the first job; its engine keeps warm contexts of the images this worker has seen
+        if self.runner is None:
+            try:
+                from .volatility_bridge import VolatilityRunner
+            except ImportError:
+                from volatility_bridge import VolatilityRunner
+            self.runner = VolatilityRunner(**self.runner_options)
+        return self.runner
+
+    def _keep_lease(self, job, lost, done):
+        """Heartbeat thread: renew the lease until the job is done; flags a lost lease"""
+        while not done.wait(self.heartbeat_s):
+            try:
+                if not self.queue.heartbeat(self.name, job['id'], self.lease_s):
+                    lost.set()
+                    return
+            except sqlite3.Error as e:
+                logger.warning(f"Heartbeat for job {job['id']} failed: {e}")
+
+    def run_job(self, job):
+        """Run one claimed job and write its result into the case; returns the result"""
+        lost, done = threading.Event(), threading.Event()
+        keeper = threading.Thread(target=self._keep_lease, args=(job, lost, done), daemon=True)
+        keeper.start()
+        try:
+            with span('queue.job', 'queue', plugin=job['plugin'], worker=self.name):
+                result = self._get_runner().run_plugin(job['image'], job['plugin'])
+        except Exception as e:
+            logger.error(f"{job['plugin']} crashed on {self.name}: {e}")
+            result = {'plugin': job['plugin'], 'success': False, 'error': str(e)}
+        finally:
+            done.set()
+            keeper.join()
+
+        if lost.is_set():
+            logger.warning(f"Lease on job {job['id']} ({job['plugin']}) was lost, dropping its result")
+            return result
+        success = bool(result.get('success')) and not result.get('demo')
+        save_path = os.path.join(job['case_dir'], job['plugin'] + '.json')
+        write_output(save_path, json.dumps(result, default=str))
+        journal = ScanJournal(job['case_dir'], shared=True)
+        if success:
+            journal.finish(job['plugin'], save_path)
+        else:
+            journal.fail(job['plugin'], result.get('error') or result.get('original_error'))
+        journal.close()
+
+        owned, remaining = self.queue.complete(self.name, job['id'], success, os.path.basename(save_path),
+                                               None if success else str(result.get('error')))
+        if owned and remaining == 0:
+            # The worker finishing a case's last job builds its database
+            build_case_db(job['case_dir'], self._get_runner().catalog())
+            logger.info(f"Case {job['case_dir']} finished")
+        return result
+
+    def run(self, exit_when_idle=False, poll_s=POLL_S):
+        """Work until stop() (or, with exit_when_idle, until nothing is queued or running); returns jobs run"""
+        logger.info(f"Queue worker {self.name} started on {self.queue.path}")
+        count = 0
+        while not self.stopped.is_set():
+            job = self.queue.claim(self.name, self.lease_s)
+            if job is None:
+                if exit_when_idle and not self.queue.status()['jobs'].get('running'):
+                    break
+                self.stopped.wait(poll_s)
+                continue
+            logger.info(f"{self.name} running {job['plugin']} on {os.path.basename(job['image'])}")
+            self.run_job(job)
+            count += 1
+        if self.runner:
+            self.runner.close()
+        self.queue.close()
+        return count
+
+    def stop(self):
+        self.stopped.set()
+
+
+def _work(queue_path, runner_options, exit_when_idle):
+    """Entry point of a worker process started by run_workers"""
+    return QueueWorker(queue_path, runner_options=runner_options).run(exit_when_idle)
+
+
+def run_workers(queue_path, workers=1, runner_options=None, exit_when_idle=False):
+    """Run several queue workers on this host, one process each; returns the jobs they ran"""
+    if workers <= 1:
+        return _work(queue_path, runner_options, exit_when_idle)
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_work, queue_path, runner_options, exit_when_idle) for _ in range(workers)]
+        return sum(future.result() for future in futures)
@@ -1,7 +1,11 @@
 import os
 import sys
+import time
 import pathlib
+import itertools
+import threading
 import subprocess
+from collections import deque
 
 from PyQt5 import uic
 from PyQt5.QtGui import *
@@ -12,6 +16,12 @@ from . import plugin
 from .util import *
 from .analyzer import AnalyzerWindow
 from .auto import AutoAnalyzer
+from .scheduler import PluginScheduler
+from .volatility_bridge import resolve_symbols
+from .run_stats import RunStats
+from . import tracing
+from .scan_journal import ScanJournal, write_output
+from .image_identity import ImageHasher
 
 log_file = open('log.txt', 'w', -1, 'utf-8')
 
@@ -24,6 +34,14 @@ def log(message):
 
 ui = uic.loadUiType('res/main.ui')[0]
 
+# The result pane keeps this many lines; full outputs are in the case directory
+RESULT_MAX_LINES = 20000
+# Lines of one plugin's output shown in the pane
+RESULT_PLUGIN_LINES = 2000
+# Result lines are sent to the window in batches, at most one batch per interval
+RESULT_BATCH_LINES = 500
+RESULT_BATCH_INTERVAL = 0.1
+
 default_message = 'Volatility GUI environment. Sourced By PENTAL \
         \n \
         \n 1. Mount the image first.\
@@ -58,7 +76,8 @@ class MainWindow(QMainWindow, ui):
 
         # Text
         self.txt_date.setText(timestamp())
-        self.txt_result.setText(default_message)
+        self.txt_result.setMaximumBlockCount(RESULT_MAX_LINES)
+        self.txt_result.setPlainText(default_message)
 
         # Plugin List
         # self.list_plugins.itemClicked.connect(self.list_plugins_item_click)
@@ -172,14 +191,16 @@ class MainWindow(QMainWindow, ui):
             log_file_path = 'case/' + case_name + '/log.txt'
             print("Log_File_Path : ", log_file_path)
         else:
-            reply = QMessageBox.question(self, 'Case Exists', 'The same case name exists.\nWould you like to overwrite it?', QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
-            if reply == QMessageBox.No:
+            # Yes resumes the case: finished plugins with intact outputs are kept, the rest run again
+            reply = QMessageBox.question(self, 'Case Exists', 'The same case name exists.\nWould you like to resume it?\n(No overwrites it)', QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel, QMessageBox.Yes)
+            if reply == QMessageBox.Cancel:
                 return
-            remove_all_file(case_path)
+            if reply == QMessageBox.No:
+                remove_all_file(case_path)
 
         # Run Volatility
-        self.txt_result.setText('Case: ' + case_name)
-        self.txt_result.append('Image: ' + os.path.basename(image_path))
+        self.txt_result.setPlainText('Case: ' + case_name)
+        self.txt_result.appendPlainText('Image: ' + os.path.basename(image_path))
         self.set_enabled(False)
         self.th_scan.set_image_path(image_path)
         self.th_scan.set_case_path(case_path)
@@ -188,7 +209,7 @@ class MainWindow(QMainWindow, ui):
 
 
     def th_scan_result_handler(self, message):
-        self.txt_result.append(message)
+        self.txt_result.appendPlainText(message)
 
 
     def th_scan_status_handler(self, message):
@@ -271,6 +292,9 @@ class ScanThread(QThread):
         self.image_path = None
         self.case_path = None
         self.main = parent
+        # Result lines waiting for the window, sent by feed_results
+        self.lines = deque()
+        self.scanning = False
  
     def set_plugin_list(self, plugins):
         self.plugins = plugins
@@ -284,36 +308,117 @@ class ScanThread(QThread):
     def run(self):
         start_time = timestamp()
         lib_path = get_volatility_path()
+        self.scanning = True
+        feeder = threading.Thread(target=self.feed_results, daemon=True)
+        feeder.start()
+
+        # Started with MEMHAWK_TRACE set, each scan is traced into its case directory
+        traced = tracing.enabled()
+        self.journal = None
+        status = 'SCAN FINISHED!'
+        try:
+            if traced:
+                tracing.enable(self.case_path, fresh=True)
+
+            # Plugins run concurrently on the bridge scheduler, within CPU and memory limits,
+            # windows.info and pslist first and the slow scans after them
+            # Workers copy vol's text output line by line into the case directory; only the file path comes back
+            runner_options = {'volatility_path': [sys.executable, lib_path], 'use_engine': False, 'timeout': None,
+                              'use_cache': False, 'output_dir': self.case_path,
+                              'symbol_dirs': resolve_symbols([self.image_path])}
+            self.scheduler = PluginScheduler(runner_options=runner_options, on_update=self.scheduler_update,
+                                             stats=RunStats())
+
+            # The full image hashes for the case record are computed while the plugins run
+            hasher = ImageHasher(self.image_path, case_path=self.case_path).start()
+
+            # The case journal records finished plugins, so a scan cut short resumes where it stopped
+            self.journal = ScanJournal(self.case_path)
+            self.journal.begin(self.image_path)
+            pending = self.journal.pending(self.plugins)
+            for plugin_name in self.plugins:
+                if plugin_name not in pending:
+                    self.show_saved_result(plugin_name)
+            for plugin_name in pending:
+                self.scheduler.submit(self.image_path, plugin_name, output_format='text')
+            self.scheduler.run()
+            identity = hasher.wait()
+
+            self.write('', '=' * 50)
+            self.write('Scan started at ' + start_time)
+            self.write('Scan finished at ' + timestamp())
+            if 'sha256' in identity:
+                log('[SCAN] Image SHA-256: ' + identity['sha256'])
+                self.write('Image SHA-256: ' + identity['sha256'])
+                self.write('Image MD5: ' + identity['md5'])
+            self.write('')
+        except Exception as e:
+            log('[SCAN] Scan failed: ' + str(e))
+            self.write('', 'Scan failed: ' + str(e), '')
+            status = 'SCAN FAILED!'
+        finally:
+            # Whatever went wrong, the window must leave the scanning state
+            if self.journal:
+                self.journal.close()
+            if traced:
+                tracing.export(self.case_path, clean=True)
+            self.scanning = False
+            feeder.join()
+            self.evt_status_changed.emit(status)
+            self.evt_scan_finished.emit()
+
+    def scheduler_update(self, event, job):
+        status = self.scheduler.status()
+        running = ', '.join(item['plugin'] for item in status['running'])
+        self.evt_status_changed.emit('Scanning: %s (%d queued, %d finished)' % (running, len(status['queued']), len(status['finished'])))
+
+        if event == 'started':
+            log('[SCAN] Current Plugin: ' + job.plugin)
+            self.journal.start(job.plugin)
+            return
 
-        for plugin_name in self.plugins:
-            shell = ['python', lib_path, '-f', self.image_path, plugin_name]
-            log('[SCAN] Current Plugin: ' + plugin_name)
-            log('[SCAN] Run: ' + ' '.join(shell))
-            self.evt_status_changed.emit('Scanning: ' + plugin_name)
-
-            self.evt_result_append.emit('\n\n' + '=' * 80)
-            self.evt_result_append.emit(plugin_name)
-            self.evt_result_append.emit('=' * 80 + '\n')
-
-            process = subprocess.Popen(shell, stdout=subprocess.PIPE).stdout
-            global result
-            result = process.read().strip().decode('euc-kr')
-            result = result.replace('\r', '')
-            result = result.split('\n', 2)[2]
-            process.close()
-
-            save_path = self.case_path + '/' + plugin_name + '.txt'
-            plugin_log = open(save_path, 'w', -1, 'utf-8')
-            print(result, file=plugin_log)
-
-            self.evt_result_append.emit(result)
-        
-        self.evt_result_append.emit('\n' + '=' * 50)
-        self.evt_result_append.emit('Scan started at ' + start_time)
-        self.evt_result_append.emit('Scan finished at ' + timestamp() + '\n')
+        result = job.result
+        log('[SCAN] Finished Plugin: ' + job.plugin)
+        if result.get('demo') or not result.get('success'):
+            error = 'Error: ' + str(result.get('original_error') or result.get('error'))
+            save_path = self.case_path + '/' + job.plugin + '.txt'
+            write_output(save_path, error + '\n')
+            self.journal.fail(job.plugin, error)
+            self.append_result(job.plugin, iter([error]), save_path)
+            return
 
-        self.evt_status_changed.emit('SCAN FINISHED!')
-        self.evt_scan_finished.emit()
+        save_path = result['output_path']
+        self.journal.finish(job.plugin, save_path)
+        with open(save_path, 'r', -1, 'utf-8') as plugin_log:
+            self.append_result(job.plugin, (line.rstrip('\n') for line in plugin_log), save_path)
+
+    def show_saved_result(self, plugin_name):
+        """Show the verified output of a plugin finished by an earlier run of this case"""
+        log('[SCAN] Resumed Plugin: ' + plugin_name)
+        save_path = self.journal.output_path(plugin_name)
+        with open(save_path, 'r', -1, 'utf-8') as plugin_log:
+            self.append_result(plugin_name + ' (saved)', (line.rstrip('\n') for line in plugin_log), save_path)
+
+    def append_result(self, title, lines, save_path):
+        """Queue the first RESULT_PLUGIN_LINES lines of a plugin output; the rest is only in its case file"""
+        self.write('', '', '=' * 80, title, '=' * 80, '')
+        self.write(*itertools.islice(lines, RESULT_PLUGIN_LINES))
+        hidden = sum(1 for _ in lines)
+        if hidden:
+            self.write('... %d more lines in %s' % (hidden, save_path))
+
+    def write(self, *lines):
+        self.lines.extend(lines)
+
+    def feed_results(self):
+        """Send queued lines to the window, RESULT_BATCH_LINES per signal at most every RESULT_BATCH_INTERVAL"""
+        while self.scanning or self.lines:
+            batch = []
+            while self.lines and len(batch) < RESULT_BATCH_LINES:
+                batch.append(self.lines.popleft())
+            if batch:
+                self.evt_result_append.emit('\n'.join(batch))
+            time.sleep(RESULT_BATCH_INTERVAL)
 
 
 def main():
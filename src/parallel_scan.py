@@ -0,0 +1,158 @@
+"""
+MemHawk Parallel Scan
+Byte-pattern scanning of a memory image split into chunks that are scanned
+on a process pool. Each chunk is read with an overlap into the next one so
+matches straddling a boundary are found, and a match is only reported by the
+chunk its first byte falls in so none is reported twice.
+
+Authors: Adriteyo Das, Anvita Warjri, Shivam Lahoty
+"""
+
+import os
+import re
+import sys
+import mmap
+import json
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 32 * 1024 * 1024
+# Longest match that is guaranteed to be found whole across a chunk boundary
+MAX_MATCH = 4096
+
+
+def plan_chunks(size, chunk_size=CHUNK_SIZE):
+    """Owned (start, end) ranges covering a file of the given size"""
+    return [(start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)]
+
+
+def compile_patterns(patterns):
+    """Byte regexes from bytes, str (latin-1) or already compiled patterns"""
+    compiled = []
+    for pattern in patterns:
+        if isinstance(pattern, re.Pattern):
+            compiled.append(pattern)
+        else:
+            compiled.append(re.compile(pattern.encode('latin-1') if isinstance(pattern, str) else pattern, re.DOTALL))
+    return compiled
+
+
+_maps = {}
+
+def _image_map(path):
+    """Read-only mapping of an image, opened once per worker process"""
+    if path not in _maps:
+        with open(path, 'rb') as f:
+            _maps[path] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return _maps[path]
+
+
+def scan_chunk(path, start, end, patterns, overlap=MAX_MATCH):
+    """Matches of every pattern whose first byte lies in [start, end), in offset order
+
+    The regexes run directly over the mapping between start and end + overlap,
+    so no chunk is copied into Python memory.
+    """
+    data = _image_map(path)
+    stop = min(end + overlap, len(data))
+    hits = []
+    for index, pattern in enumerate(patterns):
+        for match in pattern.finditer(data, start, stop):
+            if match.start() >= end:
+                break
+            hits.append((match.start(), index, match.group()))
+    hits.sort(key=lambda hit: (hit[0], hit[1]))
+    return hits
+
+
+def _scan_chunk_job(args):
+    return scan_chunk(*args)
+
+
+def scan_chunks(image_path, job, args, workers=None, chunk_size=CHUNK_SIZE):
+    """Run job(image_path, start, end, *args) over every chunk of an image on a process pool
+
+    Yields ((start, end), result) in chunk order. job must be a picklable
+    module-level function; only a window of two chunks per worker is in flight
+    to bound memory.
+    """
+    size = os.path.getsize(image_path)
+    chunks = plan_chunks(size, chunk_size)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(chunks) <= 1:
+        for start, end in chunks:
+            yield (start, end), job((image_path, start, end) + tuple(args))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for start, end in chunks:
+            pending.append(((start, end), pool.submit(job, (image_path, start, end) + tuple(args))))
+            if len(pending) >= 2 * workers:
+                chunk, future = pending.popleft()
+                yield chunk, future.result()
+        while pending:
+            chunk, future = pending.popleft()
+            yield chunk, future.result()
+
+
+class ParallelScanner:
+    """Scan an image for byte patterns on all cores, yielding (offset, pattern index, bytes) in offset order"""
+
+    def __init__(self, patterns, workers=None, chunk_size=CHUNK_SIZE, max_match=MAX_MATCH):
+        self.patterns = compile_patterns(patterns)
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.overlap = max_match
+
+    def scan(self, image_path):
+        if not os.path.getsize(image_path) or not self.patterns:
+            return
+        logger.info(f"Scanning {os.path.basename(image_path)} for {len(self.patterns)} patterns "
+                    f"on {self.workers} workers")
+
+        last_end = [0] * len(self.patterns)
+        for chunk, hits in scan_chunks(image_path, _scan_chunk_job, (self.patterns, self.overlap),
+                                       self.workers, self.chunk_size):
+            yield from self._merge(image_path, chunk, hits, last_end)
+
+    def _merge(self, image_path, chunk, hits, last_end):
+        """Hits of one chunk, made consistent with a single scan over the whole image
+
+        A match that runs over the boundary makes a sequential scan resume after
+        it; if this chunk found a match starting inside it, the pattern is
+        rescanned here from where the sequential scan would continue.
+        """
+        stale = {index for offset, index, _ in hits if offset < last_end[index]}
+        if stale:
+            hits = [hit for hit in hits if hit[1] not in stale]
+            for index in stale:
+                hits.extend((offset, index, data) for offset, _, data in
+                            scan_chunk(image_path, last_end[index], chunk[1], [self.patterns[index]], self.overlap))
+            hits.sort(key=lambda hit: (hit[0], hit[1]))
+        for offset, index, data in hits:
+            last_end[index] = max(last_end[index], offset + len(data))
+        return hits
+
+
+def scan_image(image_path, patterns, workers=None, chunk_size=CHUNK_SIZE, max_match=MAX_MATCH):
+    """All matches of the patterns in an image, in offset order"""
+    return list(ParallelScanner(patterns, workers, chunk_size, max_match).scan(image_path))
+
+
+def main():
+    """Scan an image for regexes: python src/parallel_scan.py image.raw MZ [pattern ...]"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if len(sys.argv) < 3:
+        print(main.__doc__)
+        return
+    patterns = sys.argv[2:]
+    for offset, index, data in ParallelScanner(patterns).scan(sys.argv[1]):
+        print(json.dumps({'offset': hex(offset), 'pattern': patterns[index], 'match': data.hex()}))
+
+
+if __name__ == "__main__":
+    main()
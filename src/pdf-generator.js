@@ -320,6 +320,14 @@ class PDFReportGenerator {
             <span class="metadata-label">Image Size:</span>
             <span>${imageInfo.size || 'Unknown'}</span>
         </div>
+        <div class="metadata-item">
+            <span class="metadata-label">Image SHA-256:</span>
+            <span style="word-break: break-all;">${imageInfo.sha256 || 'Not computed'}</span>
+        </div>
+        <div class="metadata-item">
+            <span class="metadata-label">Image MD5:</span>
+            <span style="word-break: break-all;">${imageInfo.md5 || 'Not computed'}</span>
+        </div>
         <div class="metadata-item">
             <span class="metadata-label">Analysis Tool:</span>
             <span>MemHawk v1.0.0</span>
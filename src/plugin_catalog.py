@@ -0,0 +1,150 @@
+"""
+MemHawk Plugin Catalogue
+Introspects the installed Volatility 3 framework once for its plugin
+classes, requirements and TreeGrid column definitions, and caches the
+result per framework version
+
+Authors: Adriteyo Das, Anvita Warjri, Shivam Lahoty
+"""
+
+import os
+import ast
+import glob
+import json
+import inspect
+import logging
+import textwrap
+
+logger = logging.getLogger(__name__)
+
+CATALOG_DIR = 'cache'
+
+# Requirement types automagic resolves on its own; anything else that is not
+# optional has to be supplied by the caller
+AUTOMAGIC_REQUIREMENTS = ('ModuleRequirement', 'TranslationLayerRequirement', 'SymbolTableRequirement',
+                          'PluginRequirement', 'VersionRequirement', 'LayerListRequirement')
+
+
+def catalog_path(version):
+    return os.path.join(CATALOG_DIR, f'catalog-{version}.json')
+
+
+def _type_name(node):
+    """Column type name of an AST type expression: int, Hex, datetime, ..."""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return None
+
+
+def column_schema(plugin_class):
+    """TreeGrid columns [{'name', 'type'}] declared literally in a plugin's run(), or None
+
+    Columns are read from the source rather than by running the plugin, so the
+    schema is known without an image; columns built at run time give None.
+    """
+    try:
+        tree = ast.parse(textwrap.dedent(inspect.getsource(plugin_class.run)))
+    except (OSError, TypeError, SyntaxError):
+        return None
+
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Call) and _type_name(node.func) == 'TreeGrid' and node.args):
+            continue
+        if not isinstance(node.args[0], (ast.List, ast.Tuple)):
+            return None
+
+        columns = []
+        for element in node.args[0].elts:
+            if not (isinstance(element, ast.Tuple) and len(element.elts) == 2
+                    and isinstance(element.elts[0], ast.Constant) and isinstance(element.elts[0].value, str)):
+                return None
+            type_name = _type_name(element.elts[1])
+            if type_name is None:
+                return None
+            columns.append({'name': element.elts[0].value, 'type': type_name})
+        return columns
+    return None
+
+
+def describe(class_name, plugin_class):
+    """Catalogue entry of one plugin class"""
+    requirements = []
+    for requirement in plugin_class.get_requirements():
+        requirements.append({
+            'name': requirement.name,
+            'type': type(requirement).__name__,
+            'optional': bool(requirement.optional),
+            'description': requirement.description
+        })
+
+    return {
+        'class': class_name,
+        'description': (inspect.getdoc(plugin_class) or '').split('\n')[0],
+        'requirements': requirements,
+        'required_params': [requirement['name'] for requirement in requirements
+                            if not requirement['optional'] and requirement['type'] not in AUTOMAGIC_REQUIREMENTS],
+        'columns': column_schema(plugin_class)
+    }
+
+
+def build_catalog(plugin_classes, version):
+    """Catalogue of every plugin, keyed by CLI name (windows.pslist) unless two classes share a module"""
+    modules = {}
+    for class_name in plugin_classes:
+        modules.setdefault(class_name.rsplit('.', 1)[0], []).append(class_name)
+
+    plugins = {}
+    for class_name, plugin_class in sorted(plugin_classes.items()):
+        module = class_name.rsplit('.', 1)[0]
+        name = module if len(modules[module]) == 1 else class_name
+        try:
+            plugins[name] = describe(class_name, plugin_class)
+        except Exception as e:
+            logger.debug(f"Could not introspect {class_name}: {e}")
+
+    logger.info(f"Catalogued {len(plugins)} plugins of Volatility {version}")
+    return {'version': version, 'introspected': True, 'plugins': plugins}
+
+
+def names_catalog(plugin_names, version):
+    """Catalogue with names only, for installs that can only be run as a command"""
+    return {'version': version, 'introspected': False,
+            'plugins': {name: {'class': None, 'description': '', 'requirements': [], 'required_params': [],
+                               'columns': None} for name in plugin_names}}
+
+
+def save_catalog(catalog):
+    os.makedirs(CATALOG_DIR, exist_ok=True)
+    path = catalog_path(catalog['version'])
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(catalog, f)
+    os.replace(path + '.tmp', path)
+
+
+def load_catalog(version=None):
+    """Cached catalogue of a framework version (the most recent one if None), or None"""
+    if version:
+        paths = [catalog_path(version)]
+    else:
+        paths = sorted(glob.glob(os.path.join(CATALOG_DIR, 'catalog-*.json')), key=os.path.getmtime, reverse=True)
+
+    for path in paths[:1]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    return None
+
+
+def supported(catalog, plugin_name):
+    """False only when a catalogue is known and does not have the plugin"""
+    return not catalog or not catalog.get('plugins') or plugin_name in catalog['plugins']
+
+
+def columns_for(catalog, plugin_name):
+    """Declared columns of a plugin, or None"""
+    entry = (catalog or {}).get('plugins', {}).get(plugin_name)
+    return entry and entry.get('columns')
@@ -0,0 +1,145 @@
+"""
+MemHawk Result Cache
+Content-addressed, size-bounded on-disk cache of plugin results keyed by
+image fingerprint, plugin, parameters and Volatility version
+
+Authors: Adriteyo Das, Anvita Warjri, Shivam Lahoty
+"""
+
+import os
+import gzip
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join('cache', 'results')
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+SAMPLE_COUNT = 16
+SAMPLE_SIZE = 64 * 1024
+
+_fingerprints = {}
+
+
+def image_fingerprint(image_path):
+    """Fast identity of an image from its size and sampled blocks (head, tail and evenly spaced)"""
+    stat = os.stat(image_path)
+    memo_key = (os.path.abspath(image_path), stat.st_size, stat.st_mtime_ns)
+    if memo_key in _fingerprints:
+        return _fingerprints[memo_key]
+
+    digest = hashlib.sha256(str(stat.st_size).encode())
+    with open(image_path, 'rb') as f:
+        last = max(stat.st_size - SAMPLE_SIZE, 0)
+        for index in range(SAMPLE_COUNT):
+            f.seek(last * index // (SAMPLE_COUNT - 1))
+            digest.update(f.read(SAMPLE_SIZE))
+
+    _fingerprints[memo_key] = digest.hexdigest()
+    return _fingerprints[memo_key]
+
+
+def make_key(fingerprint, plugin_name, params, version, output_format='json'):
+    """Content address of one plugin result"""
+    material = json.dumps([fingerprint, plugin_name, list(params or []), version, output_format])
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class ResultCache:
+    """Plugin results stored as gzip JSON files with an LRU index in SQLite"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self.conn = sqlite3.connect(os.path.join(cache_dir, 'index.db'), timeout=30, check_same_thread=False)
+        self.conn.execute('''create table if not exists entries (
+            key text primary key, fingerprint text, plugin text, version text,
+            size int, created real, last_access real)''')
+        self.conn.execute('create index if not exists entries_lru on entries (last_access)')
+        self.conn.commit()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + '.json.gz')
+
+    def get(self, key):
+        """Cached result for a key, or None"""
+        row = self.conn.execute('select key from entries where key = ?', (key,)).fetchone()
+        if not row:
+            return None
+
+        try:
+            with gzip.open(self._path(key), 'rt', encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable cache entry {key[:12]}: {e}")
+            self._delete([key])
+            return None
+
+        self.conn.execute('update entries set last_access = ? where key = ?', (time.time(), key))
+        self.conn.commit()
+        return result
+
+    def put(self, key, result, fingerprint=None, plugin_name=None, version=None):
+        """Store a result and evict least recently used entries over the size limit"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = path + '.tmp'
+        with gzip.open(temp_path, 'wt', encoding='utf-8', compresslevel=3) as f:
+            json.dump(result, f, default=str)
+        os.replace(temp_path, path)
+
+        now = time.time()
+        self.conn.execute('insert or replace into entries values (?, ?, ?, ?, ?, ?, ?)',
+                          (key, fingerprint, plugin_name, version, os.path.getsize(path), now, now))
+        self.conn.commit()
+        self._evict()
+
+    def _evict(self):
+        total = self.conn.execute('select coalesce(sum(size), 0) from entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evicted = []
+        for key, size in self.conn.execute('select key, size from entries order by last_access'):
+            if total <= self.max_bytes:
+                break
+            evicted.append(key)
+            total -= size
+        self._delete(evicted)
+        logger.info(f"Evicted {len(evicted)} cached results")
+
+    def _delete(self, keys):
+        for key in keys:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+        self.conn.executemany('delete from entries where key = ?', [(key,) for key in keys])
+        self.conn.commit()
+
+    def invalidate(self, fingerprint=None, plugin_name=None):
+        """Remove cached results for an image and/or plugin (everything if neither is given)"""
+        query = 'select key from entries where 1 = 1'
+        args = []
+        if fingerprint:
+            query += ' and fingerprint = ?'
+            args.append(fingerprint)
+        if plugin_name:
+            query += ' and plugin = ?'
+            args.append(plugin_name)
+
+        keys = [row[0] for row in self.conn.execute(query, args)]
+        self._delete(keys)
+        logger.info(f"Invalidated {len(keys)} cached results")
+        return len(keys)
+
+    def stats(self):
+        """Entry count and total size"""
+        count, size = self.conn.execute('select count(*), coalesce(sum(size), 0) from entries').fetchone()
+        return {'entries': count, 'bytes': size, 'max_bytes': self.max_bytes, 'path': self.cache_dir}
@@ -0,0 +1,272 @@
+"""
+MemHawk Run Statistics
+Records wall time, CPU time, peak RSS and row count of every plugin run with
+the image size and OS build, and predicts from that history how long and how
+much memory each plugin of a new scan will take
+
+Authors: Adriteyo Das, Anvita Warjri, Shivam Lahoty
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import threading
+import statistics
+import logging
+
+try:
+    from .result_cache import image_fingerprint
+    from .scheduler import PLUGIN_PRIORITIES, TRIAGE_PLUGINS, estimate_cost_s, estimate_memory_mb
+except ImportError:
+    from result_cache import image_fingerprint
+    from scheduler import PLUGIN_PRIORITIES, TRIAGE_PLUGINS, estimate_cost_s, estimate_memory_mb
+
+logger = logging.getLogger(__name__)
+
+STATS_DB = os.path.join('cache', 'stats.db')
+# Most recent runs of a plugin a prediction is made from
+HISTORY = 20
+SAMPLE_INTERVAL = 0.5
+# Worth of a plugin's results to a budgeted scan, by priority
+PRIORITY_VALUES = {'triage': 8, 'high': 4, 'medium': 2, 'low': 1}
+
+
+def _cpu_seconds():
+    """CPU time of this process and its finished children"""
+    try:
+        import resource
+        usage = resource.getrusage(resource.RUSAGE_SELF), resource.getrusage(resource.RUSAGE_CHILDREN)
+        return sum(part.ru_utime + part.ru_stime for part in usage)
+    except ImportError:
+        return time.process_time()
+
+
+def _rss_mb():
+    """Current RSS in MB of this process and its children (psutil), or None"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    try:
+        process = psutil.Process()
+        return sum(proc.memory_info().rss for proc in [process] + process.children(recursive=True)) // (1024 * 1024)
+    except psutil.Error:
+        return None
+
+
+def _max_rss_mb():
+    """Lifetime peak RSS in MB of this process or any finished child, or None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return max(resource.getrusage(who).ru_maxrss for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)) // scale
+
+
+class RunMeter:
+    """Measures one plugin run: with RunMeter() as meter: ...; then meter.wall_s, cpu_s, peak_rss_mb
+
+    Peak RSS is sampled across the process tree when psutil is installed;
+    otherwise it is the lifetime peak from getrusage, an upper bound.
+    """
+
+    def __init__(self):
+        self.wall_s = self.cpu_s = self.peak_rss_mb = None
+        self._stop = threading.Event()
+
+    def _sample(self):
+        while not self._stop.wait(SAMPLE_INTERVAL):
+            rss = _rss_mb()
+            if rss is not None:
+                self.peak_rss_mb = max(self.peak_rss_mb or 0, rss)
+
+    def __enter__(self):
+        self._started = time.time()
+        self._cpu = _cpu_seconds()
+        self.peak_rss_mb = _rss_mb()
+        if self.peak_rss_mb is not None:
+            self._sampler = threading.Thread(target=self._sample, daemon=True)
+            self._sampler.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self.wall_s = time.time() - self._started
+        self.cpu_s = _cpu_seconds() - self._cpu
+        if self.peak_rss_mb is None:
+            self.peak_rss_mb = _max_rss_mb()
+        return False
+
+
+def row_count(result):
+    """Rows in a plugin result: list entries for JSON output, lines for text"""
+    output = result.get('output')
+    if isinstance(output, list):
+        return len(output)
+    if isinstance(output, str):
+        return len(output.splitlines())
+    # Text written straight to a case file (VolatilityRunner output_dir)
+    return result.get('lines')
+
+
+def os_build(result):
+    """Kernel build string (NtBuildLab) from a windows.info result, or None"""
+    output = result.get('output')
+    if isinstance(output, list):
+        for row in output:
+            if isinstance(row, dict) and str(row.get('Variable', '')).lower() == 'ntbuildlab':
+                return str(row.get('Value'))
+    elif isinstance(output, str):
+        match = re.search(r'NtBuildLab\s+(\S+)', output, re.IGNORECASE)
+        if match:
+            return match.group(1)
+    return None
+
+
+class RunStats:
+    """Plugin run history in SQLite, shared by every worker process"""
+
+    def __init__(self, db_path=STATS_DB):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.conn.execute('pragma journal_mode=wal')
+        self.conn.executescript('''
+            create table if not exists runs (plugin text, fingerprint text, image_gb real, os_build text,
+                                             wall_s real, cpu_s real, peak_rss_mb int, rows int, fused int,
+                                             recorded real);
+            create index if not exists runs_plugin on runs (plugin, recorded);
+            create table if not exists images (fingerprint text primary key, image_gb real, os_build text);
+        ''')
+        self.conn.commit()
+        self.lock = threading.Lock()
+
+    def _image(self, image_path):
+        """(fingerprint, size in GB, OS build if known) of an image"""
+        fingerprint = image_fingerprint(image_path)
+        image_gb = os.path.getsize(image_path) / (1024 ** 3)
+        row = self.conn.execute('select os_build from images where fingerprint = ?', (fingerprint,)).fetchone()
+        return fingerprint, image_gb, row[0] if row else None
+
+    def record(self, image_path, plugin_name, result, meter, fused=False):
+        """Store the measurements of a successful, real plugin run"""
+        if not result.get('success') or result.get('demo') or result.get('cached'):
+            return
+        try:
+            with self.lock:
+                fingerprint, image_gb, build = self._image(image_path)
+                if plugin_name == 'windows.info' and os_build(result):
+                    build = os_build(result)
+                    self.conn.execute('insert or replace into images values (?, ?, ?)', (fingerprint, image_gb, build))
+                self.conn.execute('insert into runs values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                  (plugin_name, fingerprint, image_gb, build, meter.wall_s, meter.cpu_s,
+                                   meter.peak_rss_mb, row_count(result), int(fused), time.time()))
+                self.conn.commit()
+        except (OSError, sqlite3.Error) as e:
+            logger.debug(f"Could not record run statistics of {plugin_name}: {e}")
+
+    def predict(self, plugin_name, image_path):
+        """{'cost_s', 'memory_mb', 'samples', ...} expected of a plugin on an image
+
+        Each past run is compared with the static estimate for its image size;
+        the median of those ratios scales the static estimate for this image,
+        so a single run already calibrates the plugin. Runs on the same OS
+        build are preferred when there are any.
+        """
+        try:
+            _, image_gb, build = self._image(image_path)
+        except OSError:
+            image_gb, build = 0, None
+
+        runs = self.conn.execute('select image_gb, os_build, wall_s, cpu_s, peak_rss_mb, rows from runs '
+                                 'where plugin = ? order by recorded desc limit ?', (plugin_name, HISTORY)).fetchall()
+        runs = [run for run in runs if build and run[1] == build] or runs
+
+        def scaled(index, estimate):
+            ratios = [run[index] / estimate(plugin_name, image_gb=run[0]) for run in runs
+                      if run[index] is not None and estimate(plugin_name, image_gb=run[0])]
+            return estimate(plugin_name, image_gb=image_gb) * (statistics.median(ratios) if ratios else 1)
+
+        rows = [run[5] for run in runs if run[5] is not None]
+        cpu = [run[3] / run[2] for run in runs if run[3] is not None and run[2]]
+        cost = scaled(2, estimate_cost_s)
+        return {
+            'plugin': plugin_name,
+            'cost_s': cost,
+            'memory_mb': int(scaled(4, estimate_memory_mb)),
+            'cpu_s': cost * statistics.median(cpu) if cpu else None,
+            'rows': int(statistics.median(rows)) if rows else None,
+            'samples': len(runs),
+            'os_build': build
+        }
+
+    def predict_scan(self, image_path, plugins, workers=1):
+        """Per-plugin predictions for a scan plus its total work and rough wall time"""
+        predictions = {plugin_name: self.predict(plugin_name, image_path) for plugin_name in plugins}
+        total = sum(prediction['cost_s'] for prediction in predictions.values())
+        longest = max((prediction['cost_s'] for prediction in predictions.values()), default=0)
+        return {
+            'plugins': predictions,
+            'total_s': total,
+            'wall_s': max(total / max(workers, 1), longest),
+            'peak_memory_mb': max((prediction['memory_mb'] for prediction in predictions.values()), default=0)
+        }
+
+    def budgeted(self, image_path, plugins, budget_s, priorities=None, workers=1):
+        """The most valuable plugins whose predicted run fits a wall-time budget, in their original order
+
+        Triage plugins are taken first; the rest are taken greedily by priority
+        value per predicted second while the total work spread over the
+        workers, and each single plugin, stays within the budget.
+        """
+        priorities = dict(PLUGIN_PRIORITIES, **(priorities or {}))
+        predictions = {plugin_name: self.predict(plugin_name, image_path) for plugin_name in plugins}
+
+        def priority(plugin_name):
+            return 'triage' if plugin_name in TRIAGE_PLUGINS else priorities.get(plugin_name, 'medium')
+
+        def worth(plugin_name):
+            value = PRIORITY_VALUES.get(priority(plugin_name), PRIORITY_VALUES['medium'])
+            return priority(plugin_name) != 'triage', -value / max(predictions[plugin_name]['cost_s'], 1)
+
+        chosen = set()
+        work = 0
+        for plugin_name in sorted(plugins, key=worth):
+            cost = predictions[plugin_name]['cost_s']
+            if cost <= budget_s and (work + cost) / max(workers, 1) <= budget_s:
+                chosen.add(plugin_name)
+                work += cost
+        logger.info(f"Budget of {budget_s:.0f}s fits {len(chosen)} of {len(plugins)} plugins "
+                    f"({work:.0f}s of predicted work)")
+        return [plugin_name for plugin_name in plugins if plugin_name in chosen]
+
+    def close(self):
+        self.conn.close()
+
+
+def main():
+    """Predict a scan from the run history: python src/run_stats.py image.raw --plugins a,b [--budget 600]"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description='MemHawk scan-time estimator')
+    parser.add_argument('image')
+    parser.add_argument('--plugins', required=True, help='comma separated plugin names')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--budget', type=float, help='seconds; print the plugins that fit instead')
+    args = parser.parse_args()
+
+    plugins = [name for name in args.plugins.split(',') if name]
+    stats = RunStats()
+    if args.budget:
+        print(json.dumps(stats.budgeted(args.image, plugins, args.budget, workers=args.workers)))
+    else:
+        print(json.dumps(stats.predict_scan(args.image, plugins, args.workers), indent=2))
+    stats.close()
+
+
+if __name__ == "__main__":
+    main()
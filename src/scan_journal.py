@@ -0,0 +1,127 @@
+"""
+MemHawk Scan Journal
+Durable per-case record of which plugins of a scan have finished, with the
+SHA-256 of each saved output, so a scan interrupted by a crash or restart
+resumes with only the missing or failed plugins
+
+Authors: Adriteyo Das, Anvita Warjri, Shivam Lahoty
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+
+try:
+    from .result_cache import image_fingerprint
+except ImportError:
+    from result_cache import image_fingerprint
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_FILE = 'journal.db'
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_output(path, text):
+    """Write a plugin output so that a crash leaves either the old file or the complete new one"""
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', -1, 'utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class ScanJournal:
+    """Plugin states of one case: running, done (with output checksum) or failed"""
+
+    def __init__(self, case_path, shared=False):
+        self.case_path = case_path
+        os.makedirs(case_path, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(case_path, JOURNAL_FILE), timeout=30, check_same_thread=False)
+        # WAL relies on shared memory that hosts sharing a case directory over the network do not
+        # have, so journals written from several hosts (shared) use the rollback journal
+        self.conn.execute('pragma journal_mode=delete' if shared else 'pragma journal_mode=wal')
+        # Every state change is on disk before the scan moves on
+        self.conn.execute('pragma synchronous=full')
+        self.conn.executescript('''
+            create table if not exists scan (key text primary key, value text);
+            create table if not exists jobs (plugin text primary key, state text, output text, sha256 text,
+                                             size int, started real, finished real, error text);
+        ''')
+        self.conn.commit()
+
+    def _get(self, key):
+        row = self.conn.execute('select value from scan where key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def begin(self, image_path):
+        """Tie the journal to an image; finished jobs of a different image are forgotten"""
+        fingerprint = image_fingerprint(image_path)
+        if self._get('fingerprint') not in (None, fingerprint):
+            logger.info(f"Case {self.case_path} was scanned from another image, starting over")
+            self.conn.execute('delete from jobs')
+        self.conn.executemany('insert or replace into scan values (?, ?)',
+                              [('image', os.path.abspath(image_path)), ('fingerprint', fingerprint),
+                               ('updated', str(time.time()))])
+        self.conn.commit()
+
+    def verify(self, plugin_name):
+        """True when a plugin finished and its saved output still has the recorded checksum"""
+        row = self.conn.execute("select output, sha256 from jobs where plugin = ? and state = 'done'",
+                                (plugin_name,)).fetchone()
+        if not row:
+            return False
+        path = os.path.join(self.case_path, row[0])
+        try:
+            if file_sha256(path) == row[1]:
+                return True
+        except OSError:
+            pass
+        logger.warning(f"Saved output of {plugin_name} is missing or changed, it will run again")
+        return False
+
+    def pending(self, plugins):
+        """Plugins still to run: never started, interrupted, failed or with a bad saved output"""
+        return [plugin_name for plugin_name in plugins if not self.verify(plugin_name)]
+
+    def output_path(self, plugin_name):
+        """Saved output of a finished plugin"""
+        row = self.conn.execute('select output from jobs where plugin = ?', (plugin_name,)).fetchone()
+        return os.path.join(self.case_path, row[0]) if row and row[0] else None
+
+    def start(self, plugin_name):
+        self.conn.execute("insert or replace into jobs (plugin, state, started) values (?, 'running', ?)",
+                          (plugin_name, time.time()))
+        self.conn.commit()
+
+    def finish(self, plugin_name, output_path):
+        """Record a plugin as done once its output file is complete on disk"""
+        self.conn.execute("insert or ignore into jobs (plugin) values (?)", (plugin_name,))
+        self.conn.execute("update jobs set state = 'done', output = ?, sha256 = ?, size = ?, finished = ?, "
+                          "error = null where plugin = ?",
+                          (os.path.relpath(output_path, self.case_path), file_sha256(output_path),
+                           os.path.getsize(output_path), time.time(), plugin_name))
+        self.conn.commit()
+
+    def fail(self, plugin_name, error):
+        self.conn.execute("insert or ignore into jobs (plugin) values (?)", (plugin_name,))
+        self.conn.execute("update jobs set state = 'failed', finished = ?, error = ? where plugin = ?",
+                          (time.time(), str(error), plugin_name))
+        self.conn.commit()
+
+    def states(self):
+        """{plugin: state} of every journaled plugin"""
+        return dict(self.conn.execute('select plugin, state from jobs'))
+
+    def close(self):
+        self.conn.close()
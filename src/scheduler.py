@@ -0,0 +1,406 @@
+"""
+MemHawk Plugin Scheduler
+Runs Volatility plugins on a process pool sized from the CPU count and free
+memory, admitting a plugin only when its estimated peak RSS fits
+
+Authors: Adriteyo Das, Anvita Warjri, Shivam Lahoty
+"""
+
+import os
+import time
+import itertools
+import collections
+import threading
+import logging
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+try:
+    from .plugin_catalog import supported
+    from .tracing import add_span
+except ImportError:
+    from plugin_catalog import supported
+    from tracing import add_span
+
+logger = logging.getLogger(__name__)
+
+# Estimated peak RSS of one plugin run: (fixed MB, MB per GB of image)
+PLUGIN_MEMORY_ESTIMATES = {
+    'windows.info': (200, 8),
+    'windows.pslist': (250, 8),
+    'windows.pstree': (250, 8),
+    'windows.cmdline': (250, 8),
+    'windows.dlllist': (300, 16),
+    'windows.handles': (400, 48),
+    'windows.filescan': (400, 64),
+    'windows.psscan': (350, 64),
+    'windows.modscan': (350, 64),
+    'windows.mutantscan': (350, 64),
+    'windows.symlinkscan': (350, 64),
+    'windows.driverscan': (350, 64),
+    'windows.poolscanner': (400, 64),
+    'windows.netscan': (400, 64),
+    'windows.malfind': (500, 96),
+    'windows.vadinfo': (400, 48),
+    'windows.strings': (600, 128),
+}
+DEFAULT_MEMORY_ESTIMATE = (300, 32)
+
+# Memory kept free for the GUI, the OS and the bridge itself
+MEMORY_RESERVE_MB = 1024
+
+# Rough run time of one plugin: (fixed seconds, seconds per GB of image).
+# List walkers follow kernel structures; scanners read the whole image.
+PLUGIN_COST_ESTIMATES = {
+    'windows.info': (5, 1),
+    'windows.pslist': (5, 2),
+    'windows.pstree': (5, 2),
+    'windows.cmdline': (8, 4),
+    'windows.dlllist': (10, 8),
+    'windows.handles': (15, 20),
+    'windows.vadinfo': (15, 20),
+    'windows.filescan': (10, 60),
+    'windows.psscan': (10, 60),
+    'windows.modscan': (10, 60),
+    'windows.mutantscan': (10, 60),
+    'windows.symlinkscan': (10, 60),
+    'windows.driverscan': (10, 60),
+    'windows.poolscanner': (10, 60),
+    'windows.netscan': (10, 60),
+    'windows.malfind': (20, 90),
+    'windows.strings': (30, 120),
+}
+DEFAULT_COST_ESTIMATE = (10, 30)
+# Jobs estimated to take longer than this wait for the triage plugins
+EXPENSIVE_COST_S = 60
+
+# Plugins that fill the triage views (system info, process list); they run
+# first and hold back expensive jobs of the same image until they finish
+TRIAGE_PLUGINS = ('windows.info', 'windows.pslist')
+PRIORITY_RANKS = {'triage': 0, 'high': 1, 'medium': 2, 'low': 3}
+DEFAULT_PRIORITY = 'medium'
+# Same values as the plugin list of VolatilityRunner.get_available_plugins
+PLUGIN_PRIORITIES = {
+    'windows.info': 'triage',
+    'windows.pslist': 'triage',
+    'windows.pstree': 'high',
+    'windows.filescan': 'high',
+    'windows.netscan': 'high',
+    'windows.psscan': 'medium',
+    'windows.cmdline': 'medium',
+    'windows.envars': 'low',
+    'windows.getsids': 'low',
+    'windows.vadwalk': 'low',
+    'windows.virtmap': 'low',
+    'windows.unloadedmodules': 'low',
+    'windows.verinfo': 'low',
+}
+
+
+def available_memory_mb():
+    """Free physical memory in MB, or None if it cannot be determined"""
+    try:
+        import psutil
+        return psutil.virtual_memory().available // (1024 * 1024)
+    except ImportError:
+        pass
+
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') // (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def _image_gb(image_path):
+    try:
+        return os.path.getsize(image_path) / (1024 ** 3) if image_path else 0
+    except OSError:
+        return 0
+
+
+def estimate_memory_mb(plugin_name, image_path=None, image_gb=None):
+    """Estimated peak RSS in MB of running a plugin against an image (or an image size)"""
+    base, per_gb = PLUGIN_MEMORY_ESTIMATES.get(plugin_name, DEFAULT_MEMORY_ESTIMATE)
+    return int(base + per_gb * (_image_gb(image_path) if image_gb is None else image_gb))
+
+
+def estimate_cost_s(plugin_name, image_path=None, image_gb=None):
+    """Estimated run time in seconds of a plugin against an image (or an image size)"""
+    base, per_gb = PLUGIN_COST_ESTIMATES.get(plugin_name, DEFAULT_COST_ESTIMATE)
+    return base + per_gb * (_image_gb(image_path) if image_gb is None else image_gb)
+
+
+_worker_runner = None
+
+def _run_job(image_path, plugin_name, output_format, runner_options):
+    """Worker-process entry point; keeps one runner (and warm engine) per worker"""
+    global _worker_runner
+    try:
+        from .volatility_bridge import VolatilityRunner
+        from .volatility_engine import VolatilityEngine
+    except ImportError:
+        from volatility_bridge import VolatilityRunner
+        from volatility_engine import VolatilityEngine
+
+    if _worker_runner is None:
+        options = dict(runner_options or {})
+        if options.get('use_engine', True):
+            options['engine'] = VolatilityEngine(symbol_dirs=options.get('symbol_dirs'))
+        _worker_runner = VolatilityRunner(**options)
+
+    if isinstance(plugin_name, list):
+        return _worker_runner.run_fused(image_path, plugin_name, output_format)
+    return _worker_runner.run_plugin(image_path, plugin_name, output_format)
+
+
+FINISHED_STATES = ('done', 'failed', 'cancelled', 'skipped')
+
+
+class ScanJob:
+    """One plugin run tracked by the scheduler; a fused job runs several plugins (members) as one"""
+
+    def __init__(self, job_id, image_path, plugin_name, output_format, memory_mb, members=None,
+                 priority=DEFAULT_PRIORITY, cost_s=0, after=None):
+        self.id = job_id
+        self.image_path = image_path
+        self.plugin = plugin_name
+        self.members = members
+        self.output_format = output_format
+        self.memory_mb = memory_mb
+        self.priority = priority
+        self.cost_s = cost_s
+        # Jobs that have to finish (in any way) before this one is admitted
+        self.after = list(after or [])
+        self.state = 'queued'
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.result = None
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'plugin': self.plugin,
+            'members': self.members,
+            'image': os.path.basename(self.image_path),
+            'state': self.state,
+            'priority': self.priority,
+            'memory_mb': self.memory_mb,
+            'cost_s': round(self.cost_s, 1),
+            'after': [job.id for job in self.after],
+            'elapsed': round((self.finished or time.time()) - self.started, 3) if self.started else None
+        }
+
+    @property
+    def rank(self):
+        """Admission order: triage first, then by priority, shortest estimated job first"""
+        return PRIORITY_RANKS.get(self.priority, PRIORITY_RANKS[DEFAULT_PRIORITY]), self.cost_s, self.id
+
+    def ready(self):
+        return all(job.state in FINISHED_STATES for job in self.after)
+
+
+class PluginScheduler:
+    """Run plugin jobs concurrently within CPU and memory limits, most useful results first
+
+    Queued jobs are admitted by priority and estimated cost rather than in
+    submission order, and expensive jobs wait for the triage plugins of the
+    same image, so the process list and system info arrive in minutes even
+    when slow scans are queued alongside them.
+    """
+
+    def __init__(self, max_workers=None, memory_limit_mb=None, runner_options=None, on_update=None, catalog=None,
+                 priorities=None, stats=None):
+        free_mb = available_memory_mb()
+        if memory_limit_mb is None:
+            memory_limit_mb = max(free_mb - MEMORY_RESERVE_MB, 512) if free_mb else 4096
+        self.memory_limit_mb = memory_limit_mb
+
+        if max_workers is None:
+            max_workers = max(1, min(os.cpu_count() or 1, memory_limit_mb // DEFAULT_MEMORY_ESTIMATE[0]))
+        self.max_workers = max_workers
+
+        self.runner_options = runner_options or {}
+        self.on_update = on_update
+        # Plugins missing from the installed framework's catalogue are skipped without a run
+        self.catalog = catalog
+        # Plugin name -> 'high'/'medium'/'low', e.g. from get_available_plugins
+        self.priorities = dict(PLUGIN_PRIORITIES, **(priorities or {}))
+        for plugin_name in TRIAGE_PLUGINS:
+            self.priorities[plugin_name] = 'triage'
+        # A RunStats whose history replaces the static cost and memory estimates
+        self.stats = stats
+        self.jobs = []
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.cancelled = False
+        logger.info(f"Scheduler: {self.max_workers} workers, {self.memory_limit_mb} MB memory budget")
+
+    def _priority(self, plugin_names):
+        """Best priority among plugins"""
+        return min((self.priorities.get(name, DEFAULT_PRIORITY) for name in plugin_names),
+                   key=lambda priority: PRIORITY_RANKS.get(priority, PRIORITY_RANKS[DEFAULT_PRIORITY]))
+
+    def _estimate(self, plugin_name, image_path):
+        """(memory MB, seconds) expected of a plugin run, from the run history when there is one"""
+        if self.stats:
+            try:
+                prediction = self.stats.predict(plugin_name, image_path)
+                return prediction['memory_mb'], prediction['cost_s']
+            except Exception as e:
+                logger.debug(f"No prediction for {plugin_name}: {e}")
+        return estimate_memory_mb(plugin_name, image_path), estimate_cost_s(plugin_name, image_path)
+
+    def _add(self, job):
+        """Queue a job; expensive jobs also wait for the triage jobs of their image, queued before or after"""
+        with self.lock:
+            triage = job.priority == 'triage'
+            for other in self.jobs:
+                if other.image_path != job.image_path:
+                    continue
+                if triage and other.priority != 'triage' and other.cost_s >= EXPENSIVE_COST_S:
+                    other.after.append(job)
+                elif not triage and other.priority == 'triage' and job.cost_s >= EXPENSIVE_COST_S:
+                    job.after.append(other)
+            self.jobs.append(job)
+        return job
+
+    def submit(self, image_path, plugin_name, output_format='json', after=None):
+        """Queue a plugin run and return its job; it is admitted only after the jobs in after"""
+        memory_mb, cost_s = self._estimate(plugin_name, image_path)
+        job = ScanJob(next(self.ids), image_path, plugin_name, output_format, memory_mb,
+                      priority=self._priority([plugin_name]), cost_s=cost_s, after=after)
+        if not supported(self.catalog, plugin_name):
+            job.state = 'skipped'
+            job.result = {'plugin': plugin_name, 'success': False, 'skipped': True,
+                          'error': f"{plugin_name} is not available in Volatility {self.catalog.get('version')}"}
+        return self._add(job)
+
+    def submit_fused(self, image_path, plugin_names, output_format='json', after=None):
+        """Queue pool-tag scanners that share one fused scan of the image as a single job"""
+        plugin_names = list(plugin_names)
+        # One pass over the image serves every member, so it costs about as much as the slowest one
+        estimates = [self._estimate(name, image_path) for name in plugin_names]
+        job = ScanJob(next(self.ids), image_path, '+'.join(plugin_names), output_format,
+                      max(memory_mb for memory_mb, _ in estimates), members=plugin_names,
+                      priority=self._priority(plugin_names), cost_s=max(cost_s for _, cost_s in estimates),
+                      after=after)
+        return self._add(job)
+
+    def status(self):
+        """Queue, running and finished state of every job"""
+        with self.lock:
+            jobs = list(self.jobs)
+        by_state = {'queued': [], 'running': [], 'finished': []}
+        for job in jobs:
+            by_state['finished' if job.state in FINISHED_STATES else job.state].append(job.to_dict())
+        by_state.update({
+            'workers': self.max_workers,
+            'memory_limit_mb': self.memory_limit_mb,
+            'memory_reserved_mb': sum(job.memory_mb for job in jobs if job.state == 'running')
+        })
+        return by_state
+
+    def cancel(self):
+        """Stop admitting queued jobs; running ones finish normally"""
+        self.cancelled = True
+
+    def _notify(self, event, job):
+        if self.on_update:
+            try:
+                self.on_update(event, job)
+            except Exception as e:
+                logger.error(f"Scheduler update callback failed: {e}")
+
+    def _admit(self, running):
+        """Ready queued jobs that fit the free worker slots and memory budget, in rank order
+
+        Running plugins cannot be paused, so priority is enforced at admission:
+        once a ready job does not fit the memory left, nothing of lower
+        priority is started ahead of it in the memory it is waiting for.
+        Within a priority, the image with the fewest running jobs goes first,
+        so a batch of images shares the workers instead of taking turns.
+        """
+        reserved = sum(job.memory_mb for job in running.values())
+        per_image = collections.Counter(job.image_path for job in running.values())
+        queued = [job for job in self.jobs if job.state == 'queued' and job.ready()]
+        admitted = []
+        waiting_rank = None
+        while queued and len(running) + len(admitted) < self.max_workers:
+            job = min(queued, key=lambda job: (job.rank[0], per_image[job.image_path]) + job.rank[1:])
+            queued.remove(job)
+            if waiting_rank is not None and job.rank[0] > waiting_rank:
+                break
+            # A job larger than the whole budget still runs, but only on its own
+            if reserved + job.memory_mb > self.memory_limit_mb and (running or admitted):
+                if waiting_rank is None:
+                    waiting_rank = job.rank[0]
+                continue
+            reserved += job.memory_mb
+            per_image[job.image_path] += 1
+            admitted.append(job)
+        return admitted
+
+    def run(self):
+        """Run every queued job and return the results keyed by plugin name"""
+        running = {}
+        for job in self.jobs:
+            if job.state == 'skipped':
+                logger.info(f"Skipping {job.plugin}: {job.result['error']}")
+                self._notify('finished', job)
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            while True:
+                with self.lock:
+                    if self.cancelled:
+                        for job in self.jobs:
+                            if job.state == 'queued':
+                                job.state = 'cancelled'
+                    admitted = self._admit(running)
+                    for job in admitted:
+                        job.state = 'running'
+                        job.started = time.time()
+
+                for job in admitted:
+                    future = pool.submit(_run_job, job.image_path, job.members or job.plugin, job.output_format,
+                                         self.runner_options)
+                    running[future] = job
+                    self._notify('started', job)
+
+                if not running:
+                    break
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = running.pop(future)
+                    job.finished = time.time()
+                    try:
+                        job.result = future.result()
+                        job.state = 'done'
+                    except Exception as e:
+                        logger.error(f"Plugin {job.plugin} crashed in worker: {e}")
+                        job.result = {'plugin': job.plugin, 'success': False, 'error': str(e)}
+                        job.state = 'failed'
+                    add_span('scheduler.queued', job.submitted, job.started, 'scheduler', plugin=job.plugin)
+                    add_span('scheduler.job', job.started, job.finished, 'scheduler', plugin=job.plugin,
+                             state=job.state, memory_mb=job.memory_mb, predicted_s=round(job.cost_s, 1))
+                    self._notify('finished', job)
+
+        results = {}
+        for job in self.jobs:
+            if job.result is None:
+                continue
+            if not job.members:
+                results[job.plugin] = job.result
+            elif job.state == 'done':
+                results.update(job.result)
+            else:
+                results.update({name: dict(job.result, plugin=name) for name in job.members})
+        return results
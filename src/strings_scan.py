@@ -0,0 +1,129 @@
+"""
+MemHawk Strings
+Extracts printable ASCII and UTF-16LE strings with their physical offsets
+from a memory image on all cores, stores them in the case database and
+writes the strings file the windows.strings plugin maps to processes
+
+Authors: Adriteyo Das, Anvita Warjri, Shivam Lahoty
+"""
+
+import os
+import sys
+import logging
+
+try:
+    from . import case_db
+    from .case_db import quote
+    from .parallel_scan import ParallelScanner, MAX_MATCH
+    from .result_cache import image_fingerprint
+except ImportError:
+    import case_db
+    from case_db import quote
+    from parallel_scan import ParallelScanner, MAX_MATCH
+    from result_cache import image_fingerprint
+
+logger = logging.getLogger(__name__)
+
+MIN_LENGTH = 4
+STRINGS_TABLE = 'raw_strings'
+STRINGS_DIR = os.path.join('cache', 'strings')
+BATCH_SIZE = 10000
+
+# Printable characters as GNU strings counts them (tab included, no newlines)
+PRINTABLE = rb'[\x20-\x7e\t]'
+ENCODINGS = ('ascii', 'utf-16le')
+
+
+def string_patterns(min_length=MIN_LENGTH):
+    """ASCII and UTF-16LE run patterns; runs longer than MAX_MATCH bytes are split"""
+    return [
+        PRINTABLE + b'{%d,%d}' % (min_length, MAX_MATCH),
+        b'(?:' + PRINTABLE + b'\\x00){%d,%d}' % (min_length, MAX_MATCH // 2),
+    ]
+
+
+def extract_strings(image_path, min_length=MIN_LENGTH, workers=None):
+    """(physical offset, encoding, text) for every string in the image, in offset order"""
+    scanner = ParallelScanner(string_patterns(min_length), workers=workers)
+    for offset, index, data in scanner.scan(image_path):
+        yield offset, ENCODINGS[index], data.decode(ENCODINGS[index])
+
+
+def strings_file_for(image_path):
+    """Where the strings file of an image is kept, keyed by its fingerprint"""
+    return os.path.abspath(os.path.join(STRINGS_DIR, image_fingerprint(image_path) + '.txt'))
+
+
+def store_strings(image_path, db_path=None, strings_path=None, min_length=MIN_LENGTH, workers=None):
+    """Extract strings once into the case database and/or a strings file; returns the count
+
+    The strings file uses the 'offset string' lines of GNU strings -td, which
+    is what windows.strings --strings-file reads.
+    """
+    conn = None
+    if db_path:
+        conn = case_db.connect(db_path)
+        conn.execute('begin')
+        case_db.create_table(conn, STRINGS_TABLE, [{'name': 'offset', 'type': 'int'},
+                                                   {'name': 'encoding', 'type': 'str'},
+                                                   {'name': 'string', 'type': 'str'}])
+        insert = f'insert into {quote(STRINGS_TABLE)} values (?, ?, ?)'
+
+    out = None
+    if strings_path:
+        os.makedirs(os.path.dirname(os.path.abspath(strings_path)), exist_ok=True)
+        out = open(strings_path + '.tmp', 'w', encoding='utf-8')
+
+    count = 0
+    batch = []
+    try:
+        for offset, encoding, text in extract_strings(image_path, min_length, workers):
+            count += 1
+            if out:
+                out.write(f'{offset:7d} {text}\n')
+            if conn:
+                batch.append((offset, encoding, text))
+                if len(batch) >= BATCH_SIZE:
+                    conn.executemany(insert, batch)
+                    batch = []
+        if conn:
+            if batch:
+                conn.executemany(insert, batch)
+            case_db.create_indexes(conn, STRINGS_TABLE)
+            conn.execute('commit')
+    except Exception:
+        if conn:
+            conn.execute('rollback')
+        raise
+    finally:
+        if conn:
+            conn.close()
+        if out:
+            out.close()
+
+    if out:
+        os.replace(strings_path + '.tmp', strings_path)
+    logger.info(f"Extracted {count} strings from {os.path.basename(image_path)}")
+    return count
+
+
+def ensure_strings_file(image_path):
+    """The image's strings file for windows.strings, extracting it on first use"""
+    path = strings_file_for(image_path)
+    if not os.path.exists(path):
+        store_strings(image_path, strings_path=path)
+    return path
+
+
+def main():
+    """Extract strings: python src/strings_scan.py image.raw case.db [strings.txt]"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if len(sys.argv) < 3:
+        print(main.__doc__)
+        return
+    count = store_strings(sys.argv[1], sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
+    print(f"{count} strings")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+MemHawk Symbol Store
+Indexes local Volatility symbol packs (ISF .json/.json.xz/.json.gz files and
+zip packs) by PDB name, GUID and age, and keeps each needed symbol table
+decompressed under lib/symbols so vol loads plain JSON without searching
+or decompressing the packs on every run
+
+Authors: Adriteyo Das, Anvita Warjri, Shivam Lahoty
+"""
+
+import os
+import re
+import sys
+import gzip
+import lzma
+import sqlite3
+import zipfile
+import logging
+
+try:
+    from .parallel_scan import ParallelScanner
+    from .result_cache import image_fingerprint
+except ImportError:
+    from parallel_scan import ParallelScanner
+    from result_cache import image_fingerprint
+
+logger = logging.getLogger(__name__)
+
+STORE_DIR = os.path.join('lib', 'symbols')
+# Symbol packs (windows.zip etc.) copied into the lab go here
+PACKS_DIR = os.path.join(STORE_DIR, 'packs')
+# Symbols shipped with the bundled framework
+FRAMEWORK_SYMBOLS = os.path.join('lib', 'volatility3-master', 'volatility3', 'symbols')
+
+# windows/<pdb name>/<GUID>-<age>.json[.xz|.gz]
+ISF_NAME = re.compile(r'(?:^|/)windows/([^/]+\.pdb)/([0-9A-Fa-f]{32})-?([0-9A-Fa-f]+)\.json(\.xz|\.gz)?$')
+# CodeView debug record of a kernel image: RSDS, GUID, age, PDB file name
+RSDS = rb'RSDS[\s\S]{20}(?:ntkrnlmp|ntoskrnl|ntkrnlpa|ntkrpamp)\.pdb\x00'
+
+
+def guid_string(raw):
+    """GUID bytes of a CodeView record in the upper-case form symbol files are named by"""
+    data1 = int.from_bytes(raw[0:4], 'little')
+    data2 = int.from_bytes(raw[4:6], 'little')
+    data3 = int.from_bytes(raw[6:8], 'little')
+    return f'{data1:08X}{data2:04X}{data3:04X}' + raw[8:16].hex().upper()
+
+
+def read(path, member=None):
+    """Decompressed bytes of an ISF file, optionally a member of a zip pack"""
+    if member:
+        with zipfile.ZipFile(path) as pack:
+            data = pack.read(member)
+        name = member
+    else:
+        with open(path, 'rb') as f:
+            data = f.read()
+        name = path
+    if name.endswith('.xz'):
+        return lzma.decompress(data)
+    if name.endswith('.gz'):
+        return gzip.decompress(data)
+    return data
+
+
+class SymbolStore:
+    """GUID/age index over symbol packs plus a directory of decompressed symbol tables"""
+
+    def __init__(self, store_dir=STORE_DIR, sources=None):
+        self.store_dir = os.path.abspath(store_dir)
+        self.sources = [os.path.abspath(source) for source in (sources or [PACKS_DIR, FRAMEWORK_SYMBOLS])]
+        os.makedirs(self.store_dir, exist_ok=True)
+
+        self.conn = sqlite3.connect(os.path.join(self.store_dir, 'index.db'), timeout=30, check_same_thread=False)
+        self.conn.executescript('''
+            create table if not exists symbols (pdb text, guid text, age int, source text, member text,
+                                                primary key (pdb, guid, age));
+            create table if not exists sources (path text primary key, mtime int);
+            create table if not exists images (fingerprint text primary key, pdb text, guid text, age int);
+        ''')
+        self.conn.commit()
+
+    def _changed(self, path):
+        """True (and remembered) when a pack file or directory is new or modified since it was indexed"""
+        mtime = os.stat(path).st_mtime_ns
+        row = self.conn.execute('select mtime from sources where path = ?', (path,)).fetchone()
+        if row and row[0] == mtime:
+            return False
+        self.conn.execute('insert or replace into sources values (?, ?)', (path, mtime))
+        return True
+
+    def _add(self, name, source, member=None):
+        match = ISF_NAME.search(name.replace(os.sep, '/'))
+        if match:
+            pdb, guid, age, _ = match.groups()
+            self.conn.execute('insert or replace into symbols values (?, ?, ?, ?, ?)',
+                              (pdb.lower(), guid.upper(), int(age, 16), source, member))
+
+    def refresh(self):
+        """Index new or changed packs; unchanged packs and pdb directories are skipped by mtime"""
+        for source in self.sources:
+            if not os.path.isdir(source):
+                continue
+            for entry in os.scandir(source):
+                if entry.is_file() and entry.name.endswith('.zip') and self._changed(entry.path):
+                    with zipfile.ZipFile(entry.path) as pack:
+                        for member in pack.namelist():
+                            self._add(member, entry.path, member)
+                    logger.info(f"Indexed symbol pack {entry.name}")
+
+            windows = os.path.join(source, 'windows')
+            if os.path.isdir(windows):
+                for pdb_dir in os.scandir(windows):
+                    if pdb_dir.is_dir() and self._changed(pdb_dir.path):
+                        for entry in os.scandir(pdb_dir.path):
+                            self._add(f'windows/{pdb_dir.name}/{entry.name}', entry.path)
+        self.conn.commit()
+
+    def _cached_path(self, pdb, guid, age):
+        return os.path.join(self.store_dir, 'windows', pdb, f'{guid}-{age}.json')
+
+    def resolve(self, pdb, guid, age):
+        """Path of the decompressed symbol table for a PDB GUID/age, or None if no pack has it"""
+        pdb, guid = pdb.lower(), guid.upper()
+        path = self._cached_path(pdb, guid, age)
+        if os.path.exists(path):
+            return path
+
+        row = self.conn.execute('select source, member from symbols where pdb = ? and guid = ? and age = ?',
+                                (pdb, guid, age)).fetchone()
+        if not row:
+            return None
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Processes unpacking the same table at once each write their own file
+        temporary = f'{path}.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as f:
+            f.write(read(*row))
+        os.replace(temporary, path)
+        logger.info(f"Unpacked symbols {pdb} {guid}-{age}")
+        return path
+
+    def kernel_signature(self, image_path):
+        """(pdb, GUID, age) of the kernel in an image, remembered per image fingerprint"""
+        fingerprint = image_fingerprint(image_path)
+        row = self.conn.execute('select pdb, guid, age from images where fingerprint = ?', (fingerprint,)).fetchone()
+        if row:
+            return row
+
+        signature = None
+        for _, _, record in ParallelScanner([RSDS]).scan(image_path):
+            signature = (record[24:-1].decode('ascii').lower(), guid_string(record[4:20]),
+                         int.from_bytes(record[20:24], 'little'))
+            if self.conn.execute('select 1 from symbols where pdb = ? and guid = ? and age = ?', signature).fetchone():
+                break
+        if signature:
+            self.conn.execute('insert or replace into images values (?, ?, ?, ?)', (fingerprint,) + signature)
+            self.conn.commit()
+        return signature
+
+    def prepare(self, image_path):
+        """Symbol directory to hand vol (-s) for an image, or None if the store cannot help"""
+        self.refresh()
+        if not self.conn.execute('select 1 from symbols limit 1').fetchone():
+            return None
+        try:
+            signature = self.kernel_signature(image_path)
+        except OSError as e:
+            logger.debug(f"Could not read {image_path} for its kernel signature: {e}")
+            return None
+        if signature and self.resolve(*signature):
+            return self.store_dir
+        return None
+
+    def close(self):
+        self.conn.close()
+
+
+def prepare_symbols(image_paths, store_dir=STORE_DIR):
+    """{absolute image path: symbol directory or None} for images, prepared with one store
+
+    Meant for the process that starts the workers: they get the result in
+    their runner options instead of each scanning the image for its kernel
+    and unpacking the same symbol table.
+    """
+    symbol_dirs = {os.path.abspath(image_path): None for image_path in image_paths}
+    try:
+        store = SymbolStore(store_dir)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Symbol store unavailable: {e}")
+        return symbol_dirs
+    try:
+        for image_path in symbol_dirs:
+            try:
+                symbol_dirs[image_path] = store.prepare(image_path)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Could not prepare symbols for {image_path}: {e}")
+    finally:
+        store.close()
+    return symbol_dirs
+
+
+def install(engine_symbols_path, store_dir=STORE_DIR):
+    """Put the store ahead of the framework's own symbol directories (what vol -s does)"""
+    store_dir = os.path.abspath(store_dir)
+    if store_dir not in engine_symbols_path:
+        engine_symbols_path.insert(0, store_dir)
+
+
+def main():
+    """Index packs and unpack an image's kernel symbols: python src/symbol_store.py [image.raw]"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    store = SymbolStore()
+    store.refresh()
+    print(f"{store.conn.execute('select count(*) from symbols').fetchone()[0]} symbol tables indexed")
+    if len(sys.argv) > 1:
+        signature = store.kernel_signature(sys.argv[1])
+        print(f"Kernel: {signature}")
+        print(f"Symbols: {store.resolve(*signature) if signature else None}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
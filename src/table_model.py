@@ -0,0 +1,110 @@
+import sqlite3
+from collections import OrderedDict
+
+from PyQt5.QtCore import *
+
+from .case_db import ADDRESS_COLUMN, quote
+
+
+class SqlTableModel(QAbstractTableModel):
+    # Rows are read from SQLite a page at a time as the view scrolls, and only the
+    # most recently viewed max_pages pages are kept; sorting and filtering are
+    # ORDER BY / WHERE clauses, never done in Python
+    page_size = 500
+    max_pages = 20
+
+    def __init__(self, db_path, parent=None):
+        super().__init__(parent)
+        self.conn = sqlite3.connect(db_path)
+        self.table = None
+        self.columns = []
+        self.hex_columns = set()
+        # Page index -> rows, least recently used first
+        self.pages = OrderedDict()
+        self.total = 0
+        self.where = ''
+        self.where_args = []
+        self.order = ''
+
+    def set_table(self, table):
+        self.beginResetModel()
+        self.table = table
+        self.columns = [row[1] for row in self.conn.execute('pragma table_info(%s)' % quote(table))]
+        self.hex_columns = {i for i, name in enumerate(self.columns) if ADDRESS_COLUMN.search(name)}
+        self.where = ''
+        self.where_args = []
+        self.order = ''
+        self._reload()
+        self.endResetModel()
+
+    def set_filter(self, text):
+        self.beginResetModel()
+        if text:
+            # Address columns hold integers but show as hex, so they are matched as the hex text shown
+            self.where = ' where ' + ' or '.join(("printf('0x%%x', %s) like ?" if i in self.hex_columns else '%s like ?')
+                                                 % quote(name) for i, name in enumerate(self.columns))
+            self.where_args = ['%' + text.strip() + '%'] * len(self.columns)
+        else:
+            self.where = ''
+            self.where_args = []
+        self._reload()
+        self.endResetModel()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if not self.table or column < 0 or column >= len(self.columns):
+            return
+        self.beginResetModel()
+        self.order = ' order by %s %s' % (quote(self.columns[column]), 'desc' if order == Qt.DescendingOrder else 'asc')
+        self._reload()
+        self.endResetModel()
+
+    def _reload(self):
+        self.pages.clear()
+        if not self.table:
+            self.total = 0
+            return
+        query = 'select count(*) from %s%s' % (quote(self.table), self.where)
+        self.total = self.conn.execute(query, self.where_args).fetchone()[0]
+
+    def _fetch(self, offset):
+        query = 'select * from %s%s%s limit ? offset ?' % (quote(self.table), self.where, self.order)
+        return self.conn.execute(query, self.where_args + [self.page_size, offset]).fetchall()
+
+    def _row(self, row):
+        index = row // self.page_size
+        page = self.pages.get(index)
+        if page is None:
+            page = self.pages[index] = self._fetch(index * self.page_size)
+            while len(self.pages) > self.max_pages:
+                self.pages.popitem(last=False)
+        else:
+            self.pages.move_to_end(index)
+        offset = row - index * self.page_size
+        return page[offset] if offset < len(page) else None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.total
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        row = self._row(index.row())
+        value = row[index.column()] if row else None
+        if value is None:
+            return ''
+        if index.column() in self.hex_columns and isinstance(value, int):
+            return hex(value)
+        return str(value)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.columns[section] if section < len(self.columns) else None
+        return str(section + 1)
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,224 @@
+"""
+MemHawk Tracing
+Span-based timing of the scan hot paths (process spawn, layer stacking,
+symbol loading, plugin runs, JSON decoding, ingestion, IPC), switched on at
+run time and exported as Chrome trace-event JSON plus a summary table
+
+Authors: Adriteyo Das, Anvita Warjri, Shivam Lahoty
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+import logging
+import functools
+
+logger = logging.getLogger(__name__)
+
+# Directory the spans are written to; tracing is on while it is set, and
+# worker and engine processes inherit it from the process that turned it on
+TRACE_ENV = 'MEMHAWK_TRACE'
+TRACE_FILE = 'trace.json'
+SUMMARY_FILE = 'trace_summary.txt'
+
+_lock = threading.Lock()
+_output = {'path': None, 'file': None}
+
+
+def _event_files(trace_dir):
+    return [entry.path for entry in os.scandir(trace_dir)
+            if entry.name.startswith('events-') and entry.name.endswith('.jsonl')]
+
+
+def _close():
+    with _lock:
+        if _output['file']:
+            _output['file'].close()
+        _output.update(path=None, file=None)
+
+
+def enabled():
+    return bool(os.environ.get(TRACE_ENV))
+
+
+def enable(trace_dir, fresh=False):
+    """Trace this process and every process it starts from now on into trace_dir
+
+    With fresh, events left in the directory by an earlier scan are dropped.
+    """
+    trace_dir = os.path.abspath(trace_dir)
+    os.makedirs(trace_dir, exist_ok=True)
+    if fresh:
+        _close()
+        for path in _event_files(trace_dir):
+            os.remove(path)
+    os.environ[TRACE_ENV] = trace_dir
+    return trace_dir
+
+
+def disable():
+    os.environ.pop(TRACE_ENV, None)
+    _close()
+
+
+def _write(event):
+    """Append one event to this process's event file (one file per pid, so processes never interleave)"""
+    trace_dir = os.environ.get(TRACE_ENV)
+    if not trace_dir:
+        return
+    path = os.path.join(trace_dir, f'events-{os.getpid()}.jsonl')
+    with _lock:
+        try:
+            # A forked worker gets its own file rather than sharing its parent's
+            if _output['path'] != path:
+                if _output['file']:
+                    _output['file'].close()
+                os.makedirs(trace_dir, exist_ok=True)
+                _output.update(path=path, file=open(path, 'a', encoding='utf-8'))
+            _output['file'].write(json.dumps(event, default=str) + '\n')
+            _output['file'].flush()
+        except OSError as e:
+            logger.debug(f"Could not write trace event: {e}")
+
+
+def add_span(name, start, end, category='memhawk', **args):
+    """Record a span measured elsewhere; start and end are time.time() seconds"""
+    if not enabled():
+        return
+    _write({'name': name, 'cat': category, 'ph': 'X', 'ts': int(start * 1e6), 'dur': int((end - start) * 1e6),
+            'pid': os.getpid(), 'tid': threading.get_ident(), 'args': args})
+
+
+class Span:
+    """with span('engine.construct', plugin=name): ... records the block as one complete event"""
+
+    __slots__ = ('name', 'category', 'args', 'start', 'counter')
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.time()
+        self.counter = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        _write({'name': self.name, 'cat': self.category, 'ph': 'X', 'ts': int(self.start * 1e6),
+                'dur': int((time.perf_counter() - self.counter) * 1e6), 'pid': os.getpid(),
+                'tid': threading.get_ident(), 'args': self.args})
+        return False
+
+
+class _NoSpan:
+    """What span() returns while tracing is off: costs one environment lookup"""
+
+    @property
+    def args(self):
+        return {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name, category='memhawk', **args):
+    return Span(name, category, args) if enabled() else _NO_SPAN
+
+
+def traced(name=None, category='memhawk'):
+    """Decorator form of span, named after the function unless a name is given"""
+    def decorate(function):
+        span_name = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(span_name, category):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def load_events(trace_dir):
+    """Every event written to a trace directory, in time order"""
+    events = []
+    for path in sorted(_event_files(trace_dir)):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue  # torn last line of a killed process
+    events.sort(key=lambda event: event['ts'])
+    return events
+
+
+def summarize(events):
+    """[{'name', 'count', 'total_ms', 'mean_ms', 'max_ms'}] per span name, largest total first"""
+    by_name = {}
+    for event in events:
+        by_name.setdefault(event['name'], []).append(event['dur'] / 1000)
+    rows = [{'name': name, 'count': len(durations), 'total_ms': round(sum(durations), 1),
+             'mean_ms': round(sum(durations) / len(durations), 1), 'max_ms': round(max(durations), 1)}
+            for name, durations in by_name.items()]
+    return sorted(rows, key=lambda row: row['total_ms'], reverse=True)
+
+
+def format_summary(rows):
+    lines = [f"{'span':<32} {'count':>7} {'total ms':>12} {'mean ms':>10} {'max ms':>10}"]
+    for row in rows:
+        lines.append(f"{row['name']:<32} {row['count']:>7} {row['total_ms']:>12.1f} {row['mean_ms']:>10.1f} "
+                     f"{row['max_ms']:>10.1f}")
+    return '\n'.join(lines) + '\n'
+
+
+def export(trace_dir, output_dir=None, clean=False):
+    """Write trace.json (chrome://tracing, Perfetto) and trace_summary.txt; returns their paths
+
+    With clean, the per-process event files are removed once merged.
+    """
+    output_dir = output_dir or trace_dir
+    events = load_events(trace_dir)
+    pids = sorted({event['pid'] for event in events})
+    metadata = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': f'memhawk {pid}'}} for pid in pids]
+
+    os.makedirs(output_dir, exist_ok=True)
+    trace_path = os.path.join(output_dir, TRACE_FILE)
+    with open(trace_path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}, f)
+
+    summary_path = os.path.join(output_dir, SUMMARY_FILE)
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        f.write(format_summary(summarize(events)))
+
+    if clean:
+        _close()
+        for path in _event_files(trace_dir):
+            os.remove(path)
+    logger.info(f"Wrote {len(events)} trace events from {len(pids)} processes to {trace_path}")
+    return trace_path, summary_path
+
+
+def main():
+    """Export a trace directory: python src/tracing.py <trace dir> [output dir]"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if len(sys.argv) < 2:
+        print(main.__doc__)
+        return
+    _, summary_path = export(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    with open(summary_path, 'r', encoding='utf-8') as f:
+        print(f.read())
+
+
+if __name__ == "__main__":
+    main()
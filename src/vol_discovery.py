@@ -0,0 +1,141 @@
+"""
+MemHawk Volatility Discovery
+Finds the Volatility 3 command by probing every candidate in parallel and
+keeps the result (command, version, plugin list) on disk until one of the
+candidate executables is installed, moved or replaced
+
+Authors: Adriteyo Das, Anvita Warjri, Shivam Lahoty
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import logging
+import subprocess
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+DISCOVERY_CACHE = os.path.join('cache', 'volatility.json')
+PROBE_TIMEOUT = 15
+
+CANDIDATES = [
+    'vol',  # Primary Volatility 3 command
+    'volatility3',
+    'vol3',
+    'python -m volatility3',
+    sys.executable + ' -m volatility3',
+    'vol.py',  # Legacy vol2 command
+    'python vol.py'  # Legacy vol2
+]
+
+
+def parse_version(help_text):
+    """Framework version from the banner vol prints, e.g. 'Volatility 3 Framework 2.7.0'"""
+    match = re.search(r'Framework\s+(\S+)', help_text)
+    return match.group(1) if match else 'unknown'
+
+
+def parse_plugins(help_text):
+    """Plugin names (e.g. windows.pslist) from the plugin choices listed by --help"""
+    plugins = set()
+    for choices in re.findall(r'\{([^{}]+)\}', help_text):
+        names = [name.strip() for name in choices.split(',')]
+        if len(names) > 1 and all(re.fullmatch(r'[\w.]+\.[A-Z]\w*', name) for name in names):
+            plugins.update(name.rsplit('.', 1)[0] for name in names)
+    return sorted(plugins)
+
+
+def candidate_stamp(candidate):
+    """[path, mtime] of the files a candidate command runs, or None if its executable is missing"""
+    parts = candidate.split()
+    executable = shutil.which(parts[0])
+    if not executable:
+        return None
+
+    files = [executable]
+    for index, part in enumerate(parts[1:], 1):
+        if parts[index - 1] == '-m':
+            spec = importlib.util.find_spec(part)
+            files.append(spec.origin if spec and spec.origin else part)
+        elif os.path.isfile(part):
+            files.append(os.path.abspath(part))
+
+    stamp = []
+    for path in files:
+        try:
+            stamp.append([path, os.stat(path).st_mtime_ns])
+        except OSError:
+            stamp.append([path, None])
+    return stamp
+
+
+def probe(candidate):
+    """Help text of a candidate if it is a working Volatility command, else None"""
+    try:
+        result = subprocess.run(candidate.split() + ['--help'], capture_output=True, text=True, timeout=PROBE_TIMEOUT)
+    except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError) as e:
+        logger.debug(f"Failed to find volatility at {candidate}: {e}")
+        return None
+    if result.returncode == 0 and ('volatility' in result.stdout.lower() or 'usage:' in result.stdout.lower()):
+        return result.stdout
+    return None
+
+
+def _load(cache_path):
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save(cache_path, found):
+    os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+    temp_path = cache_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(found, f, indent=2)
+    os.replace(temp_path, cache_path)
+
+
+def discover(candidates=None, cache_path=DISCOVERY_CACHE, refresh=False):
+    """{'command', 'version', 'plugins', ...} for the first working candidate; command is None if none works
+
+    A cached result is reused while every candidate resolves to the same files
+    with the same mtimes, so a warm start costs a few stat calls.
+    """
+    candidates = list(candidates or CANDIDATES)
+    stamps = {candidate: candidate_stamp(candidate) for candidate in candidates}
+
+    cached = None if refresh else _load(cache_path)
+    if cached and cached.get('stamps') == stamps:
+        return cached
+
+    # Missing executables are skipped without spawning anything
+    runnable = [candidate for candidate in candidates if stamps[candidate] or os.path.isfile(candidate.split()[0])]
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=max(len(runnable), 1)) as pool:
+        help_texts = dict(zip(runnable, pool.map(probe, runnable)))
+
+    found = {'command': None, 'version': None, 'plugins': [], 'stamps': stamps, 'probed': time.time()}
+    for candidate in runnable:
+        if help_texts[candidate]:
+            found.update(command=candidate, version=parse_version(help_texts[candidate]),
+                         plugins=parse_plugins(help_texts[candidate]))
+            break
+
+    if found['command']:
+        logger.info(f"Found Volatility at: {found['command']} ({found['version']}, "
+                    f"{len(found['plugins'])} plugins) in {time.time() - started:.1f}s")
+    else:
+        logger.warning("Volatility not found in PATH - will use demo mode")
+
+    try:
+        _save(cache_path, found)
+    except OSError as e:
+        logger.debug(f"Could not save Volatility discovery: {e}")
+    return found
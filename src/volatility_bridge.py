@@ -6,9 +6,15 @@ Authors: Adriteyo Das, Anvita Warjri, Shivam Lahoty
 """
 
 import os
+import re
 import sys
 import json
+import queue
+import argparse
+import importlib.util
+import threading
 import subprocess
+import sqlite3
 import tempfile
 from pathlib import Path
 from datetime import datetime
@@ -25,41 +31,93 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+try:
+    from .volatility_engine import EngineClient, EngineError, VolatilityEngine, serve
+    from .scheduler import PluginScheduler
+    from .result_cache import ResultCache, image_fingerprint, make_key
+    from .fused_scan import fusable
+    from .strings_scan import ensure_strings_file, strings_file_for
+    from .ioc_scan import IocMatcher, parse_iocs, scan_image as scan_image_iocs
+    from .vol_discovery import discover
+    from .image_prep import container_format, needs_container, prepare_image, prepared_layer
+    from .symbol_store import SymbolStore, prepare_symbols
+    from .plugin_catalog import load_catalog, names_catalog, save_catalog, supported
+    from .run_stats import RunMeter, RunStats
+    from . import tracing
+    from .tracing import span
+    from .scan_journal import ScanJournal, write_output
+    from .image_identity import ImageHasher
+except ImportError:
+    from volatility_engine import EngineClient, EngineError, VolatilityEngine, serve
+    from scheduler import PluginScheduler
+    from result_cache import ResultCache, image_fingerprint, make_key
+    from fused_scan import fusable
+    from strings_scan import ensure_strings_file, strings_file_for
+    from ioc_scan import IocMatcher, parse_iocs, scan_image as scan_image_iocs
+    from vol_discovery import discover
+    from image_prep import container_format, needs_container, prepare_image, prepared_layer
+    from symbol_store import SymbolStore, prepare_symbols
+    from plugin_catalog import load_catalog, names_catalog, save_catalog, supported
+    from run_stats import RunMeter, RunStats
+    import tracing
+    from tracing import span
+    from scan_journal import ScanJournal, write_output
+    from image_identity import ImageHasher
+
 class VolatilityRunner:
     """Interface for running Volatility 3 commands"""
     
-    def __init__(self):
-        self.volatility_path = self._find_volatility()
+    def __init__(self, use_engine=True, volatility_path=None, engine=None, timeout=300, use_cache=True,
+                 record_stats=True, symbol_dirs=None, output_dir=None):
+        self.volatility_version = None
+        self.volatility_plugins = []
+        self._catalog = None
+        self.symbols = None
+        # Absolute image path -> symbol directory; resolve_symbols fills it in for pool workers
+        self.symbol_dirs = dict(symbol_dirs or {})
+        # Text runs write <output_dir>/<plugin>.txt as vol prints it instead of returning the output
+        self.output_dir = output_dir
+        self.layer_paths = {}
+        self.volatility_path = volatility_path or self._find_volatility()
+        self.timeout = timeout
+        self.cache = ResultCache() if use_cache else None
+        # Wall/CPU time, peak RSS and rows of every real run, for scan-time predictions
+        self.stats = RunStats() if record_stats else None
+        # Plugins run on a warm in-process engine (a VolatilityEngine, or an
+        # EngineClient for a separate long-lived process) when volatility3 is
+        # importable; the per-plugin `vol` subprocess is the fallback
+        self.use_engine = use_engine or engine is not None
+        self.engine = engine
         
     def _find_volatility(self):
-        """Find Volatility 3 installation"""
-        possible_paths = [
-            'vol',  # Primary Volatility 3 command
-            'volatility3',
-            'vol3',
-            'python -m volatility3',
-            sys.executable + ' -m volatility3',
-            'vol.py',  # Legacy vol2 command
-            'python vol.py'  # Legacy vol2
-        ]
-        
-        for path in possible_paths:
-            try:
-                result = subprocess.run(
-                    path.split() + ['--help'], 
-                    capture_output=True, 
-                    text=True, 
-                    timeout=15
-                )
-                if result.returncode == 0 and ('volatility' in result.stdout.lower() or 'usage:' in result.stdout.lower()):
-                    logger.info(f"Found Volatility at: {path}")
-                    return path
-            except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError) as e:
-                logger.debug(f"Failed to find volatility at {path}: {e}")
-                continue
-        
-        logger.warning("Volatility not found in PATH - will use demo mode")
-        return None  # Return None to indicate no volatility found
+        """Find Volatility 3 installation (probed in parallel, cached until an executable changes)"""
+        found = discover()
+        self.volatility_version = found['version']
+        self.volatility_plugins = found['plugins']
+        return found['command']  # None when no volatility was found
+    
+    def _vol_command(self):
+        """argv prefix running vol; volatility_path is a command string or, when its paths may hold spaces, a list"""
+        if isinstance(self.volatility_path, (list, tuple)):
+            return list(self.volatility_path)
+        return self.volatility_path.split()
+    
+    def _cache_key(self, image_path, plugin_name, output_format):
+        """Cache key for a plugin run, or None if the image cannot be fingerprinted"""
+        try:
+            fingerprint = image_fingerprint(image_path)
+        except OSError:
+            return None, None
+        params = self._get_plugin_parameters(plugin_name, image_path)
+        version = self.volatility_version or 'unknown'
+        return make_key(fingerprint, plugin_name, params, version, output_format), fingerprint
+    
+    def invalidate_cache(self, image_path=None, plugin_name=None):
+        """Drop cached results for an image and/or plugin (all results if neither is given)"""
+        if not self.cache:
+            return 0
+        fingerprint = image_fingerprint(image_path) if image_path else None
+        return self.cache.invalidate(fingerprint=fingerprint, plugin_name=plugin_name)
     
     def get_available_plugins(self):
         """Get list of available Volatility plugins"""
@@ -409,12 +467,82 @@ class VolatilityRunner:
             }
         ]
         
+        # With a known catalogue, offer only what this Volatility install really has
+        catalog = self.catalog().get('plugins')
+        if catalog:
+            plugins = [plugin for plugin in common_plugins if plugin['name'] in catalog]
+            listed = {plugin['name'] for plugin in plugins}
+            plugins.extend({'name': name, 'category': 'Other', 'description': entry['description'] or name}
+                           for name, entry in catalog.items() if name not in listed)
+            return plugins
+        
         return common_plugins
     
+    def catalog(self):
+        """Plugin catalogue of the installed framework, introspected once per version and cached"""
+        if self._catalog is not None:
+            return self._catalog
+        
+        catalog = load_catalog(self.volatility_version) if self.volatility_version else None
+        if catalog is None or not catalog.get('introspected'):
+            engine = self._get_engine()
+            if engine:
+                try:
+                    if isinstance(engine, VolatilityEngine):
+                        catalog = engine.catalog()
+                    else:
+                        catalog = engine.call('catalog', timeout=120)
+                    save_catalog(catalog)
+                except (EngineError, TimeoutError, OSError) as e:
+                    logger.error(f"Plugin catalogue introspection failed: {e}")
+        if catalog is None and self.volatility_plugins:
+            catalog = names_catalog(self.volatility_plugins, self.volatility_version)
+        
+        self._catalog = catalog or {}
+        return self._catalog
+    
+    def _layer_path(self, image_path, plugin_name=None):
+        """The flattened raw layer of a container image (crash dump, vmem, ...) when prepared, else the image
+        
+        With an in-process engine the layer is prepared here on first use.
+        Plugins reading the container header are always given the image.
+        """
+        if plugin_name and needs_container(plugin_name):
+            return image_path
+        if image_path not in self.layer_paths:
+            with span('layer.prepare'):
+                layer = prepared_layer(image_path)
+                if layer is None and container_format(image_path) and isinstance(self.engine, VolatilityEngine) \
+                        and self._get_engine():
+                    layer = prepare_image(image_path, self.engine)
+            self.layer_paths[image_path] = layer or image_path
+        return self.layer_paths[image_path]
+    
+    def _symbol_args(self, image_path):
+        """-s arguments pointing vol at the MemHawk symbol store when it has the image's kernel symbols"""
+        image_path = os.path.abspath(image_path)
+        if image_path not in self.symbol_dirs:
+            try:
+                with span('symbols.prepare'):
+                    if self.symbols is None:
+                        self.symbols = SymbolStore()
+                    self.symbol_dirs[image_path] = self.symbols.prepare(image_path)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Symbol store unavailable: {e}")
+                self.symbol_dirs[image_path] = None
+        symbol_dir = self.symbol_dirs[image_path]
+        return ['-s', symbol_dir] if symbol_dir else []
+    
+    def supports(self, plugin_name):
+        """False when the installed framework is known not to have a plugin"""
+        return supported(self.catalog(), plugin_name)
+    
     def _get_plugin_parameters(self, plugin_name, image_path):
         """Get special parameters required for specific plugins"""
+        if plugin_name == 'windows.strings':
+            # Extracted by strings_scan; only this plugin needs the image fingerprinted here
+            return ['--strings-file', strings_file_for(image_path)]
         plugin_params = {
-            'windows.strings': ['--strings-file', 'strings.txt'],  # Skip this plugin as it needs external strings file
             'windows.dumpfiles': ['--virtaddr', '0x0'],  # Skip without specific virtual address
             'windows.registry.printkey': ['--key', 'Software'],  # Default to Software key
             'windows.vadregexscan': ['--pattern', 'MZ'],  # Default pattern
@@ -423,26 +551,222 @@ class VolatilityRunner:
         
         return plugin_params.get(plugin_name, [])
     
+    def _params_to_config(self, params):
+        """Turn CLI-style plugin parameters into engine config values"""
+        config = {}
+        index = 0
+        while index < len(params):
+            key = params[index].lstrip('-').replace('-', '_')
+            if index + 1 < len(params) and not params[index + 1].startswith('--'):
+                value = params[index + 1]
+                # File arguments are URI requirements in the framework
+                if key.endswith('_file') and os.path.exists(value):
+                    value = Path(value).absolute().as_uri()
+                config[key] = value
+                index += 2
+            else:
+                config[key] = True
+                index += 1
+        return config
+    
+    def _get_engine(self):
+        """Return the warm engine, starting it on first use"""
+        if not self.use_engine:
+            return None
+        
+        if self.engine is None:
+            self.engine = EngineClient()
+        
+        try:
+            if isinstance(self.engine, VolatilityEngine):
+                state = self.engine.ping()
+            else:
+                state = self.engine.call('ping', timeout=60)
+        except (EngineError, TimeoutError, OSError) as e:
+            state = {'available': False, 'error': str(e)}
+        
+        if not state.get('available'):
+            logger.info(f"Volatility engine unavailable, using vol subprocess: {state.get('error')}")
+            self.close()
+            self.use_engine = False
+            return None
+        
+        if not self.volatility_version:
+            self.volatility_version = state.get('version')
+        
+        return self.engine
+    
+    def _run_plugin_engine(self, engine, image_path, plugin_name, timestamp):
+        """Run a plugin on the warm engine context"""
+        params = self._params_to_config(self._get_plugin_parameters(plugin_name, image_path))
+        
+        with span('engine.run_plugin', plugin=plugin_name):
+            if isinstance(engine, VolatilityEngine):
+                result = engine.run_plugin(image_path, plugin_name, params=params)
+            else:
+                result = engine.call('run_plugin', image_path=image_path, plugin_name=plugin_name, params=params)
+        
+        logger.info(f"Plugin {plugin_name} completed successfully on the engine")
+        return {
+            'plugin': plugin_name,
+            'success': True,
+            'output': result['rows'],
+            'columns': result['columns'],
+            'command': f'engine - {plugin_name}',
+            'timestamp': timestamp,
+            'stderr': None
+        }
+    
+    def close(self):
+        """Stop the engine process, if one was started"""
+        if isinstance(self.engine, EngineClient):
+            self.engine.close()
+        self.engine = None
+    
     def run_plugin(self, image_path, plugin_name, output_format='json'):
+        """Run a single Volatility plugin, answering from the result cache when possible"""
+        
+        # Text written into a case directory is not cached: such a result only points at that case's file
+        to_file = output_format == 'text' and self.output_dir
+        key, fingerprint = self._cache_key(image_path, plugin_name, output_format) \
+            if self.cache and not to_file else (None, None)
+        if key:
+            with span('cache.get', plugin=plugin_name):
+                cached = self.cache.get(key)
+            if cached is not None:
+                logger.info(f"Cache hit for {plugin_name} on {os.path.basename(image_path)}")
+                cached['cached'] = True
+                return cached
+        
+        with RunMeter() as meter, span('run_plugin', plugin=plugin_name):
+            result = self._run_plugin_uncached(image_path, plugin_name, output_format)
+        if self.stats:
+            self.stats.record(image_path, plugin_name, result, meter)
+        
+        # Demo data and failures are never cached; only real, successful output
+        if key and result.get('success') and not result.get('demo'):
+            with span('cache.put', plugin=plugin_name):
+                self.cache.put(key, result, fingerprint=fingerprint, plugin_name=plugin_name,
+                               version=self.volatility_version)
+        return result
+    
+    def run_fused(self, image_path, plugin_names, output_format='json'):
+        """Run pool-tag scanning plugins from one shared scan of the image; results keyed by plugin
+
+        Cached plugins are answered from the cache; the rest share one fused pass on the
+        engine, and fall back to separate runs if the engine cannot fuse them.
+        """
+        results = {}
+        pending = []
+        keys = {}
+        for plugin_name in plugin_names:
+            key, fingerprint = self._cache_key(image_path, plugin_name, output_format) if self.cache else (None, None)
+            cached = self.cache.get(key) if key else None
+            if cached is not None:
+                cached['cached'] = True
+                results[plugin_name] = cached
+            else:
+                keys[plugin_name] = (key, fingerprint)
+                pending.append(plugin_name)
+
+        engine = self._get_engine() if output_format == 'json' and len(fusable(pending)) > 1 else None
+        if engine:
+            timestamp = datetime.now().isoformat()
+            fused = fusable(pending)
+            try:
+                layer_path = self._layer_path(image_path)
+                with RunMeter() as meter, span('engine.run_fused', plugins=fused):
+                    if isinstance(engine, VolatilityEngine):
+                        outputs = engine.run_fused(layer_path, fused)
+                    else:
+                        outputs = engine.call('run_fused', image_path=layer_path, plugin_names=fused)
+                logger.info(f"Fused scan of {', '.join(fused)} completed on the engine")
+                for plugin_name, output in outputs.items():
+                    result = {
+                        'plugin': plugin_name,
+                        'success': True,
+                        'output': output['rows'],
+                        'columns': output['columns'],
+                        'command': f"engine - fused {plugin_name}",
+                        'timestamp': timestamp,
+                        'stderr': None
+                    }
+                    if self.stats:
+                        # Every member is charged the whole shared pass
+                        self.stats.record(image_path, plugin_name, result, meter, fused=True)
+                    key, fingerprint = keys[plugin_name]
+                    if key:
+                        self.cache.put(key, result, fingerprint=fingerprint, plugin_name=plugin_name,
+                                       version=self.volatility_version)
+                    results[plugin_name] = result
+            except (EngineError, TimeoutError) as e:
+                logger.error(f"Fused scan failed, running the plugins separately: {e}")
+
+        for plugin_name in pending:
+            if plugin_name not in results:
+                results[plugin_name] = self.run_plugin(image_path, plugin_name, output_format)
+        return results
+
+    def scan_iocs(self, image_path, iocs, processes=False):
+        """Hits of a whole IOC set (IOC file lines) in one pass over the raw image or process VADs"""
+        image_path = self._layer_path(image_path)
+        if not processes:
+            return list(scan_image_iocs(image_path, IocMatcher(parse_iocs(iocs))))
+        
+        engine = self._get_engine()
+        if not engine:
+            raise EngineError("Process IOC scans need the Volatility engine")
+        if isinstance(engine, VolatilityEngine):
+            return engine.scan_process_iocs(image_path, iocs)
+        return engine.call('scan_process_iocs', image_path=image_path, iocs=iocs)
+    
+    def _run_plugin_uncached(self, image_path, plugin_name, output_format='json'):
         """Run a single Volatility plugin"""
         
         timestamp = datetime.now().isoformat()
         logger.info(f"Running plugin {plugin_name} on {os.path.basename(image_path)}")
+        image_path = self._layer_path(image_path, plugin_name)
+        
+        engine = self._get_engine() if output_format == 'json' else None
         
         # If no volatility found, return demo data
-        if not self.volatility_path:
+        if not self.volatility_path and not engine:
             logger.info(f"No Volatility installation found, returning demo data for {plugin_name}")
             return self._generate_demo_data(plugin_name, timestamp)
         
         # Skip plugins that require external files or specific parameters we don't have
-        skip_plugins = ['windows.strings', 'windows.dumpfiles']
+        skip_plugins = ['windows.dumpfiles']
         if plugin_name in skip_plugins:
             logger.info(f"Skipping {plugin_name} - requires additional parameters")
             return self._generate_demo_data(plugin_name, timestamp, error_info=f"{plugin_name} requires additional parameters")
+        if not self.supports(plugin_name):
+            logger.info(f"Skipping {plugin_name} - not in Volatility {self.volatility_version}")
+            return self._generate_demo_data(plugin_name, timestamp, error_info=f"{plugin_name} is not available in this Volatility version")
+        
+        if plugin_name == 'windows.strings':
+            with span('strings.extract'):
+                ensure_strings_file(image_path)
+        
+        if engine:
+            try:
+                return self._run_plugin_engine(engine, image_path, plugin_name, timestamp)
+            except (EngineError, TimeoutError) as e:
+                logger.error(f"Engine run of {plugin_name} failed: {e}")
+                if not self.volatility_path:
+                    return self._generate_demo_data(plugin_name, timestamp, error_info=str(e))
+                logger.info(f"Retrying {plugin_name} with the vol subprocess")
+        
+        if output_format == 'text' and self.output_dir:
+            try:
+                return self._run_plugin_to_file(image_path, plugin_name, timestamp)
+            except (OSError, ValueError) as e:
+                logger.error(f"Error running plugin {plugin_name}: {e}")
+                return self._generate_demo_data(plugin_name, timestamp, error_info=str(e))
         
         try:
             # Build the command
-            cmd = self.volatility_path.split()
+            cmd = self._vol_command()
+            cmd.extend(self._symbol_args(image_path))
             cmd.extend(['-f', image_path])
             
             # Add output format if supported
@@ -459,19 +783,21 @@ class VolatilityRunner:
             logger.info(f"Executing command: {' '.join(cmd)}")
             
             # Run the command
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300,  # 5 minute timeout
-                cwd=os.getcwd()
-            )
+            with span('vol.subprocess', plugin=plugin_name):
+                result = subprocess.run(
+                    cmd,
+                    capture_output=True,
+                    text=True,
+                    timeout=self.timeout,  # 5 minute timeout by default
+                    cwd=os.getcwd()
+                )
             
             if result.returncode == 0:
                 # Try to parse JSON output
                 try:
                     if output_format == 'json' and result.stdout.strip():
-                        output_data = json.loads(result.stdout)
+                        with span('json.decode', plugin=plugin_name, bytes=len(result.stdout)):
+                            output_data = json.loads(result.stdout)
                     else:
                         output_data = result.stdout
                 except json.JSONDecodeError:
@@ -502,6 +828,264 @@ class VolatilityRunner:
             logger.error(f"Error running plugin {plugin_name}: {e}")
             return self._generate_demo_data(plugin_name, timestamp, error_info=str(e))
     
+    def _run_plugin_to_file(self, image_path, plugin_name, timestamp):
+        """Run a plugin with vol's text renderer, copying stdout line by line into <output_dir>/<plugin>.txt
+        
+        The output is never held whole: the banner and the blank lines before
+        the table are dropped and every other line goes to the file as vol
+        prints it. The file replaces an earlier one only when the run succeeds;
+        the result has 'output_path' and 'lines' in place of 'output'.
+        """
+        save_path = os.path.join(self.output_dir, plugin_name + '.txt')
+        temp_path = save_path + '.tmp'
+        cmd = self._vol_command()
+        cmd.extend(self._symbol_args(image_path))
+        cmd.extend(['-f', image_path, plugin_name])
+        cmd.extend(self._get_plugin_parameters(plugin_name, image_path))
+        logger.info(f"Executing command: {' '.join(cmd)}")
+        
+        lines = 0
+        try:
+            with tempfile.TemporaryFile(mode='w+', encoding='utf-8', errors='replace') as stderr, \
+                    span('vol.subprocess', plugin=plugin_name), open(temp_path, 'w', -1, 'utf-8') as f:
+                # vol is told to write UTF-8 whatever the locale; a stray undecodable byte in a name or path
+                # becomes U+FFFD instead of failing the plugin
+                process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr, encoding='utf-8',
+                                           errors='replace', cwd=os.getcwd(),
+                                           env=dict(os.environ, PYTHONIOENCODING='utf-8'))
+                timed_out = threading.Event()
+                timer = None
+                if self.timeout:
+                    def expire():
+                        timed_out.set()
+                        process.kill()
+                    timer = threading.Timer(self.timeout, expire)
+                    timer.start()
+                
+                try:
+                    started = False
+                    for line in process.stdout:
+                        line = line.rstrip('\r\n')
+                        if not started:
+                            if not line.strip() or line.startswith('Volatility 3 Framework'):
+                                continue
+                            started = True
+                        f.write(line + '\n')
+                        lines += 1
+                    f.flush()
+                    os.fsync(f.fileno())
+                finally:
+                    if timer:
+                        timer.cancel()
+                    if process.poll() is None:
+                        process.kill()
+                    returncode = process.wait()
+                
+                stderr.seek(0)
+                errors = stderr.read()[-2000:]
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        
+        if returncode != 0:
+            os.remove(temp_path)
+            logger.error(f"Plugin {plugin_name} failed with return code {returncode}")
+            error = f"Plugin execution timed out ({self.timeout} seconds)" if timed_out.is_set() else \
+                errors or f"vol exited with code {returncode}"
+            return self._generate_demo_data(plugin_name, timestamp, error_info=error)
+        
+        os.replace(temp_path, save_path)
+        logger.info(f"Plugin {plugin_name} completed successfully, {lines} lines in {save_path}")
+        return {
+            'plugin': plugin_name,
+            'success': True,
+            'output': None,
+            'output_path': save_path,
+            'lines': lines,
+            'command': ' '.join(cmd),
+            'timestamp': timestamp,
+            'stderr': errors or None
+        }
+    
+    def stream_plugin(self, image_path, plugin_name, batch_size=1000):
+        """Yield a plugin's rows in batches as they are produced
+        
+        Yields {'type': 'rows', ...} events followed by one {'type': 'end', ...}
+        summary. Rows already yielded stay valid if the plugin later fails or
+        times out; the summary then has success False and partial True.
+        """
+        timestamp = datetime.now().isoformat()
+        logger.info(f"Streaming plugin {plugin_name} on {os.path.basename(image_path)}")
+        
+        key, _ = self._cache_key(image_path, plugin_name, 'json') if self.cache else (None, None)
+        cached = self.cache.get(key) if key else None
+        if cached is not None:
+            yield from self._stream_output(plugin_name, cached['output'], batch_size, timestamp, cached=True)
+            return
+        image_path = self._layer_path(image_path, plugin_name)
+        
+        engine = self._get_engine()
+        skip_plugins = ['windows.dumpfiles']
+        if (not self.volatility_path and not engine) or plugin_name in skip_plugins or not self.supports(plugin_name):
+            demo = self._generate_demo_data(plugin_name, timestamp)
+            yield from self._stream_output(plugin_name, demo['output'], batch_size, timestamp, demo=True)
+            return
+        
+        if plugin_name == 'windows.strings':
+            with span('strings.extract'):
+                ensure_strings_file(image_path)
+        
+        if engine:
+            row_count = 0
+            try:
+                for event in self._stream_engine(engine, image_path, plugin_name, batch_size):
+                    if event['type'] == 'rows':
+                        row_count += len(event['rows'])
+                    yield event
+                return
+            except (EngineError, TimeoutError) as e:
+                logger.error(f"Engine stream of {plugin_name} failed: {e}")
+                if row_count or not self.volatility_path:
+                    yield self._stream_end(plugin_name, timestamp, row_count, error=str(e))
+                    return
+        
+        yield from self._stream_subprocess(image_path, plugin_name, batch_size, timestamp)
+    
+    def _stream_end(self, plugin_name, timestamp, row_count, error=None, **extra):
+        """Final event of a stream"""
+        end = {
+            'type': 'end',
+            'plugin': plugin_name,
+            'success': error is None,
+            'partial': error is not None and row_count > 0,
+            'row_count': row_count,
+            'error': error,
+            'timestamp': timestamp
+        }
+        end.update(extra)
+        return end
+    
+    def _stream_output(self, plugin_name, output, batch_size, timestamp, **extra):
+        """Stream an already complete output (cache hit or demo data)"""
+        rows = output if isinstance(output, list) else [output]
+        for start in range(0, len(rows), batch_size):
+            yield {'type': 'rows', 'plugin': plugin_name, 'rows': rows[start:start + batch_size]}
+        yield self._stream_end(plugin_name, timestamp, len(rows), **extra)
+    
+    def _stream_engine(self, engine, image_path, plugin_name, batch_size):
+        """Stream rows from the in-process engine or the engine process"""
+        timestamp = datetime.now().isoformat()
+        params = self._params_to_config(self._get_plugin_parameters(plugin_name, image_path))
+        
+        if isinstance(engine, VolatilityEngine):
+            # Run the engine on a thread; the small queue bounds how far it can run ahead
+            batches = queue.Queue(maxsize=4)
+            outcome = {}
+            # Set when the consumer stops early, so the producer never blocks on a full queue
+            cancelled = threading.Event()
+            
+            def put(item):
+                while not cancelled.is_set():
+                    try:
+                        batches.put(item, timeout=0.1)
+                        return
+                    except queue.Full:
+                        continue
+                if item is not None:
+                    # Unwinds the plugin's populate so the engine session is released
+                    raise EngineError(f"Stream of {plugin_name} was abandoned")
+            
+            def produce():
+                try:
+                    outcome['summary'] = engine.stream_rows(image_path, plugin_name,
+                                                            lambda rows, columns: put((rows, columns)),
+                                                            params=params, batch_size=batch_size)
+                except Exception as e:
+                    outcome['error'] = e
+                put(None)
+            
+            threading.Thread(target=produce, daemon=True).start()
+            try:
+                while True:
+                    batch = batches.get()
+                    if batch is None:
+                        break
+                    yield {'type': 'rows', 'plugin': plugin_name, 'rows': batch[0], 'columns': batch[1]}
+            finally:
+                cancelled.set()
+                while True:
+                    try:
+                        batches.get_nowait()
+                    except queue.Empty:
+                        break
+            if 'error' in outcome:
+                raise EngineError(str(outcome['error']))
+            summary = outcome['summary']
+        else:
+            for kind, payload in engine.stream('stream_plugin', image_path=image_path, plugin_name=plugin_name,
+                                               params=params, batch_size=batch_size):
+                if kind == 'notify':
+                    yield {'type': 'rows', 'plugin': plugin_name, 'rows': payload['rows'], 'columns': payload['columns']}
+                else:
+                    summary = payload
+        
+        yield self._stream_end(plugin_name, timestamp, summary['row_count'], columns=summary['columns'])
+    
+    def _stream_subprocess(self, image_path, plugin_name, batch_size, timestamp):
+        """Stream rows from `vol -r jsonl`, one JSON row per stdout line"""
+        cmd = self._vol_command()
+        cmd.extend(self._symbol_args(image_path))
+        cmd.extend(['-f', image_path, '-r', 'jsonl', plugin_name])
+        cmd.extend(self._get_plugin_parameters(plugin_name, image_path))
+        logger.info(f"Executing command: {' '.join(cmd)}")
+        
+        row_count = 0
+        batch = []
+        error = None
+        with tempfile.TemporaryFile(mode='w+') as stderr:
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr, text=True, cwd=os.getcwd())
+            timed_out = threading.Event()
+            timer = None
+            if self.timeout:
+                def expire():
+                    timed_out.set()
+                    process.kill()
+                timer = threading.Timer(self.timeout, expire)
+                timer.start()
+            
+            try:
+                for line in process.stdout:
+                    if not line.startswith('{'):
+                        continue
+                    try:
+                        batch.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+                    if len(batch) >= batch_size:
+                        row_count += len(batch)
+                        yield {'type': 'rows', 'plugin': plugin_name, 'rows': batch}
+                        batch = []
+            finally:
+                if timer:
+                    timer.cancel()
+                if process.poll() is None:
+                    process.kill()
+                returncode = process.wait()
+            
+            if batch:
+                row_count += len(batch)
+                yield {'type': 'rows', 'plugin': plugin_name, 'rows': batch}
+            
+            if returncode != 0:
+                stderr.seek(0)
+                error = stderr.read()[-2000:] or f"vol exited with code {returncode}"
+                if timed_out.is_set():
+                    error = f"Plugin execution timed out ({self.timeout} seconds)"
+                logger.error(f"Plugin {plugin_name} stream ended with return code {returncode}")
+        
+        yield self._stream_end(plugin_name, timestamp, row_count, error=error)
+    
     def _generate_demo_data(self, plugin_name, timestamp, error_info=None):
         """Generate realistic demo data for plugins"""
         
@@ -642,8 +1226,232 @@ class VolatilityRunner:
             'original_error': error_info
         }
 
+class BridgeService:
+    """Methods served by `volatility_bridge.py --serve`"""
+    
+    def __init__(self, runner):
+        self.runner = runner
+        self.notify = None
+    
+    def run_plugin(self, image_path, plugin_name, output_format='json'):
+        return self.runner.run_plugin(image_path, plugin_name, output_format)
+    
+    def get_available_plugins(self):
+        return self.runner.get_available_plugins()
+    
+    def invalidate_cache(self, image_path=None, plugin_name=None):
+        return self.runner.invalidate_cache(image_path, plugin_name)
+    
+    def stream_plugin(self, image_path, plugin_name, batch_size=1000):
+        """Send row batches as plugin_rows notifications and return the end summary"""
+        for event in self.runner.stream_plugin(image_path, plugin_name, batch_size):
+            if event['type'] == 'end':
+                return event
+            if self.notify:
+                self.notify('plugin_rows', event)
+    
+    def scan_iocs(self, image_path, iocs, processes=False):
+        return self.runner.scan_iocs(image_path, iocs, processes)
+    
+    def scan(self, image_path, plugins, max_workers=None, budget_s=None, case_dir=None):
+        """Run plugins on the scheduler, sending a scan_progress notification per event"""
+        return run_scan(image_path, plugins, max_workers=max_workers, budget_s=budget_s, case_dir=case_dir,
+                        emit=lambda event: self.notify and self.notify('scan_progress', event))
+    
+    def predict_scan(self, image_path, plugins, max_workers=1):
+        """Predicted run time and memory per plugin, from the run history"""
+        return self.runner.stats.predict_scan(image_path, plugins, max_workers)
+
+BRIDGE_METHODS = ['run_plugin', 'get_available_plugins', 'scan', 'invalidate_cache', 'stream_plugin', 'scan_iocs',
+                  'predict_scan']
+
+def resolve_symbols(image_paths):
+    """runner_options['symbol_dirs'] for images, so pool workers find their kernel symbols ready
+
+    Each image is scanned for its kernel signature once, here; its prepared
+    layer, which is what the workers open, shares its entry.
+    """
+    with span('symbols.prepare'):
+        symbol_dirs = prepare_symbols(image_paths)
+    for image_path in image_paths:
+        layer = prepared_layer(image_path)
+        if layer:
+            symbol_dirs[os.path.abspath(layer)] = symbol_dirs[os.path.abspath(image_path)]
+    return symbol_dirs
+
+def run_scan(image_path, plugins, max_workers=None, emit=None, budget_s=None, case_dir=None):
+    """Run plugins through the PluginScheduler and report planned/started/finished events
+
+    When volatility3 is importable, the pool-tag scanners among the plugins
+    share one fused scan job instead of each reading the whole image. Jobs
+    start in the order of the priorities given in get_available_plugins.
+    With budget_s, only the most valuable plugins predicted to finish within
+    that many seconds are run. With case_dir, results are saved there as
+    <plugin>.json under a scan journal, and plugins whose saved result is
+    intact are not run again.
+    
+    The image's full SHA-256 and MD5 are computed on a background thread
+    while the plugins run and reported in an 'identity' event (and saved in
+    the case directory); the scan does not return before they are known.
+    """
+    completed = []
+    journal = ScanJournal(case_dir) if case_dir else None
+    if emit:
+        # The hashing thread reports too, so events are written one at a time
+        emit_lock = threading.Lock()
+        unlocked_emit = emit
+        
+        def emit(event):
+            with emit_lock:
+                unlocked_emit(event)
+    hasher = ImageHasher(image_path, case_path=case_dir,
+                         on_done=lambda identity: emit and emit({'event': 'identity', 'identity': identity})).start()
+    
+    def on_update(event, job):
+        for plugin_name in job.members or [job.plugin]:
+            result = None
+            if event == 'finished':
+                completed.append(plugin_name)
+                result = job.result
+                if job.members:
+                    result = job.result.get(plugin_name) if job.state == 'done' else dict(job.result, plugin=plugin_name)
+            if journal and event == 'started':
+                journal.start(plugin_name)
+            elif journal:
+                save_path = os.path.join(case_dir, plugin_name + '.json')
+                write_output(save_path, json.dumps(result, default=str))
+                if result.get('success') and not result.get('demo'):
+                    journal.finish(plugin_name, save_path)
+                else:
+                    journal.fail(plugin_name, result.get('error') or result.get('original_error'))
+            if emit:
+                emit({
+                    'event': event,
+                    'plugin': plugin_name,
+                    'completed': len(completed),
+                    'total': len(plugins),
+                    'result': result,
+                    'status': scheduler.status()
+                })
+    
+    # Container images are flattened once here rather than by every worker
+    if importlib.util.find_spec('volatility3') and container_format(image_path):
+        prepare_image(image_path)
+    runner = VolatilityRunner(use_engine=False, use_cache=False, record_stats=False)
+    catalog = runner.catalog()
+    priorities = {plugin['name']: plugin['priority'] for plugin in runner.get_available_plugins() if plugin.get('priority')}
+    stats = RunStats()
+    # Kernel symbols are found once here, not by every worker at once
+    runner_options = {'symbol_dirs': resolve_symbols([image_path])}
+    scheduler = PluginScheduler(max_workers=max_workers, runner_options=runner_options, on_update=on_update,
+                                catalog=catalog, priorities=priorities, stats=stats)
+    if budget_s:
+        plugins = stats.budgeted(image_path, plugins, budget_s, priorities, scheduler.max_workers)
+    
+    resumed = {}
+    if journal:
+        journal.begin(image_path)
+        pending = journal.pending(plugins)
+        for plugin_name in plugins:
+            if plugin_name not in pending:
+                with open(journal.output_path(plugin_name), 'r', encoding='utf-8') as f:
+                    resumed[plugin_name] = dict(json.load(f), resumed=True)
+    to_run = [plugin_name for plugin_name in plugins if plugin_name not in resumed]
+    
+    if emit:
+        emit({'event': 'planned', 'prediction': stats.predict_scan(image_path, to_run, scheduler.max_workers),
+              'resumed': list(resumed), 'fingerprint': hasher.identity['fingerprint']})
+        for plugin_name, result in resumed.items():
+            completed.append(plugin_name)
+            emit({'event': 'finished', 'plugin': plugin_name, 'completed': len(completed), 'total': len(plugins),
+                  'result': result, 'status': scheduler.status()})
+    fused = [name for name in fusable(to_run) if supported(catalog, name)] if importlib.util.find_spec('volatility3') else []
+    if len(fused) > 1:
+        scheduler.submit_fused(image_path, fused)
+    for plugin_name in to_run:
+        if len(fused) < 2 or plugin_name not in fused:
+            scheduler.submit(image_path, plugin_name)
+    try:
+        results = scheduler.run()
+    finally:
+        if journal:
+            journal.close()
+    hasher.wait()
+    results.update(resumed)
+    return results
+
 def main():
     """Test the VolatilityRunner"""
+    parser = argparse.ArgumentParser(description='MemHawk Backend Bridge')
+    parser.add_argument('--serve', action='store_true', help='answer JSON-RPC requests on stdin/stdout')
+    parser.add_argument('--scan', action='store_true', help='run plugins and write NDJSON progress to stdout')
+    parser.add_argument('--image', help='memory image for --scan')
+    parser.add_argument('--plugins', default='', help='comma separated plugin names for --scan')
+    parser.add_argument('--workers', type=int, help='worker processes for --scan')
+    parser.add_argument('--budget', type=float, help='seconds; --scan runs only the plugins predicted to fit')
+    parser.add_argument('--case', help='case directory for --scan results; an interrupted scan resumes from it')
+    parser.add_argument('--stream', action='store_true', help='write plugin rows to stdout as NDJSON batches')
+    parser.add_argument('--batch-size', type=int, default=1000, help='rows per NDJSON batch for --stream')
+    parser.add_argument('--invalidate-cache', action='store_true', help='drop cached results (limit with --image/--plugins)')
+    parser.add_argument('--prepare', action='store_true', help='flatten a container --image into a reusable raw layer')
+    parser.add_argument('--list-plugins', action='store_true', help='print the available plugins as JSON')
+    parser.add_argument('--rediscover', action='store_true', help='probe for Volatility again instead of using the cached result')
+    parser.add_argument('--trace', help='write Chrome trace events and a span summary of this run to this directory')
+    args = parser.parse_args()
+    
+    if args.trace:
+        tracing.enable(args.trace, fresh=True)
+        try:
+            run_command(args)
+        finally:
+            tracing.export(args.trace, clean=True)
+        return
+    run_command(args)
+
+def run_command(args):
+    """Carry out the bridge command selected on the command line"""    
+    if args.invalidate_cache:
+        runner = VolatilityRunner(use_engine=False, volatility_path='vol')  # no discovery needed
+        plugins = [name for name in args.plugins.split(',') if name] or [None]
+        removed = sum(runner.invalidate_cache(args.image, plugin_name) for plugin_name in plugins)
+        print(json.dumps({'invalidated': removed}))
+        return
+    
+    if args.prepare:
+        print(json.dumps({'image': args.image, 'layer': prepare_image(args.image)}))
+        return
+    
+    if args.rediscover:
+        discover(refresh=True)
+    
+    if args.list_plugins:
+        print(json.dumps(VolatilityRunner(engine=VolatilityEngine(), use_cache=False).get_available_plugins()))
+        return
+    
+    if args.serve:
+        # Long-lived bridge: one warm in-process engine answering JSON-RPC on stdin/stdout
+        serve(BridgeService(VolatilityRunner(engine=VolatilityEngine())), BRIDGE_METHODS)
+        return
+    
+    if args.stream:
+        runner = VolatilityRunner()
+        for plugin_name in [name for name in args.plugins.split(',') if name]:
+            for event in runner.stream_plugin(args.image, plugin_name, args.batch_size):
+                print(json.dumps(event, default=str), flush=True)
+        runner.close()
+        return
+    
+    if args.scan:
+        def emit(event):
+            with span('ipc.emit', 'ipc', event=event['event']):
+                print(json.dumps(event, default=str), flush=True)
+        
+        plugins = [name for name in args.plugins.split(',') if name]
+        results = run_scan(args.image, plugins, max_workers=args.workers, emit=emit, budget_s=args.budget,
+                           case_dir=args.case)
+        emit({'event': 'complete', 'results': results})
+        return
+    
     runner = VolatilityRunner()
     
     print("MemHawk Backend Bridge Test")
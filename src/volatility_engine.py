@@ -0,0 +1,500 @@
+"""
+MemHawk Volatility Engine
+Runs Volatility 3 plugins in-process against a warm, per-image context and
+serves them to the bridge over a stdin/stdout JSON-RPC channel
+
+Authors: Adriteyo Das, Anvita Warjri, Shivam Lahoty
+"""
+
+import os
+import sys
+import json
+import queue
+import sqlite3
+import datetime
+import threading
+import subprocess
+import logging
+from urllib.request import pathname2url
+
+try:
+    from . import symbol_store
+    from .tracing import span
+except ImportError:
+    import symbol_store
+    from tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Requirements whose resolved configuration (layers, symbol tables, kernel
+# module) can be shared between plugins run against the same image
+SHARED_REQUIREMENTS = ('ModuleRequirement', 'TranslationLayerRequirement', 'SymbolTableRequirement')
+# Warm sessions kept per engine; a batch over many images evicts the least recently used
+MAX_SESSIONS = 4
+
+
+class EngineError(Exception):
+    """Raised when the engine cannot run a request"""
+
+
+class ImageSession:
+    """Volatility context, layer stack and symbol tables for one image"""
+
+    def __init__(self, image_path, context):
+        self.image_path = image_path
+        self.context = context
+        self.shared_config = {}
+        self.plugins_run = 0
+        self.created = datetime.datetime.now().isoformat()
+
+
+class VolatilityEngine:
+    """In-process Volatility 3 runner that keeps one warm context per image"""
+
+    def __init__(self, max_sessions=MAX_SESSIONS, symbol_dirs=None):
+        # Image path -> ImageSession, least recently used first
+        self.sessions = {}
+        self.max_sessions = max_sessions
+        # Images whose symbols the starting process already prepared (symbol_store.prepare_symbols)
+        self.symbol_dirs = symbol_dirs or {}
+        self.plugin_classes = None
+        self.import_error = None
+        self.version = None
+        self.notify = None
+
+    def available(self):
+        """Import volatility3 once; return False if it is not installed"""
+        if self.plugin_classes is not None:
+            return True
+        if self.import_error is not None:
+            return False
+
+        try:
+            import volatility3.plugins
+            import volatility3.symbols
+            from volatility3 import framework
+            from volatility3.framework import constants
+
+            framework.require_interface_version(2, 0, 0)
+            # Kernel symbols unpacked by the MemHawk symbol store are found before the packs
+            symbol_store.install(volatility3.symbols.__path__)
+
+            failures = framework.import_files(volatility3.plugins, True)
+            if failures:
+                logger.debug(f"Plugins failed to import: {failures}")
+            self.plugin_classes = framework.list_plugins()
+            self.version = constants.PACKAGE_VERSION
+            logger.info(f"Volatility {self.version} loaded in-process with {len(self.plugin_classes)} plugins")
+            return True
+        except Exception as e:
+            self.import_error = str(e)
+            logger.warning(f"Volatility 3 framework not importable: {e}")
+            return False
+
+    def ping(self):
+        """Report engine state"""
+        available = self.available()
+        return {
+            'available': available,
+            'version': self.version,
+            'error': self.import_error,
+            'images': list(self.sessions),
+            'pid': os.getpid()
+        }
+
+    def list_plugins(self):
+        """List the plugin names known to the imported framework"""
+        if not self.available():
+            raise EngineError(f"Volatility 3 not available: {self.import_error}")
+        return sorted(self.plugin_classes)
+
+    def _find_plugin(self, plugin_name):
+        """Resolve a CLI-style name such as windows.pslist to its plugin class"""
+        if plugin_name in self.plugin_classes:
+            return self.plugin_classes[plugin_name]
+
+        matches = [name for name in self.plugin_classes if name.rsplit('.', 1)[0] == plugin_name]
+        if len(matches) == 1:
+            return self.plugin_classes[matches[0]]
+
+        raise EngineError(f"Unknown plugin: {plugin_name}")
+
+    def _session(self, image_path):
+        """Create (or return) the warm session for an image"""
+        if not self.available():
+            raise EngineError(f"Volatility 3 not available: {self.import_error}")
+
+        image_path = os.path.abspath(image_path)
+        if image_path in self.sessions:
+            self.sessions[image_path] = self.sessions.pop(image_path)
+            return self.sessions[image_path]
+        if not os.path.exists(image_path):
+            raise EngineError(f"Image not found: {image_path}")
+
+        from volatility3.framework import contexts
+
+        if image_path not in self.symbol_dirs:
+            try:
+                with span('symbols.prepare'):
+                    symbol_store.SymbolStore().prepare(image_path)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Symbol store unavailable: {e}")
+
+        context = contexts.Context()
+        context.config['automagic.LayerStacker.single_location'] = 'file:' + pathname2url(image_path)
+        session = ImageSession(image_path, context)
+        while self.sessions and len(self.sessions) >= self.max_sessions:
+            evicted = next(iter(self.sessions))
+            del self.sessions[evicted]
+            logger.info(f"Dropped engine session for {os.path.basename(evicted)}")
+        self.sessions[image_path] = session
+        logger.info(f"Created engine session for {os.path.basename(image_path)}")
+        return session
+
+    def load_image(self, image_path):
+        """Build the session for an image ahead of the first plugin run"""
+        session = self._session(image_path)
+        return {'image_path': session.image_path, 'created': session.created, 'plugins_run': session.plugins_run}
+
+    def unload_image(self, image_path):
+        """Drop the warm session for an image"""
+        return self.sessions.pop(os.path.abspath(image_path), None) is not None
+
+    def _construct(self, session, plugin, params, output_dir):
+        """Build a plugin against the session, reusing already resolved requirements"""
+        from volatility3 import cli
+        from volatility3.framework import automagic, interfaces, plugins
+
+        context = session.context
+        base_config_path = 'plugins'
+        plugin_config_path = interfaces.configuration.path_join(base_config_path, plugin.__name__)
+
+        shared = [req for req in plugin.get_requirements() if type(req).__name__ in SHARED_REQUIREMENTS]
+        for requirement in shared:
+            if requirement.name in session.shared_config:
+                value, branch = session.shared_config[requirement.name]
+                path = interfaces.configuration.path_join(plugin_config_path, requirement.name)
+                context.config.splice(path, branch)
+                if value is not None:
+                    context.config[path] = value
+
+        for key, value in (params or {}).items():
+            context.config[interfaces.configuration.path_join(plugin_config_path, key)] = value
+
+        automagics = automagic.choose_automagic(automagic.available(context), plugin)
+
+        command_line = cli.CommandLine()
+        command_line.output_dir = output_dir or os.getcwd()
+        file_handler = command_line.file_handler_class_factory()
+
+        constructed = plugins.construct_plugin(context, automagics, plugin, base_config_path, None, file_handler)
+
+        for requirement in shared:
+            path = interfaces.configuration.path_join(plugin_config_path, requirement.name)
+            branch = context.config.branch(path)
+            if branch or context.config.get(path) is not None:
+                session.shared_config[requirement.name] = (context.config.get(path), branch)
+
+        return constructed
+
+    def stream_rows(self, image_path, plugin_name, on_batch, params=None, batch_size=1000, output_dir=None):
+        """Run a plugin and hand its rows to on_batch as they are produced
+
+        A top-level row is released once the next top-level row starts, so it
+        carries its complete __children tree; only the current subtree and one
+        batch are held in memory. Rows already released stay delivered if the
+        plugin fails part way through.
+        """
+        session = self._session(image_path)
+        plugin = self._find_plugin(plugin_name)
+
+        try:
+            # Automagic: layer stacking and symbol table loading, unless shared from an earlier plugin
+            with span('engine.construct', plugin=plugin_name):
+                constructed = self._construct(session, plugin, params, output_dir)
+            grid = constructed.run()
+        except EngineError:
+            raise
+        except Exception as e:
+            raise EngineError(f"{plugin_name} failed: {e}") from e
+
+        return self._stream_grid(session, plugin_name, grid, on_batch, batch_size)
+
+    def _stream_grid(self, session, plugin_name, grid, on_batch, batch_size):
+        """Populate a plugin's TreeGrid, releasing complete top-level rows in batches"""
+        columns = [{'name': column.name, 'type': getattr(column.type, '__name__', str(column.type))}
+                   for column in grid.columns]
+        state = {'root': None, 'batch': [], 'count': 0}
+        parents = {}
+
+        def release(final=False):
+            if state['root'] is not None:
+                state['batch'].append(state['root'])
+                state['count'] += 1
+                state['root'] = None
+            if state['batch'] and (final or len(state['batch']) >= batch_size):
+                on_batch(state['batch'], columns)
+                state['batch'] = []
+
+        def visitor(node, accumulator):
+            row = {column.name: json_value(node.values[index]) for index, column in enumerate(grid.columns)}
+            row['__children'] = []
+            if node.parent is not None and node.parent.path in parents:
+                parents[node.parent.path]['__children'].append(row)
+            else:
+                release()
+                parents.clear()
+                state['root'] = row
+            parents[node.path] = row
+            return accumulator
+
+        try:
+            with span('engine.populate', plugin=plugin_name):
+                grid.populate(visitor, None)
+        except Exception as e:
+            release(final=True)
+            raise EngineError(f"{plugin_name} failed after {state['count']} rows: {e}") from e
+
+        release(final=True)
+        session.plugins_run += 1
+        return {'columns': columns, 'row_count': state['count']}
+
+    def run_plugin(self, image_path, plugin_name, params=None, output_dir=None):
+        """Run one plugin against the warm context and return its rows"""
+        rows = []
+        summary = self.stream_rows(image_path, plugin_name, lambda batch, columns: rows.extend(batch),
+                                   params=params, batch_size=10000, output_dir=output_dir)
+        return {'columns': summary['columns'], 'rows': rows}
+
+    def stream_plugin(self, image_path, plugin_name, params=None, batch_size=1000, output_dir=None):
+        """RPC form of stream_rows: batches go out as 'rows' notifications"""
+        def on_batch(rows, columns):
+            if self.notify:
+                self.notify('rows', {'plugin': plugin_name, 'rows': rows, 'columns': columns})
+
+        return self.stream_rows(image_path, plugin_name, on_batch, params=params,
+                                batch_size=batch_size, output_dir=output_dir)
+
+    def run_fused(self, image_path, plugin_names, params=None, output_dir=None):
+        """Run several pool-tag scanners from one pass over the image; rows keyed by plugin"""
+        try:
+            from .fused_scan import run_fused
+        except ImportError:
+            from fused_scan import run_fused
+
+        results = {}
+
+        def on_batch(plugin_name, rows, columns):
+            results.setdefault(plugin_name, {'columns': columns, 'rows': []})['rows'].extend(rows)
+
+        summaries = run_fused(self, image_path, plugin_names, on_batch, params=params,
+                              batch_size=10000, output_dir=output_dir)
+        return {plugin_name: results.get(plugin_name, {'columns': summary['columns'], 'rows': []})
+                for plugin_name, summary in summaries.items()}
+
+
+    def catalog(self):
+        """Plugin classes, requirements and declared TreeGrid columns of the imported framework"""
+        try:
+            from .plugin_catalog import build_catalog
+        except ImportError:
+            from plugin_catalog import build_catalog
+
+        if not self.available():
+            raise EngineError(f"Volatility 3 not available: {self.import_error}")
+        return build_catalog(self.plugin_classes, self.version)
+
+    def scan_process_iocs(self, image_path, iocs):
+        """IOC hits in every process's VADs; iocs are IOC file lines"""
+        try:
+            from .ioc_scan import IocMatcher, parse_iocs, scan_processes
+        except ImportError:
+            from ioc_scan import IocMatcher, parse_iocs, scan_processes
+
+        try:
+            return list(scan_processes(self, image_path, IocMatcher(parse_iocs(iocs))))
+        except EngineError:
+            raise
+        except Exception as e:
+            raise EngineError(f"Process IOC scan failed: {e}") from e
+
+
+def json_value(value):
+    """Convert a TreeGrid cell to the same JSON value the -r json renderer writes"""
+    from volatility3.framework import interfaces
+
+    if isinstance(value, interfaces.renderers.BaseAbsentValue):
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray)):
+        return ' '.join(f'{b:02x}' for b in value)
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int):
+        return int(value)
+    if isinstance(value, (str, float)) or value is None:
+        return value
+    return str(value)
+
+
+def serve(handler, methods, instream=None, outstream=None):
+    """Answer JSON-RPC requests (one JSON object per line) until shutdown or EOF"""
+    instream = instream or sys.stdin
+    outstream = outstream or sys.stdout
+
+    # Anything a plugin prints must not corrupt the RPC channel
+    sys.stdout = sys.stderr
+
+    def reply(message):
+        outstream.write(json.dumps(message, default=str) + '\n')
+        outstream.flush()
+
+    # Notifications carry the id of the request they belong to, so a client can
+    # drop those of a request it stopped reading
+    current = {'id': None}
+
+    def notify(method, params):
+        with span('rpc.notify', 'ipc', method=method):
+            reply({'jsonrpc': '2.0', 'method': method, 'params': params, 'request': current['id']})
+
+    # Handlers that report progress get a notifier for id-less messages
+    if hasattr(handler, 'notify'):
+        handler.notify = notify
+
+    for line in instream:
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            reply({'jsonrpc': '2.0', 'id': None, 'error': {'code': -32700, 'message': f'Parse error: {e}'}})
+            continue
+
+        request_id = request.get('id')
+        method = request.get('method')
+        params = request.get('params') or {}
+        current['id'] = request_id
+
+        if method == 'shutdown':
+            reply({'jsonrpc': '2.0', 'id': request_id, 'result': True})
+            break
+        if method not in methods:
+            reply({'jsonrpc': '2.0', 'id': request_id, 'error': {'code': -32601, 'message': f'Unknown method: {method}'}})
+            continue
+
+        try:
+            with span('rpc.' + method, 'ipc'):
+                result = getattr(handler, method)(**params)
+            with span('rpc.reply', 'ipc', method=method):
+                reply({'jsonrpc': '2.0', 'id': request_id, 'result': result})
+        except Exception as e:
+            logger.error(f"RPC {method} failed: {e}")
+            reply({'jsonrpc': '2.0', 'id': request_id, 'error': {'code': -32000, 'message': str(e)}})
+
+
+class EngineClient:
+    """Talks to a long-lived engine process started with this module as a script"""
+
+    def __init__(self, python=None, timeout=300):
+        self.python = python or sys.executable
+        self.timeout = timeout
+        self.process = None
+        self.responses = queue.Queue()
+        self.lock = threading.Lock()
+        self.next_id = 0
+
+    def start(self):
+        """Spawn the engine process if it is not running"""
+        if self.process and self.process.poll() is None:
+            return
+
+        self.process = subprocess.Popen(
+            [self.python, os.path.abspath(__file__)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            cwd=os.getcwd()
+        )
+        self.responses = queue.Queue()
+        threading.Thread(target=self._read_responses, args=(self.process, self.responses), daemon=True).start()
+        logger.info(f"Started Volatility engine process (pid {self.process.pid})")
+
+    def _read_responses(self, process, responses):
+        for line in process.stdout:
+            try:
+                responses.put(json.loads(line))
+            except json.JSONDecodeError:
+                logger.debug(f"Ignoring engine output: {line.rstrip()}")
+        responses.put(None)
+
+    def call(self, method, timeout=None, **params):
+        """Send one request and wait for its response"""
+        with span('ipc.call', 'ipc', method=method):
+            for kind, payload in self.stream(method, timeout=timeout, **params):
+                if kind == 'result':
+                    return payload
+
+    def stream(self, method, timeout=None, **params):
+        """Send one request and yield ('notify', params) for each notification, then ('result', result)"""
+        with self.lock:
+            self.start()
+            self.next_id += 1
+            request_id = self.next_id
+
+            self.process.stdin.write(json.dumps({'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params}) + '\n')
+            self.process.stdin.flush()
+
+            while True:
+                try:
+                    message = self.responses.get(timeout=timeout or self.timeout)
+                except queue.Empty:
+                    self.close(force=True)
+                    raise TimeoutError(f"Engine did not answer {method} in time")
+
+                if message is None:
+                    self.process = None
+                    raise EngineError(f"Engine process exited during {method}")
+                if 'id' not in message:
+                    # Leftovers of an earlier, abandoned stream are not this request's
+                    if message.get('request', request_id) == request_id:
+                        yield 'notify', message.get('params')
+                    continue
+                if message.get('id') != request_id:
+                    continue
+                if 'error' in message:
+                    raise EngineError(message['error'].get('message'))
+                yield 'result', message.get('result')
+                return
+
+    def close(self, force=False):
+        """Stop the engine process"""
+        if not self.process:
+            return
+        try:
+            if force:
+                self.process.kill()
+            else:
+                self.process.stdin.write(json.dumps({'jsonrpc': '2.0', 'id': 0, 'method': 'shutdown'}) + '\n')
+                self.process.stdin.flush()
+                self.process.wait(timeout=10)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+        self.process = None
+
+
+ENGINE_METHODS = ['ping', 'list_plugins', 'load_image', 'unload_image', 'run_plugin', 'stream_plugin', 'run_fused',
+                  'scan_process_iocs', 'catalog']
+
+
+def main():
+    """Serve the engine over stdin/stdout"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', stream=sys.stderr)
+    serve(VolatilityEngine(), ENGINE_METHODS)
+
+
+if __name__ == "__main__":
+    main()
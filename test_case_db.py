@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+MemHawk Case Database Tests
+How column names and TreeGrid types map to stored kinds, and the integer and
+time conversions applied to values on the way in
+
+    python -m pytest -q test_case_db.py
+
+Authors: Adriteyo Das, Anvita Warjri, Shivam Lahoty
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from case_db import column_kind, name_words, to_epoch, to_integer
+
+
+@pytest.mark.parametrize('name, type_name, kind', [
+    ('CreateTime', None, 'time'),
+    ('Create Time', None, 'time'),
+    ('create_time', None, 'time'),
+    ('LastWriteTime', None, 'time'),
+    ('TimeDateStamp', None, 'time'),
+    ('Date', None, 'time'),
+    ('DATE', None, 'time'),
+    ('Created', 'datetime', 'time'),
+    # Time only as a whole word
+    ('Update', None, 'text'),
+    ('UPDATE', None, 'text'),
+    ('Uptime', None, 'text'),
+    ('Validate', None, 'text'),
+    ('Offset(V)', None, 'int'),
+    ('Base', None, 'int'),
+    ('PID', None, 'int'),
+    ('Threads', None, 'int'),
+    ('Value', 'Hex', 'int'),
+    ('Wow64', 'bool', 'int'),
+    ('Ratio', 'float', 'real'),
+    ('ImageFileName', None, 'text'),
+    ('Name', 'str', 'text'),
+])
+def test_column_kind(name, type_name, kind):
+    assert column_kind(name, type_name) == kind
+
+
+@pytest.mark.parametrize('name, words', [
+    ('CreateTime', ['create', 'time']),
+    ('Create Time', ['create', 'time']),
+    ('create_time', ['create', 'time']),
+    ('PID', ['pid']),
+    ('VADTag', ['vad', 'tag']),
+    ('Offset(V)', ['offset', 'v']),
+])
+def test_name_words(name, words):
+    assert name_words(name) == words
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('31', 31),
+    ('010', 10),
+    ('0x1f', 31),
+    ('0X1F', 31),
+    (' 0xfa8000123450 ', 0xfa8000123450),
+    ('-5', -5),
+    (' -0x10', -16),
+    (31, 31),
+    (True, 1),
+    (False, 0),
+    (None, None),
+    (1.5, 1.5),
+    # Unparseable text is kept as it is
+    ('ff', 'ff'),
+    ('N/A', 'N/A'),
+    ('', ''),
+    ('0x', '0x'),
+])
+def test_to_integer(value, expected):
+    result = to_integer(value)
+    assert result == expected
+    assert type(result) is type(expected)
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('2021-03-04 05:06:07', 1614834367),
+    ('2021-03-04 05:06:07 UTC', 1614834367),
+    ('2021-03-04T05:06:07Z', 1614834367),
+    ('2021-03-04T07:06:07+02:00', 1614834367),
+    (1614834367, 1614834367),
+    (None, None),
+    ('N/A', 'N/A'),
+])
+def test_to_epoch(value, expected):
+    assert to_epoch(value) == expected
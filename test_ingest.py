@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+MemHawk Ingestion Tests
+The chunked JSON reader fed one character at a time against json.load, and
+read_batches over arrays, case-directory result files and JSON lines
+
+    python -m pytest -q test_ingest.py
+
+Authors: Adriteyo Das, Anvita Warjri, Shivam Lahoty
+"""
+
+import io
+import os
+import sys
+import json
+
+import pytest
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import ingest
+from ingest import JsonReader, read_batches
+
+DOCUMENTS = [
+    '[]',
+    '[ ]',
+    '[1, 22, 333, -4.5e10, 0]',
+    '[true, false, null]',
+    '[{"PID": 4, "ImageFileName": "System"}, {"PID": 123456789, "ImageFileName": null}]',
+    '[["nested", [1, [2, []]]], {"a": {"b": {}}}]',
+    '["]", "[", "}", "{", ",", ":"]',
+    r'["quote \" inside", "back\\slash", "\\", "tab\there", "new\nline"]',
+    r'["\u00e9\u4e2d", "snow \u2603", "\ud83d\ude00"]',
+    '["ü", "中文", "emoji 😀"]',
+    '  \n [ {"Args": "C:\\\\Windows\\\\system32\\\\cmd.exe /c \\"dir [x]\\""} ]  \n',
+]
+
+
+def read_items(text, chunk_size=1):
+    return list(JsonReader(io.StringIO(text), chunk_size).items())
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def rows_of(path, batch_size=2):
+    return [row for batch in read_batches(path, batch_size) for row in batch]
+
+
+@pytest.fixture
+def one_character_chunks(monkeypatch):
+    # read_batches builds its own reader; make it read one character at a time
+    monkeypatch.setattr(ingest, 'JsonReader', lambda f: JsonReader(f, 1))
+
+
+@pytest.mark.parametrize('text', DOCUMENTS)
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, ingest.READ_CHUNK])
+def test_reader_matches_json_load(text, chunk_size):
+    assert read_items(text, chunk_size) == json.load(io.StringIO(text))
+
+
+def test_reader_members_of_an_object():
+    reader = JsonReader(io.StringIO('{"a": [1, "]"], "b}": {"c": "d"}, "e": 5}'), 1)
+    found = {}
+    for key in reader.members():
+        found[key] = reader.value()
+    assert found == {'a': [1, ']'], 'b}': {'c': 'd'}, 'e': 5}
+
+
+@pytest.mark.parametrize('text', ['[1, 2', '[1 2]', '{"a" 1}'])
+def test_reader_rejects_malformed_json(text):
+    with pytest.raises(ValueError):
+        reader = JsonReader(io.StringIO(text), 1)
+        if text.startswith('{'):
+            for _ in reader.members():
+                reader.value()
+        else:
+            list(reader.items())
+
+
+@pytest.mark.parametrize('text', DOCUMENTS)
+def test_read_batches_of_an_array(tmp_path, one_character_chunks, text):
+    assert rows_of(write(tmp_path, 'windows.pslist.json', text)) == json.loads(text)
+
+
+def test_read_batches_sizes(tmp_path):
+    rows = [{'PID': pid} for pid in range(5)]
+    path = write(tmp_path, 'windows.pslist.json', json.dumps(rows))
+    assert [len(batch) for batch in read_batches(path, 2)] == [2, 2, 1]
+
+
+@pytest.mark.parametrize('result', [
+    {'plugin': 'windows.pslist', 'success': True, 'output': [{'PID': 4}, {'PID': 8, 'Name': '[x]'}]},
+    # 'output' need not come first, nor last
+    {'output': [{'PID': 4}], 'success': True, 'elapsed': 1.5},
+    {'success': True, 'error': None, 'output': [], 'plugin': 'windows.pslist'},
+])
+def test_read_batches_unwraps_a_result_file(tmp_path, one_character_chunks, result):
+    path = write(tmp_path, 'windows.pslist.json', json.dumps(result, indent=2))
+    assert rows_of(path) == result['output']
+
+
+@pytest.mark.parametrize('result', [
+    {'plugin': 'windows.pslist', 'success': False, 'error': 'vol exited with code 1', 'output': None},
+    {'plugin': 'windows.pslist', 'success': False, 'output': [{'PID': 4}]},
+    {'plugin': 'windows.pslist', 'success': True, 'demo': True, 'output': [{'PID': 4}]},
+    {'plugin': 'windows.pslist', 'success': True, 'output': 'text output'},
+])
+def test_read_batches_rejects_failed_and_demo_results(tmp_path, one_character_chunks, result):
+    path = write(tmp_path, 'windows.pslist.json', json.dumps(result))
+    with pytest.raises(ValueError):
+        rows_of(path)
+
+
+def test_read_batches_of_json_lines(tmp_path, one_character_chunks):
+    rows = [{'PID': 4, 'Name': 'System'}, {'PID': 8, 'Name': '{"not": "a row"}'}, {'PID': 12, 'Name': None}]
+    banner = 'Volatility 3 Framework 2.5.0\n'
+    path = write(tmp_path, 'windows.pslist.jsonl', banner + ''.join(json.dumps(row) + '\n' for row in rows))
+    assert rows_of(path) == rows
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+MemHawk Job Queue Tests
+Two local workers sharing one queue, a lease that runs out and the job going
+back to the queue; plugins run on a stand-in runner, so no Volatility is needed
+
+    python -m pytest -q test_job_queue.py
+
+Authors: Adriteyo Das, Anvita Warjri, Shivam Lahoty
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import threading
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from job_queue import JobQueue, QueueWorker, MAX_ATTEMPTS
+from scan_journal import ScanJournal, JOURNAL_FILE
+
+PLUGINS = ['windows.info', 'windows.pslist', 'windows.cmdline', 'windows.netscan']
+
+
+class StandInRunner:
+    """Answers run_plugin like VolatilityRunner, with a few rows after a short wait"""
+
+    def __init__(self):
+        self.ran = []
+
+    def run_plugin(self, image_path, plugin_name, output_format='json'):
+        time.sleep(0.05)
+        self.ran.append(plugin_name)
+        return {'plugin': plugin_name, 'success': True, 'output': [{'PID': 4, 'ImageFileName': 'System'}]}
+
+    def catalog(self):
+        return {}
+
+    def close(self):
+        pass
+
+
+def make_image(directory):
+    path = os.path.join(directory, 'mem.raw')
+    with open(path, 'wb') as f:
+        f.write(os.urandom(64 * 1024))
+    return path
+
+
+def journal_mode(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute('pragma journal_mode').fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_two_workers_share_the_queue(tmp_path):
+    image = make_image(str(tmp_path))
+    queue_dir, case_dir = str(tmp_path / 'queue'), str(tmp_path / 'case')
+    queue = JobQueue(queue_dir)
+    assert queue.submit(image, PLUGINS, case_dir) == len(PLUGINS)
+    queue.close()
+
+    workers = [QueueWorker(queue_dir, name=f'worker-{index}') for index in range(2)]
+    counts = {}
+    threads = []
+    for worker in workers:
+        worker.runner = StandInRunner()
+        thread = threading.Thread(target=lambda worker=worker: counts.update({worker.name: worker.run(True, 0.01)}))
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join(30)
+
+    assert sum(counts.values()) == len(PLUGINS)
+    assert all(counts.values()), 'both workers should have claimed jobs'
+    assert sorted(plugin for worker in workers for plugin in worker.runner.ran) == sorted(PLUGINS)
+
+    queue = JobQueue(queue_dir)
+    status = queue.status()
+    queue.close()
+    assert status['jobs'] == {'done': len(PLUGINS)}
+
+    journal = ScanJournal(case_dir, shared=True)
+    assert journal.states() == {plugin: 'done' for plugin in PLUGINS}
+    assert all(journal.verify(plugin) for plugin in PLUGINS)
+    journal.close()
+    assert os.path.exists(os.path.join(case_dir, 'case.db'))
+
+    # Nothing that several hosts write to may be in WAL mode
+    assert journal_mode(os.path.join(queue_dir, 'queue.db')) == 'delete'
+    assert journal_mode(os.path.join(case_dir, JOURNAL_FILE)) == 'delete'
+
+
+def test_expired_lease_goes_back_to_the_queue(tmp_path):
+    image = make_image(str(tmp_path))
+    queue = JobQueue(str(tmp_path / 'queue'))
+    queue.submit(image, ['windows.pslist'], str(tmp_path / 'case'))
+
+    # Worker a claims the job and stops sending heartbeats
+    lost = queue.claim('a', lease_s=0.05)
+    assert lost['plugin'] == 'windows.pslist'
+    assert queue.claim('b') is None
+    time.sleep(0.1)
+
+    taken = queue.claim('b')
+    assert taken['id'] == lost['id']
+    assert taken['worker'] == 'b'
+    assert taken['attempts'] == 1
+
+    # The late result of a is not recorded; b's is
+    assert queue.heartbeat('a', lost['id']) is False
+    assert queue.complete('a', lost['id'], True, 'windows.pslist.json') == (False, None)
+    assert queue.complete('b', taken['id'], True, 'windows.pslist.json') == (True, 0)
+    assert queue.status()['jobs'] == {'done': 1}
+    queue.close()
+
+
+def test_lease_expiring_too_often_fails_the_job(tmp_path):
+    image = make_image(str(tmp_path))
+    queue = JobQueue(str(tmp_path / 'queue'))
+    queue.submit(image, ['windows.pslist'], str(tmp_path / 'case'))
+
+    for attempt in range(MAX_ATTEMPTS):
+        assert queue.claim(f'worker-{attempt}', lease_s=0.01) is not None
+        time.sleep(0.05)
+    assert queue.claim('last') is None
+    assert queue.status()['jobs'] == {'failed': 1}
+    queue.close()
+
+
+def test_failed_jobs_are_queued_again_on_resubmit(tmp_path):
+    image = make_image(str(tmp_path))
+    case_dir = str(tmp_path / 'case')
+    queue = JobQueue(str(tmp_path / 'queue'))
+    queue.submit(image, ['windows.pslist'], case_dir)
+
+    job = queue.claim('a')
+    assert queue.complete('a', job['id'], False, error='vol exited with code 1') == (True, 0)
+    assert queue.submit(image, ['windows.pslist'], case_dir) == 1
+
+    again = queue.claim('b')
+    assert again['id'] == job['id']
+    assert again['attempts'] == 0
+    queue.close()